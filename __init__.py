@@ -53,6 +53,7 @@ else:
         logging_utils.configure_silent()
 
     logger = logging_utils.get_child_logger(__name__)
+    startup_timings = __import__('startup_timings', globals(), locals(), [], sys._addon_import_level_base)
 
     # setup sentry crash reporting
     # ============================
@@ -108,14 +109,15 @@ else:
 
         # need to create an anki-hyper-tts project in sentry.io first
         sentry_env = os.environ.get('SENTRY_ENV', 'production')
-        sentry_sdk.init(
-            "https://a4170596966d47bb9f8fda74a9370bc7@o968582.ingest.sentry.io/6170140",
-            traces_sample_rate=traces_sample_rate_map[sentry_env],
-            release=f'anki-hyper-tts@{version.ANKI_HYPER_TTS_VERSION}',
-            environment=sentry_env,
-            before_send=sentry_filter,
-            before_send_transaction=filter_transactions
-        )
+        with startup_timings.timings.time_phase('sentry init'):
+            sentry_sdk.init(
+                "https://a4170596966d47bb9f8fda74a9370bc7@o968582.ingest.sentry.io/6170140",
+                traces_sample_rate=traces_sample_rate_map[sentry_env],
+                release=f'anki-hyper-tts@{version.ANKI_HYPER_TTS_VERSION}',
+                environment=sentry_env,
+                before_send=sentry_filter,
+                before_send_transaction=filter_transactions
+            )
         sentry_sdk.set_user({"id": user_id})
         sentry_sdk.set_tag("anki_version", anki.version)
     else:
@@ -124,10 +126,11 @@ else:
     # addon imports
     # =============
 
-    from . import anki_utils
-    from . import servicemanager
-    from . import hypertts
-    from . import gui
+    with startup_timings.timings.time_phase('addon imports'):
+        from . import anki_utils
+        from . import servicemanager
+        from . import hypertts
+        from . import gui
 
     # initialize hypertts
     # ===================
@@ -139,9 +142,15 @@ else:
         current_script_dir = os.path.dirname(current_script_path)    
         return os.path.join(current_script_dir, 'services')
     service_manager = servicemanager.ServiceManager(services_dir(), 'services', False)
-    service_manager.init_services()    
-    hyper_tts = hypertts.HyperTTS(ankiutils, service_manager)
+    with startup_timings.timings.time_phase('init services'):
+        service_manager.init_services()    
+    with startup_timings.timings.time_phase('hypertts init'):
+        hyper_tts = hypertts.HyperTTS(ankiutils, service_manager)
     # configure services based on config
-    with hyper_tts.error_manager.get_single_action_context('Configuring Services'):
-        service_manager.configure(hyper_tts.get_configuration())
-    gui.init(hyper_tts)
+    with startup_timings.timings.time_phase('configure services'):
+        with hyper_tts.error_manager.get_single_action_context('Configuring Services'):
+            service_manager.configure(hyper_tts.get_configuration())
+    with startup_timings.timings.time_phase('gui init'):
+        gui.init(hyper_tts)
+    startup_timings.timings.finish()
+    startup_timings.timings.log_summary()
@@ -1,6 +1,7 @@
 import sys
 import os
 import datetime
+import filecmp
 import uuid
 import aqt
 import anki.template
@@ -95,6 +96,24 @@ class AnkiUtils():
         full_filename = aqt.mw.col.media.add_file(filename)
         return full_filename
 
+    def media_add_files(self, filenames):
+        # files already in the media folder with the same content are left alone
+        ensure_anki_collection_open()
+        media_dir = aqt.mw.col.media.dir()
+        added_count = 0
+        for filename in filenames:
+            media_filename = os.path.join(media_dir, os.path.basename(filename))
+            if os.path.exists(media_filename) and filecmp.cmp(filename, media_filename, shallow=False):
+                continue
+            aqt.mw.col.media.add_file(filename)
+            added_count += 1
+        logger.debug(f'added {added_count} media files, {len(filenames) - added_count} already present')
+        return added_count
+
+    def media_file_exists(self, filename):
+        ensure_anki_collection_open()
+        return os.path.exists(os.path.join(aqt.mw.col.media.dir(), filename))
+
     def undo_start(self):
         ensure_anki_collection_open()
         undo_id = aqt.mw.col.add_custom_undo_entry(constants.UNDO_ENTRY_NAME)
@@ -134,6 +153,24 @@ class AnkiUtils():
         tts_tags = [x for x in av_tags if isinstance(x, anki.sound.TTSTag)]
         return tts_tags
 
+    def review_queue_available(self):
+        # only the v3 scheduler exposes its queue
+        ensure_anki_collection_open()
+        return hasattr(aqt.mw.col.sched, 'get_queued_cards')
+
+    def get_upcoming_review_tts_tags(self, current_card_id, card_count):
+        # HyperTTS tags on both sides of the next cards in the review queue, after the one being shown
+        ensure_anki_collection_open()
+        queued_cards = aqt.mw.col.sched.get_queued_cards(fetch_limit=card_count + 1)
+        card_id_list = [queued_card.card.id for queued_card in queued_cards.cards if queued_card.card.id != current_card_id]
+        tts_tags = []
+        for card_id in card_id_list[:card_count]:
+            card = aqt.mw.col.get_card(card_id)
+            for tts_tag in self.extract_tts_tags(card.question_av_tags() + card.answer_av_tags()):
+                if constants.TTS_TAG_VOICE in tts_tag.voices:
+                    tts_tags.append(tts_tag)
+        return tts_tags
+
     def save_note_type_update(self, note_model):
         ensure_anki_collection_open()
         logger.info(f"""updating note type: {note_model['name']}""")
@@ -150,9 +187,8 @@ class AnkiUtils():
             try:
                 return aqt.mw.col.merge_undo_entries(undo_id)
             except Exception as e:
-                # this tends to happen after a large number of updates, and when the collection has been accessed in the middle
-                # to avoid this , I need to rework how updates are batched together. most likely we need to do one single
-                # collection update at the end of all operations
+                # notes are written using update_notes in chunks (see BatchNoteUpdates), which keeps the number of
+                # undo steps to merge low. if merging still fails, the updates are kept but can't be undone as one step
                 logger.warning(f'exception in undo_end_fn: {str(e)}, undo_id: {undo_id}')
                 return False
 
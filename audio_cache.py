@@ -0,0 +1,267 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import List
+
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+@dataclass
+class AudioCacheEntry:
+    hash_str: str
+    filename: str
+    size: int
+    service: str
+    voice_key: str
+    format: str
+    created: float
+    last_access: float
+    hit_count: int
+    in_collection: int
+
+
+class AudioCache():
+    """
+    index of the audio files in the user_files directory, stored in an sqlite database alongside them.
+    the database is only opened when first needed. looking up an entry doesn't write to the database,
+    hits are recorded in memory and written in one transaction by flush_hits.
+    a file can be pinned by any number of realtime presets, one row per preset in audio_file_presets.
+    files found in the collection media are flagged in_collection: deleting them wouldn't reclaim any space,
+    so they don't count towards the cache size and eviction doesn't look at them again.
+    """
+    DATABASE_FILENAME = 'hypertts-audio-cache.sqlite3'
+    ENTRY_COLUMNS = 'hash, filename, size, service, voice_key, format, created, last_access, hit_count, in_collection'
+
+    def __init__(self, anki_utils):
+        self.anki_utils = anki_utils
+        self.connection = None
+        # a single connection is shared between threads, access is serialized
+        self.lock = threading.Lock()
+        # hits not written to the database yet: last access time and number of hits by hash
+        self.pending_hits = {}
+        # (hash, realtime preset) pairs not written to the database yet
+        self.pending_presets = set()
+        # total size of the files which can be evicted, computed when first needed
+        self.evictable_size = None
+
+    def get_connection(self):
+        if self.connection == None:
+            database_path = os.path.join(self.anki_utils.get_user_files_dir(), self.DATABASE_FILENAME)
+            logger.info(f'opening audio cache index {database_path}')
+            self.connection = sqlite3.connect(database_path, check_same_thread=False)
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS audio_files (
+                hash TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                service TEXT,
+                voice_key TEXT,
+                format TEXT,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                in_collection INTEGER NOT NULL DEFAULT 0
+            )""")
+            self.connection.execute('CREATE INDEX IF NOT EXISTS audio_files_last_access ON audio_files (last_access)')
+            # realtime presets which used each file
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS audio_file_presets (
+                hash TEXT NOT NULL,
+                realtime_preset TEXT NOT NULL,
+                PRIMARY KEY (hash, realtime_preset)
+            )""")
+            self.migrate_realtime_preset_column(self.connection)
+            self.migrate_in_collection_column(self.connection)
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS audio_cache_metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )""")
+            # negative cache: services which didn't have audio for a given text
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS audio_not_found (
+                service TEXT NOT NULL,
+                voice_key TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (service, voice_key, source_text)
+            )""")
+            self.connection.commit()
+        return self.connection
+
+    def migrate_realtime_preset_column(self, connection):
+        # files used to record only the last realtime preset which used them, in a column of audio_files
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(audio_files)').fetchall()]
+        if 'realtime_preset' not in columns:
+            return
+        connection.execute('INSERT OR IGNORE INTO audio_file_presets (hash, realtime_preset) '
+            'SELECT hash, realtime_preset FROM audio_files WHERE realtime_preset IS NOT NULL')
+        connection.execute('UPDATE audio_files SET realtime_preset = NULL WHERE realtime_preset IS NOT NULL')
+
+    def migrate_in_collection_column(self, connection):
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(audio_files)').fetchall()]
+        if 'in_collection' in columns:
+            return
+        connection.execute('ALTER TABLE audio_files ADD COLUMN in_collection INTEGER NOT NULL DEFAULT 0')
+
+    def get_entry_evictable_size(self, connection, hash_str):
+        row = connection.execute('SELECT size FROM audio_files WHERE hash = ? AND in_collection = 0', (hash_str,)).fetchone()
+        if row == None:
+            return 0
+        return row[0]
+
+    def update_evictable_size(self, size_change):
+        if self.evictable_size != None:
+            self.evictable_size += size_change
+
+    def lookup(self, hash_str, realtime_preset=None) -> AudioCacheEntry:
+        """return the cache entry for this hash, recording the hit, or None if the audio isn't cached"""
+        with self.lock:
+            connection = self.get_connection()
+            row = connection.execute(f'SELECT {self.ENTRY_COLUMNS} FROM audio_files WHERE hash = ?', (hash_str,)).fetchone()
+            if row == None:
+                return None
+            entry = AudioCacheEntry(*row)
+            if realtime_preset != None and (hash_str, realtime_preset) not in self.pending_presets:
+                preset_row = connection.execute('SELECT 1 FROM audio_file_presets WHERE hash = ? AND realtime_preset = ?',
+                    (hash_str, realtime_preset)).fetchone()
+                if preset_row == None:
+                    self.pending_presets.add((hash_str, realtime_preset))
+            hit_count = self.pending_hits.get(hash_str, (None, 0))[1] + 1
+            entry.last_access = time.time()
+            entry.hit_count += hit_count
+            self.pending_hits[hash_str] = (entry.last_access, hit_count)
+            return entry
+
+    def flush_hits(self):
+        """write the hits recorded since the last flush"""
+        with self.lock:
+            if len(self.pending_hits) == 0 and len(self.pending_presets) == 0:
+                return
+            connection = self.get_connection()
+            connection.executemany('UPDATE audio_files SET last_access = ?, hit_count = hit_count + ? WHERE hash = ?',
+                [(last_access, hit_count, hash_str) for hash_str, (last_access, hit_count) in self.pending_hits.items()])
+            connection.executemany('INSERT OR IGNORE INTO audio_file_presets (hash, realtime_preset) VALUES (?, ?)',
+                list(self.pending_presets))
+            connection.commit()
+            logger.debug(f'recorded hits on {len(self.pending_hits)} audio files')
+            self.pending_hits = {}
+            self.pending_presets = set()
+
+    def add_entry(self, hash_str, filename, size, service, voice_key, format, realtime_preset=None):
+        now = time.time()
+        with self.lock:
+            self.pending_hits.pop(hash_str, None)
+            connection = self.get_connection()
+            previous_size = self.get_entry_evictable_size(connection, hash_str)
+            connection.execute(f'INSERT OR REPLACE INTO audio_files ({self.ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0)',
+                (hash_str, filename, size, service, json.dumps(voice_key, sort_keys=True), format, now, now))
+            self.update_evictable_size(size - previous_size)
+            if realtime_preset != None:
+                connection.execute('INSERT OR IGNORE INTO audio_file_presets (hash, realtime_preset) VALUES (?, ?)', (hash_str, realtime_preset))
+            connection.commit()
+
+    def add_missing_entries(self, entries):
+        """index files written before the index existed, entries are (hash, filename, size, modification time)"""
+        with self.lock:
+            connection = self.get_connection()
+            connection.executemany(f'INSERT OR IGNORE INTO audio_files ({self.ENTRY_COLUMNS}) VALUES (?, ?, ?, NULL, NULL, NULL, ?, ?, 0, 0)',
+                [(hash_str, filename, size, modified, modified) for hash_str, filename, size, modified in entries])
+            connection.commit()
+            self.evictable_size = None
+
+    def is_backfill_done(self):
+        with self.lock:
+            row = self.get_connection().execute('SELECT value FROM audio_cache_metadata WHERE key = ?', ('backfill_done',)).fetchone()
+            return row != None
+
+    def set_backfill_done(self):
+        with self.lock:
+            connection = self.get_connection()
+            connection.execute('INSERT OR REPLACE INTO audio_cache_metadata (key, value) VALUES (?, ?)', ('backfill_done', str(time.time())))
+            connection.commit()
+
+    def get_evictable_size(self):
+        """total size of the files which aren't in the collection media"""
+        with self.lock:
+            if self.evictable_size == None:
+                self.evictable_size = self.get_connection().execute(
+                    'SELECT COALESCE(SUM(size), 0) FROM audio_files WHERE in_collection = 0').fetchone()[0]
+            return self.evictable_size
+
+    def set_in_collection(self, hash_str):
+        with self.lock:
+            connection = self.get_connection()
+            self.update_evictable_size(-self.get_entry_evictable_size(connection, hash_str))
+            connection.execute('UPDATE audio_files SET in_collection = 1 WHERE hash = ?', (hash_str,))
+            connection.commit()
+
+    def get_eviction_candidates(self, eviction_policy: constants.AudioCacheEvictionPolicy, pinned_realtime_presets, 
+            accessed_before, limit) -> List[AudioCacheEntry]:
+        """
+        entries in the order they should be evicted, skipping those in the collection media, those belonging
+        to pinned realtime presets and those accessed recently, which may be about to get played or added to the collection
+        """
+        order_by_map = {
+            constants.AudioCacheEvictionPolicy.LRU: 'last_access, hit_count',
+            constants.AudioCacheEvictionPolicy.LFU: 'hit_count, last_access',
+        }
+        placeholders = ', '.join(['?'] * len(pinned_realtime_presets))
+        with self.lock:
+            rows = self.get_connection().execute(f'SELECT {self.ENTRY_COLUMNS} FROM audio_files '
+                f'WHERE in_collection = 0 AND last_access < ? AND NOT EXISTS (SELECT 1 FROM audio_file_presets '
+                f'WHERE audio_file_presets.hash = audio_files.hash AND audio_file_presets.realtime_preset IN ({placeholders})) '
+                f'ORDER BY {order_by_map[eviction_policy]} LIMIT ?',
+                (accessed_before, *pinned_realtime_presets, limit)).fetchall()
+        return [AudioCacheEntry(*row) for row in rows]
+
+    def remove_entry(self, hash_str):
+        with self.lock:
+            self.pending_hits.pop(hash_str, None)
+            self.pending_presets = set([pending_preset for pending_preset in self.pending_presets if pending_preset[0] != hash_str])
+            connection = self.get_connection()
+            self.update_evictable_size(-self.get_entry_evictable_size(connection, hash_str))
+            connection.execute('DELETE FROM audio_files WHERE hash = ?', (hash_str,))
+            connection.execute('DELETE FROM audio_file_presets WHERE hash = ?', (hash_str,))
+            connection.commit()
+
+    def is_audio_not_found(self, service, voice_key, source_text, ttl_seconds):
+        """whether the service is known not to have audio for this text. entries older than ttl_seconds have expired"""
+        key = (service, json.dumps(voice_key, sort_keys=True), source_text)
+        with self.lock:
+            connection = self.get_connection()
+            row = connection.execute('SELECT created FROM audio_not_found WHERE service = ? AND voice_key = ? AND source_text = ?', key).fetchone()
+            if row == None:
+                return False
+            if row[0] < time.time() - ttl_seconds:
+                connection.execute('DELETE FROM audio_not_found WHERE service = ? AND voice_key = ? AND source_text = ?', key)
+                connection.commit()
+                return False
+            return True
+
+    def add_audio_not_found(self, service, voice_key, source_text):
+        # an existing entry keeps its creation time, so that it still expires
+        with self.lock:
+            connection = self.get_connection()
+            connection.execute('INSERT OR IGNORE INTO audio_not_found (service, voice_key, source_text, created) VALUES (?, ?, ?, ?)',
+                (service, json.dumps(voice_key, sort_keys=True), source_text, time.time()))
+            connection.commit()
+
+    def remove_audio_not_found(self, service=None):
+        """forget the texts for which the service, or all services if None, didn't have audio"""
+        with self.lock:
+            connection = self.get_connection()
+            if service == None:
+                connection.execute('DELETE FROM audio_not_found')
+            else:
+                connection.execute('DELETE FROM audio_not_found WHERE service = ?', (service,))
+            connection.commit()
+
+    def close(self):
+        self.flush_hits()
+        with self.lock:
+            if self.connection != None:
+                self.connection.close()
+                self.connection = None
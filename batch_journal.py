@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import hashlib
+import threading
+import time
+
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class BatchJournal():
+    """
+    progress of a batch, appended to a file in the user_files directory as notes get saved to the collection,
+    so that a batch which was stopped or crashed can be resumed. the first line identifies the batch, then
+    there is one line of json per saved note. a journal can't be resumed any more once the notes or the settings
+    of its batch change, so journals of the same preset, and those not written to for a while, get deleted
+    when a batch starts.
+    """
+    FILENAME_PREFIX = 'hypertts-batch-'
+    FILENAME_EXTENSION = '.journal'
+    MAX_AGE_SECONDS = 30 * 24 * 3600
+
+    def __init__(self, anki_utils, batch_id, preset_uuid):
+        self.anki_utils = anki_utils
+        self.batch_id = batch_id
+        self.preset_uuid = preset_uuid
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_batch_id(batch_model, note_id_list):
+        # the same notes with the same settings. the preset name doesn't affect the audio
+        batch_config = batch_model.serialize()
+        del batch_config['name']
+        batch_key = json.dumps({'batch': batch_config, 'note_id_list': note_id_list}, sort_keys=True)
+        return hashlib.sha224(batch_key.encode('utf-8')).hexdigest()
+
+    def get_path(self):
+        return os.path.join(self.anki_utils.get_user_files_dir(), f'{self.FILENAME_PREFIX}{self.batch_id}{self.FILENAME_EXTENSION}')
+
+    def exists(self):
+        return os.path.exists(self.get_path())
+
+    def start(self):
+        # a new run of the batch, discard any previous progress
+        self.delete_stale_journals()
+        with self.lock:
+            with open(self.get_path(), 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'batch_id': self.batch_id, 'preset_uuid': self.preset_uuid}) + '\n')
+
+    def delete_stale_journals(self):
+        user_files_dir = self.anki_utils.get_user_files_dir()
+        modified_before = time.time() - self.MAX_AGE_SECONDS
+        for filename in os.listdir(user_files_dir):
+            if not (filename.startswith(self.FILENAME_PREFIX) and filename.endswith(self.FILENAME_EXTENSION)):
+                continue
+            path = os.path.join(user_files_dir, filename)
+            if path == self.get_path():
+                continue
+            if os.path.getmtime(path) < modified_before or self.get_journal_preset_uuid(path) == self.preset_uuid:
+                logger.info(f'deleting stale batch journal {filename}')
+                os.remove(path)
+
+    def get_journal_preset_uuid(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+        try:
+            return json.loads(first_line).get('preset_uuid', None)
+        except json.JSONDecodeError:
+            return None
+
+    def record_notes(self, entries):
+        """entries are (note_id, status, sound_file) tuples, written together"""
+        lines = [json.dumps({'note_id': note_id, 'status': status, 'sound_file': sound_file}) + '\n'
+            for note_id, status, sound_file in entries]
+        with self.lock:
+            with open(self.get_path(), 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load(self):
+        """the saved notes, by note id. empty if there is no journal for this batch"""
+        entries = {}
+        if not self.exists():
+            return entries
+        with self.lock:
+            with open(self.get_path(), 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # last line may have been cut short by a crash
+                logger.warning(f'ignoring incomplete journal line in batch {self.batch_id}')
+                continue
+            entries[entry['note_id']] = entry
+        return entries
+
+    def delete(self):
+        with self.lock:
+            if os.path.exists(self.get_path()):
+                os.remove(self.get_path())
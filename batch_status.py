@@ -1,10 +1,44 @@
 import sys
+import time
+import threading
+import contextlib
+import collections
 
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_base)
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
 logger = logging_utils.get_child_logger(__name__)
 
+class StageTimings():
+    """cumulative time spent in each stage of a batch, stages running on several threads add up"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = collections.defaultdict(float)
+        self.counts = collections.Counter()
+
+    @contextlib.contextmanager
+    def time_stage(self, stage):
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start_time
+            with self.lock:
+                self.seconds[stage] += elapsed
+                self.counts[stage] += 1
+
+    def get_seconds(self, stage):
+        with self.lock:
+            return self.seconds[stage]
+
+    def get_count(self, stage):
+        with self.lock:
+            return self.counts[stage]
+
+    def get_summary(self):
+        with self.lock:
+            return ', '.join([f'{stage.name}: {self.seconds[stage]:.2f}s ({self.counts[stage]})' for stage in self.seconds.keys()])
+
 class NoteStatus():
     def __init__(self, note_id):
         self.note_id = note_id
@@ -71,6 +105,12 @@ class BatchStatus():
         self.note_id_map = {}
         self.task_running = False
         self.must_continue = False
+        # number of distinct audio requests needed for these notes, once known
+        self.unique_request_count = None
+        # time spent in each stage of the batch, once running
+        self.stage_timings = None
+        # on-disk progress, when the batch can be resumed
+        self.journal = None
         i = 0
         for note_id in self.note_id_list:
             note_status = NoteStatus(note_id)
@@ -129,6 +169,29 @@ class BatchStatus():
         self.note_status_map[note_id].sound_file = sound_file
         self.notify_change(note_id)
 
+    def set_unique_request_count(self, unique_request_count):
+        self.unique_request_count = unique_request_count
+
+    def set_stage_timings(self, stage_timings):
+        self.stage_timings = stage_timings
+
+    def set_journal(self, journal):
+        self.journal = journal
+
+    def record_saved_notes(self, note_id_list):
+        # called once notes have been saved to the collection
+        if self.journal == None:
+            return
+        self.journal.record_notes([(note_id, self.note_status_map[note_id].status.name, self.note_status_map[note_id].sound_file)
+            for note_id in note_id_list])
+
+    def load_journal_entries(self, journal_entries):
+        # notes saved during a previous run of the batch
+        for note_id, entry in journal_entries.items():
+            if note_id in self.note_status_map:
+                self.note_status_map[note_id].sound_file = entry['sound_file']
+                self.note_status_map[note_id].status = constants.BatchNoteStatus.Done
+
     def set_status(self, note_id, status):
         self.note_status_map[note_id].status = status
         self.notify_change(note_id)
@@ -0,0 +1,182 @@
+import sys
+import aqt.qt
+
+component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
+config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class AudioCache(component_common.ConfigComponentBase):
+
+    def __init__(self, hypertts, dialog, model_change_callback):
+        self.hypertts = hypertts
+        self.dialog = dialog
+        self.model = config_models.AudioCache()
+        self.model_change_callback = model_change_callback
+        self.propagate_model_change = True
+
+        self.max_size_mb = aqt.qt.QSpinBox()
+        self.max_size_mb.setMinimum(0)
+        self.max_size_mb.setMaximum(constants.AUDIO_CACHE_MAX_SIZE_MB_MAXIMUM)
+        self.max_size_mb.setSuffix(' MB')
+        self.max_size_mb.setSpecialValueText('Unlimited')
+
+        self.eviction_policy = aqt.qt.QComboBox()
+        for eviction_policy in constants.AudioCacheEvictionPolicy:
+            self.eviction_policy.addItem(eviction_policy.name, eviction_policy)
+
+        self.not_found_ttl_hours = aqt.qt.QSpinBox()
+        self.not_found_ttl_hours.setMinimum(0)
+        self.not_found_ttl_hours.setMaximum(constants.AUDIO_CACHE_MAX_NOT_FOUND_TTL_HOURS)
+        self.not_found_ttl_hours.setSuffix(' hours')
+
+        self.realtime_prefetch_card_count = aqt.qt.QSpinBox()
+        self.realtime_prefetch_card_count.setMinimum(0)
+        self.realtime_prefetch_card_count.setMaximum(constants.AUDIO_CACHE_MAX_REALTIME_PREFETCH_CARD_COUNT)
+        self.realtime_prefetch_card_count.setSuffix(' cards')
+
+        self.normalize_whitespace = aqt.qt.QCheckBox(constants.GUI_TEXT_AUDIO_CACHE_NORMALIZE_WHITESPACE)
+
+        self.pinned_realtime_presets = aqt.qt.QListWidget()
+        for settings_key in self.hypertts.get_realtime_preset_keys():
+            item = aqt.qt.QListWidgetItem(settings_key)
+            item.setFlags(item.flags() | aqt.qt.Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(aqt.qt.Qt.CheckState.Unchecked)
+            self.pinned_realtime_presets.addItem(item)
+
+    def get_model(self):
+        return self.model
+
+    def load_model(self, model):
+        self.model = model
+        self.propagate_model_change = False
+        self.max_size_mb.setValue(self.model.max_size_mb)
+        self.eviction_policy.setCurrentText(self.model.eviction_policy.name)
+        self.normalize_whitespace.setChecked(self.model.normalize_whitespace)
+        self.not_found_ttl_hours.setValue(self.model.not_found_ttl_hours)
+        self.realtime_prefetch_card_count.setValue(self.model.realtime_prefetch_card_count)
+        for row in range(self.pinned_realtime_presets.count()):
+            item = self.pinned_realtime_presets.item(row)
+            if item.text() in self.model.pinned_realtime_presets:
+                item.setCheckState(aqt.qt.Qt.CheckState.Checked)
+            else:
+                item.setCheckState(aqt.qt.Qt.CheckState.Unchecked)
+        self.propagate_model_change = True
+
+    def notify_model_update(self):
+        if self.propagate_model_change == True:
+            self.model_change_callback(self.model)
+
+    def draw(self):
+        layout_widget = aqt.qt.QWidget()
+        layout = aqt.qt.QVBoxLayout(layout_widget)
+
+        # cache size
+        # ==========
+
+        groupbox = aqt.qt.QGroupBox('Cache Size')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        max_size_label = aqt.qt.QLabel(constants.GUI_TEXT_AUDIO_CACHE_MAX_SIZE)
+        max_size_label.setWordWrap(True)
+        vlayout.addWidget(max_size_label)
+        vlayout.addWidget(self.max_size_mb)
+
+        eviction_policy_label = aqt.qt.QLabel(constants.GUI_TEXT_AUDIO_CACHE_EVICTION_POLICY)
+        eviction_policy_label.setWordWrap(True)
+        vlayout.addWidget(eviction_policy_label)
+        vlayout.addWidget(self.eviction_policy)
+        vlayout.addWidget(self.normalize_whitespace)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        # missing audio
+        # =============
+
+        groupbox = aqt.qt.QGroupBox('Missing Audio')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        not_found_ttl_label = aqt.qt.QLabel(constants.GUI_TEXT_AUDIO_CACHE_NOT_FOUND_TTL)
+        not_found_ttl_label.setWordWrap(True)
+        vlayout.addWidget(not_found_ttl_label)
+        vlayout.addWidget(self.not_found_ttl_hours)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        # realtime prefetch
+        # =================
+
+        groupbox = aqt.qt.QGroupBox('Reviewer Prefetch')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        realtime_prefetch_label = aqt.qt.QLabel(constants.GUI_TEXT_AUDIO_CACHE_REALTIME_PREFETCH)
+        realtime_prefetch_label.setWordWrap(True)
+        vlayout.addWidget(realtime_prefetch_label)
+        vlayout.addWidget(self.realtime_prefetch_card_count)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        # pinned realtime presets
+        # =======================
+
+        groupbox = aqt.qt.QGroupBox('Pinned Realtime Presets')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        pinned_label = aqt.qt.QLabel(constants.GUI_TEXT_AUDIO_CACHE_PINNED_REALTIME_PRESETS)
+        pinned_label.setWordWrap(True)
+        vlayout.addWidget(pinned_label)
+        vlayout.addWidget(self.pinned_realtime_presets)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        layout.addStretch()
+
+        # wire events
+        self.max_size_mb.valueChanged.connect(self.max_size_mb_changed)
+        self.eviction_policy.currentIndexChanged.connect(self.eviction_policy_changed)
+        self.normalize_whitespace.stateChanged.connect(self.normalize_whitespace_changed)
+        self.not_found_ttl_hours.valueChanged.connect(self.not_found_ttl_hours_changed)
+        self.realtime_prefetch_card_count.valueChanged.connect(self.realtime_prefetch_card_count_changed)
+        self.pinned_realtime_presets.itemChanged.connect(self.pinned_realtime_presets_changed)
+
+        return layout_widget
+
+    def max_size_mb_changed(self, value):
+        logger.info(f'max_size_mb_changed {value}')
+        self.model.max_size_mb = value
+        self.notify_model_update()
+
+    def eviction_policy_changed(self, index):
+        logger.info(f'eviction_policy_changed {index}')
+        self.model.eviction_policy = self.eviction_policy.itemData(index)
+        self.notify_model_update()
+
+    def normalize_whitespace_changed(self, value):
+        self.model.normalize_whitespace = self.normalize_whitespace.isChecked()
+        self.notify_model_update()
+
+    def not_found_ttl_hours_changed(self, value):
+        logger.info(f'not_found_ttl_hours_changed {value}')
+        self.model.not_found_ttl_hours = value
+        self.notify_model_update()
+
+    def realtime_prefetch_card_count_changed(self, value):
+        logger.info(f'realtime_prefetch_card_count_changed {value}')
+        self.model.realtime_prefetch_card_count = value
+        self.notify_model_update()
+
+    def pinned_realtime_presets_changed(self, item):
+        pinned_realtime_presets = []
+        for row in range(self.pinned_realtime_presets.count()):
+            row_item = self.pinned_realtime_presets.item(row)
+            if row_item.checkState() == aqt.qt.Qt.CheckState.Checked:
+                pinned_realtime_presets.append(row_item.text())
+        logger.info(f'pinned_realtime_presets_changed {pinned_realtime_presets}')
+        self.model.pinned_realtime_presets = pinned_realtime_presets
+        self.notify_model_update()
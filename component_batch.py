@@ -453,7 +453,8 @@ class ComponentBatch(component_common.ConfigComponentBase):
         self.cancel_button.setEnabled(True)
 
     def apply_notes_batch_start(self):
-        pass
+        # the batch may have been started from the preview's resume button
+        self.disable_bottom_buttons()
 
     def batch_interrupted_button_setup(self):
         self.enable_bottom_buttons()
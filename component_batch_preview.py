@@ -94,6 +94,12 @@ class BatchPreview(component_common.ComponentBase):
         self.progress_bar = aqt.qt.QProgressBar()
         self.progress_bar.setMaximum(len(self.note_id_list))        
         self.progress_details = aqt.qt.QLabel()
+        self.unique_requests_label = aqt.qt.QLabel()
+        self.resume_label = aqt.qt.QLabel()
+        self.resume_button = aqt.qt.QPushButton('Resume')
+        # notes saved by a previous run of this batch which was interrupted
+        self.resumable_note_count = 0
+        self.resume = False
 
         self.selected_row = None
 
@@ -114,10 +120,35 @@ class BatchPreview(component_common.ComponentBase):
 
         logger.info('update_batch_status_task')
         if self.batch_model.text_processing != None:
-            self.hypertts.populate_batch_status_processed_text(self.note_id_list, self.batch_model.source, self.batch_model.text_processing, self.batch_status)
+            self.hypertts.populate_batch_status_processed_text(self.note_id_list, self.batch_model.source, self.batch_model.text_processing, 
+                self.batch_status, voice_selection=self.batch_model.voice_selection)
+        self.resumable_note_count = self.get_resumable_note_count()
 
     def update_batch_status_task_done(self, result):
         logger.info('update_batch_status_task_done')
+        self.update_unique_requests_label()
+        self.update_resume_button()
+
+    def get_resumable_note_count(self):
+        if self.batch_model.target == None or self.batch_model.voice_selection == None or self.batch_model.text_processing == None:
+            return 0
+        return len(self.hypertts.get_batch_journal(self.batch_model, self.note_id_list).load())
+
+    def update_resume_button(self):
+        if self.resumable_note_count > 0:
+            self.resume_label.setText(f'A previous run was interrupted after {self.resumable_note_count} notes')
+            self.resume_label.setVisible(True)
+            self.resume_button.setVisible(True)
+        else:
+            self.resume_label.setVisible(False)
+            self.resume_button.setVisible(False)
+
+    def update_unique_requests_label(self):
+        unique_request_count = self.batch_status.unique_request_count
+        if unique_request_count == None:
+            self.unique_requests_label.setText('')
+        else:
+            self.unique_requests_label.setText(f'{len(self.note_id_list)} notes, {unique_request_count} unique audio requests')
 
     def draw(self):
         # populate processed text
@@ -142,6 +173,12 @@ class BatchPreview(component_common.ComponentBase):
 
         # populate the "notRunning" stack
         notRunningLayout = aqt.qt.QVBoxLayout()
+        notRunningLayout.addWidget(self.unique_requests_label)
+        resume_layout = aqt.qt.QHBoxLayout()
+        resume_layout.addWidget(self.resume_label, stretch=1)
+        resume_layout.addWidget(self.resume_button)
+        notRunningLayout.addLayout(resume_layout)
+        self.update_resume_button()
         self.batchNotRunningStack.setLayout(notRunningLayout)
 
         # poulate the "running" stack
@@ -169,6 +206,7 @@ class BatchPreview(component_common.ComponentBase):
 
         # wire events
         self.stop_button.pressed.connect(self.stop_button_pressed)
+        self.resume_button.pressed.connect(self.resume_button_pressed)
 
         return self.batch_preview_layout
 
@@ -209,27 +247,36 @@ class BatchPreview(component_common.ComponentBase):
             return self.batch_status[self.selected_row]
         return None
 
-    def apply_audio_to_notes(self):
+    def apply_audio_to_notes(self, resume=False):
         self.apply_to_notes_batch_started = True
+        self.resume = resume
         self.hypertts.anki_utils.run_in_background_collection_op(self.dialog, self.apply_audio_fn, self.finished_apply_audio_fn)
 
     def stop_button_pressed(self):
         self.batch_status.stop()
 
+    def resume_button_pressed(self):
+        with self.hypertts.error_manager.get_single_action_context('Resuming Audio for Notes'):
+            self.batch_model.validate()
+            self.apply_audio_to_notes(resume=True)
+
     def apply_audio_fn(self, anki_collection):
-        self.hypertts.process_batch_audio(self.note_id_list, self.batch_model, self.batch_status, anki_collection)
+        self.hypertts.process_batch_audio_journal(self.note_id_list, self.batch_model, self.batch_status, anki_collection, self.resume)
 
     def finished_apply_audio_fn(self, result):
         logger.debug(f'finished_apply_audio_fn, result: {result}')
 
     def batch_start(self):
         self.hypertts.anki_utils.run_on_main(self.show_running_stack)
-        self.hypertts.anki_utils.run_on_main(self.batch_start_fn)
+        if self.apply_to_notes_batch_started:
+            self.hypertts.anki_utils.run_on_main(self.batch_start_fn)
 
     def batch_end(self, completed):
         if completed and self.apply_to_notes_batch_started == True:
             self.hypertts.anki_utils.run_on_main(self.show_completed_stack)
         else:
+            self.resumable_note_count = self.get_resumable_note_count()
+            self.hypertts.anki_utils.run_on_main(self.update_resume_button)
             self.hypertts.anki_utils.run_on_main(self.show_not_running_stack)
         if self.apply_to_notes_batch_started:
             self.batch_end_fn(completed)
@@ -243,6 +290,8 @@ class BatchPreview(component_common.ComponentBase):
         remaining_count = total_count - completed_note_count
 
         completed_text = f'Completed {row} / {total_count}'
+        if self.batch_status.unique_request_count != None:
+            completed_text += f' ({self.batch_status.unique_request_count} unique audio requests)'
 
         # time remaining computation
         time_remaining_s = time_per_note * remaining_count
@@ -0,0 +1,99 @@
+import sys
+import aqt.qt
+
+component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
+config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class BatchProcessing(component_common.ConfigComponentBase):
+
+    def __init__(self, hypertts, dialog, model_change_callback):
+        self.hypertts = hypertts
+        self.dialog = dialog
+        self.model = config_models.BatchProcessing()
+        self.model_change_callback = model_change_callback
+        self.propagate_model_change = True
+
+        self.parallelism = aqt.qt.QSpinBox()
+        self.parallelism.setMinimum(1)
+        self.parallelism.setMaximum(constants.BATCH_PROCESSING_MAX_PARALLELISM)
+
+        self.note_update_chunk_size = aqt.qt.QSpinBox()
+        self.note_update_chunk_size.setMinimum(1)
+        self.note_update_chunk_size.setMaximum(constants.BATCH_PROCESSING_MAX_NOTE_UPDATE_CHUNK_SIZE)
+
+        self.only_changed_notes = aqt.qt.QCheckBox(constants.GUI_TEXT_BATCH_PROCESSING_ONLY_CHANGED_NOTES)
+
+    def get_model(self):
+        return self.model
+
+    def load_model(self, model):
+        self.model = model
+        self.propagate_model_change = False
+        self.parallelism.setValue(self.model.parallelism)
+        self.note_update_chunk_size.setValue(self.model.note_update_chunk_size)
+        self.only_changed_notes.setChecked(self.model.only_changed_notes)
+        self.propagate_model_change = True
+
+    def notify_model_update(self):
+        if self.propagate_model_change == True:
+            self.model_change_callback(self.model)
+
+    def draw(self):
+        layout_widget = aqt.qt.QWidget()
+        layout = aqt.qt.QVBoxLayout(layout_widget)
+
+        # parallelism
+        # ===========
+
+        groupbox = aqt.qt.QGroupBox('Simultaneous Requests')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        parallelism_label = aqt.qt.QLabel(constants.GUI_TEXT_BATCH_PROCESSING_PARALLELISM)
+        parallelism_label.setWordWrap(True)
+        vlayout.addWidget(parallelism_label)
+        vlayout.addWidget(self.parallelism)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        # note updates
+        # ============
+
+        groupbox = aqt.qt.QGroupBox('Saving Notes')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        note_update_chunk_size_label = aqt.qt.QLabel(constants.GUI_TEXT_BATCH_PROCESSING_NOTE_UPDATE_CHUNK_SIZE)
+        note_update_chunk_size_label.setWordWrap(True)
+        vlayout.addWidget(note_update_chunk_size_label)
+        vlayout.addWidget(self.note_update_chunk_size)
+        vlayout.addWidget(self.only_changed_notes)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        layout.addStretch()
+
+        # wire events
+        self.parallelism.valueChanged.connect(self.parallelism_changed)
+        self.note_update_chunk_size.valueChanged.connect(self.note_update_chunk_size_changed)
+        self.only_changed_notes.stateChanged.connect(self.only_changed_notes_changed)
+
+        return layout_widget
+
+    def parallelism_changed(self, value):
+        logger.info(f'parallelism_changed {value}')
+        self.model.parallelism = value
+        self.notify_model_update()
+
+    def note_update_chunk_size_changed(self, value):
+        logger.info(f'note_update_chunk_size_changed {value}')
+        self.model.note_update_chunk_size = value
+        self.notify_model_update()
+
+    def only_changed_notes_changed(self, value):
+        self.model.only_changed_notes = self.only_changed_notes.isChecked()
+        self.notify_model_update()
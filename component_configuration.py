@@ -144,7 +144,7 @@ class Configuration(component_common.ConfigComponentBase):
         service_enabled_checkbox.stateChanged.connect(self.get_service_enable_change_fn(service))
         layout.addWidget(service_enabled_checkbox)
 
-        configuration_options = service.configuration_options()
+        configuration_options = dict(service.configuration_options(), **service.rate_limit_configuration_options())
         options_gridlayout = aqt.qt.QGridLayout()
         row = 0
         for key, type in configuration_options.items():
@@ -166,6 +166,9 @@ class Configuration(component_common.ConfigComponentBase):
                 options_gridlayout.addWidget(spinbox, row, 1, 1, 1)
             elif type == float:
                 spinbox = aqt.qt.QDoubleSpinBox()
+                # enough decimals for rates migrated from throttle delays, such as 1/3 requests per second
+                spinbox.setDecimals(constants.SERVICE_CONFIG_FLOAT_DECIMALS)
+                spinbox.setMaximum(constants.SERVICE_CONFIG_FLOAT_MAXIMUM)
                 saved_value = self.model.get_service_configuration_key(service.name, key)
                 if saved_value != None:
                     spinbox.setValue(saved_value)
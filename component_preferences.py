@@ -4,6 +4,10 @@ import aqt.qt
 component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
 component_shortcuts = __import__('component_shortcuts', globals(), locals(), [], sys._addon_import_level_base)
 component_errorhandling = __import__('component_errorhandling', globals(), locals(), [], sys._addon_import_level_base)
+component_batchprocessing = __import__('component_batchprocessing', globals(), locals(), [], sys._addon_import_level_base)
+component_audiocache = __import__('component_audiocache', globals(), locals(), [], sys._addon_import_level_base)
+component_priorityvoices = __import__('component_priorityvoices', globals(), locals(), [], sys._addon_import_level_base)
+component_startuptimings = __import__('component_startuptimings', globals(), locals(), [], sys._addon_import_level_base)
 config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_base)
@@ -18,6 +22,10 @@ class ComponentPreferences(component_common.ConfigComponentBase):
         self.model = config_models.Preferences()
         self.shortcuts = component_shortcuts.Shortcuts(self.hypertts, self.dialog, self.shortcuts_updated)
         self.error_handling = component_errorhandling.ErrorHandling(self.hypertts, self.dialog, self.error_handling_updated)
+        self.batch_processing = component_batchprocessing.BatchProcessing(self.hypertts, self.dialog, self.batch_processing_updated)
+        self.audio_cache = component_audiocache.AudioCache(self.hypertts, self.dialog, self.audio_cache_updated)
+        self.priority_voices = component_priorityvoices.PriorityVoices(self.hypertts, self.dialog, self.priority_voices_updated)
+        self.startup_timings = component_startuptimings.StartupTimings(self.hypertts, self.dialog)
 
         self.save_button = aqt.qt.QPushButton('Apply')   
         self.cancel_button = aqt.qt.QPushButton('Cancel')        
@@ -27,6 +35,9 @@ class ComponentPreferences(component_common.ConfigComponentBase):
         self.model = model
         self.shortcuts.load_model(self.model.keyboard_shortcuts)
         self.error_handling.load_model(self.model.error_handling)
+        self.batch_processing.load_model(self.model.batch_processing)
+        self.audio_cache.load_model(self.model.audio_cache)
+        self.priority_voices.load_model(self.model.priority_voices)
 
     def get_model(self):
         return self.model
@@ -39,6 +50,18 @@ class ComponentPreferences(component_common.ConfigComponentBase):
         self.model.error_handling = model
         self.model_part_updated_common()
 
+    def batch_processing_updated(self, model):
+        self.model.batch_processing = model
+        self.model_part_updated_common()
+
+    def audio_cache_updated(self, model):
+        self.model.audio_cache = model
+        self.model_part_updated_common()
+
+    def priority_voices_updated(self, model):
+        self.model.priority_voices = model
+        self.model_part_updated_common()
+
     def model_part_updated_common(self):
         self.save_button.setEnabled(True)
         self.save_button.setStyleSheet(self.hypertts.anki_utils.get_green_stylesheet())        
@@ -63,6 +86,10 @@ class ComponentPreferences(component_common.ConfigComponentBase):
         self.tabs = aqt.qt.QTabWidget()
         self.tabs.addTab(self.shortcuts.draw(), 'Keyboard Shortcuts')
         self.tabs.addTab(self.error_handling.draw(), 'Error Handling')
+        self.tabs.addTab(self.batch_processing.draw(), 'Batch Processing')
+        self.tabs.addTab(self.audio_cache.draw(), 'Audio Cache')
+        self.tabs.addTab(self.priority_voices.draw(), 'Priority Voices')
+        self.tabs.addTab(self.startup_timings.draw(), 'Startup')
         layout.addWidget(self.tabs)
 
         # setup bottom buttons
@@ -0,0 +1,82 @@
+import sys
+import aqt.qt
+
+component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
+config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class PriorityVoices(component_common.ConfigComponentBase):
+
+    def __init__(self, hypertts, dialog, model_change_callback):
+        self.hypertts = hypertts
+        self.dialog = dialog
+        self.model = config_models.PriorityVoices()
+        self.model_change_callback = model_change_callback
+        self.propagate_model_change = True
+
+        self.hedged_request_count = aqt.qt.QSpinBox()
+        self.hedged_request_count.setMinimum(1)
+        self.hedged_request_count.setMaximum(constants.PRIORITY_VOICES_MAX_HEDGED_REQUEST_COUNT)
+
+        self.hedged_request_stagger_ms = aqt.qt.QSpinBox()
+        self.hedged_request_stagger_ms.setMinimum(0)
+        self.hedged_request_stagger_ms.setMaximum(constants.PRIORITY_VOICES_MAX_HEDGED_REQUEST_STAGGER_MS)
+        self.hedged_request_stagger_ms.setSuffix(' ms')
+
+    def get_model(self):
+        return self.model
+
+    def load_model(self, model):
+        self.model = model
+        self.propagate_model_change = False
+        self.hedged_request_count.setValue(self.model.hedged_request_count)
+        self.hedged_request_stagger_ms.setValue(self.model.hedged_request_stagger_ms)
+        self.propagate_model_change = True
+
+    def notify_model_update(self):
+        if self.propagate_model_change == True:
+            self.model_change_callback(self.model)
+
+    def draw(self):
+        layout_widget = aqt.qt.QWidget()
+        layout = aqt.qt.QVBoxLayout(layout_widget)
+
+        # simultaneous voices
+        # ===================
+
+        groupbox = aqt.qt.QGroupBox('Simultaneous Voices')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        hedged_request_count_label = aqt.qt.QLabel(constants.GUI_TEXT_PRIORITY_VOICES_HEDGED_REQUEST_COUNT)
+        hedged_request_count_label.setWordWrap(True)
+        vlayout.addWidget(hedged_request_count_label)
+        vlayout.addWidget(self.hedged_request_count)
+
+        hedged_request_stagger_label = aqt.qt.QLabel(constants.GUI_TEXT_PRIORITY_VOICES_HEDGED_REQUEST_STAGGER)
+        hedged_request_stagger_label.setWordWrap(True)
+        vlayout.addWidget(hedged_request_stagger_label)
+        vlayout.addWidget(self.hedged_request_stagger_ms)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        layout.addStretch()
+
+        # wire events
+        self.hedged_request_count.valueChanged.connect(self.hedged_request_count_changed)
+        self.hedged_request_stagger_ms.valueChanged.connect(self.hedged_request_stagger_ms_changed)
+
+        return layout_widget
+
+    def hedged_request_count_changed(self, value):
+        logger.info(f'hedged_request_count_changed {value}')
+        self.model.hedged_request_count = value
+        self.notify_model_update()
+
+    def hedged_request_stagger_ms_changed(self, value):
+        logger.info(f'hedged_request_stagger_ms_changed {value}')
+        self.model.hedged_request_stagger_ms = value
+        self.notify_model_update()
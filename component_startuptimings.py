@@ -0,0 +1,39 @@
+import sys
+import aqt.qt
+
+component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+startup_timings = __import__('startup_timings', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class StartupTimings(component_common.ComponentBase):
+    """read-only view of startup_timings, there is no model to edit"""
+
+    def __init__(self, hypertts, dialog, timings=startup_timings.timings):
+        self.hypertts = hypertts
+        self.dialog = dialog
+        self.timings = timings
+
+        self.timings_text = aqt.qt.QPlainTextEdit()
+        self.timings_text.setReadOnly(True)
+
+    def draw(self):
+        layout_widget = aqt.qt.QWidget()
+        layout = aqt.qt.QVBoxLayout(layout_widget)
+
+        groupbox = aqt.qt.QGroupBox('Startup Timings')
+        vlayout = aqt.qt.QVBoxLayout()
+
+        description_label = aqt.qt.QLabel(constants.GUI_TEXT_STARTUP_TIMINGS)
+        description_label.setWordWrap(True)
+        vlayout.addWidget(description_label)
+        vlayout.addWidget(self.timings_text)
+
+        groupbox.setLayout(vlayout)
+        layout.addWidget(groupbox)
+
+        self.timings_text.setPlainText(self.timings.get_summary())
+
+        return layout_widget
@@ -1,17 +1,40 @@
 import sys
 import aqt.qt
 import copy
+import collections
 
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 options = __import__('options', globals(), locals(), [], sys._addon_import_level_base)
 component_common = __import__('component_common', globals(), locals(), [], sys._addon_import_level_base)
 config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
 gui_utils = __import__('gui_utils', globals(), locals(), [], sys._addon_import_level_base)
+voice_search = __import__('voice_search', globals(), locals(), [], sys._addon_import_level_base)
 errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_base)
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
 logger = logging_utils.get_child_logger(__name__)
 
 
+class VoiceListModel(aqt.qt.QAbstractListModel):
+    """voices shown in the voices combobox, the combobox only asks for the labels of the rows it displays"""
+    def __init__(self):
+        aqt.qt.QAbstractListModel.__init__(self, None)
+        self.voice_list = []
+
+    def set_voice_list(self, voice_list):
+        self.beginResetModel()
+        self.voice_list = voice_list
+        self.endResetModel()
+
+    def rowCount(self, parent=aqt.qt.QModelIndex()):
+        return len(self.voice_list)
+
+    def data(self, index, role):
+        if role != aqt.qt.Qt.ItemDataRole.DisplayRole:
+            return None
+        if not index.isValid() or index.row() >= len(self.voice_list):
+            return None
+        return str(self.voice_list[index.row()])
+
 class VoiceSelection(component_common.ConfigComponentBase):
     def __init__(self, hypertts, dialog, model_change_callback):
         self.hypertts = hypertts
@@ -26,6 +49,9 @@ class VoiceSelection(component_common.ConfigComponentBase):
         self.services_combobox = aqt.qt.QComboBox()
         self.genders_combobox = aqt.qt.QComboBox()
         self.voices_combobox = aqt.qt.QComboBox()
+        self.search_line_edit = aqt.qt.QLineEdit()
+        self.search_line_edit.setPlaceholderText(constants.GUI_TEXT_VOICE_SEARCH_PLACEHOLDER)
+        self.search_line_edit.setClearButtonEnabled(True)
 
         for combobox in [
             self.audio_languages_combobox,
@@ -35,6 +61,10 @@ class VoiceSelection(component_common.ConfigComponentBase):
             self.voices_combobox]:
             combobox.setStyleSheet("combobox-popup: 0;")
         self.voices_combobox.setFont(gui_utils.get_large_combobox_font())
+        self.voice_list_model = VoiceListModel()
+        self.voices_combobox.setModel(self.voice_list_model)
+        # all rows have the same height, the popup doesn't need to measure every voice
+        self.voices_combobox.view().setUniformItemSizes(True)
 
         self.play_sample_button = aqt.qt.QPushButton('Play Sample')
 
@@ -44,16 +74,23 @@ class VoiceSelection(component_common.ConfigComponentBase):
     def get_voices(self):
         self.voice_list = self.hypertts.service_manager.full_voice_list()
 
-        languages = set()
-        audio_languages = set()
-        services = set()
-        genders = set()
-
-        for voice in self.voice_list:
-            audio_languages.add(voice.language)
-            languages.add(voice.language.lang)
-            services.add(voice.service.name)
-            genders.add(voice.gender)
+        # voice ids are positions in sorted_voice_list. for each filter, the ids of the voices matching each value
+        self.sorted_voice_list = sorted(self.voice_list, key=str)
+        self.audio_language_voice_ids = collections.defaultdict(set)
+        self.language_voice_ids = collections.defaultdict(set)
+        self.service_voice_ids = collections.defaultdict(set)
+        self.gender_voice_ids = collections.defaultdict(set)
+        for voice_id, voice in enumerate(self.sorted_voice_list):
+            self.audio_language_voice_ids[voice.language].add(voice_id)
+            self.language_voice_ids[voice.language.lang].add(voice_id)
+            self.service_voice_ids[voice.service.name].add(voice_id)
+            self.gender_voice_ids[voice.gender].add(voice_id)
+        self.voice_search_index = voice_search.VoiceSearchIndex(self.sorted_voice_list)
+
+        audio_languages = self.audio_language_voice_ids.keys()
+        languages = self.language_voice_ids.keys()
+        services = self.service_voice_ids.keys()
+        genders = self.gender_voice_ids.keys()
 
         def get_name(entry):
             return entry.name
@@ -82,7 +119,10 @@ class VoiceSelection(component_common.ConfigComponentBase):
             logger.info(f'options: {model.voice.options}')
             # single voice
             self.radio_button_single.setChecked(True)
-            voice_index = self.voice_list.index(model.voice.voice)
+            if model.voice.voice not in self.filtered_voice_index_map:
+                # the voice is hidden by the filters or the search
+                self.reset_filters()
+            voice_index = self.filtered_voice_index_map[model.voice.voice]
             self.voices_combobox.setCurrentIndex(voice_index)
             # self.voice_options_layout
             #self.voice_options_widgets[widget_name]
@@ -164,6 +204,9 @@ class VoiceSelection(component_common.ConfigComponentBase):
     
 
         row = 0
+        gridlayout.addWidget(aqt.qt.QLabel('Search'), row, 0, 1, 1)
+        gridlayout.addWidget(self.search_line_edit, row, 1, 1, 1)
+        row +=1 
         gridlayout.addWidget(aqt.qt.QLabel('Language'), row, 0, 1, 1)
         gridlayout.addWidget(self.languages_combobox, row, 1, 1, 1)        
         row +=1 
@@ -257,6 +300,7 @@ class VoiceSelection(component_common.ConfigComponentBase):
         self.languages_combobox.currentIndexChanged.connect(self.filter_and_draw_voices)
         self.services_combobox.currentIndexChanged.connect(self.filter_and_draw_voices)
         self.genders_combobox.currentIndexChanged.connect(self.filter_and_draw_voices)
+        self.search_line_edit.textChanged.connect(self.search_text_changed)
 
         self.voices_combobox.currentIndexChanged.connect(self.voice_selected)
 
@@ -295,6 +339,7 @@ class VoiceSelection(component_common.ConfigComponentBase):
         self.languages_combobox.setCurrentIndex(0)
         self.services_combobox.setCurrentIndex(0)
         self.genders_combobox.setCurrentIndex(0)
+        self.search_line_edit.setText('')
 
     def get_selected_voice(self):
         if len(self.filtered_voice_list) == 0:
@@ -404,33 +449,58 @@ class VoiceSelection(component_common.ConfigComponentBase):
 
     def filter_and_draw_voices(self, current_index):
         logger.info('filter_and_draw_voices')
-        voice_list = self.voice_list
+        voice_id_sets = []
         # check filtering by audio language
         if self.audio_languages_combobox.currentIndex() != 0:
             audio_language = self.audio_languages[self.audio_languages_combobox.currentIndex() - 2]
-            voice_list = [voice for voice in voice_list if voice.language == audio_language]
+            voice_id_sets.append(self.audio_language_voice_ids[audio_language])
         # check filtering by language
         if self.languages_combobox.currentIndex() != 0:
             language = self.languages[self.languages_combobox.currentIndex() - 2]
-            voice_list = [voice for voice in voice_list if voice.language.lang == language]
+            voice_id_sets.append(self.language_voice_ids[language])
         # check filtering by service
         if self.services_combobox.currentIndex() != 0:
             service = self.services[self.services_combobox.currentIndex() - 2]
-            voice_list = [voice for voice in voice_list if voice.service.name == service] 
+            voice_id_sets.append(self.service_voice_ids[service])
         # check filtering by gender
         if self.genders_combobox.currentIndex() != 0:
             gender = self.genders[self.genders_combobox.currentIndex() - 2]
-            voice_list = [voice for voice in voice_list if voice.gender == gender]
-        def voice_sort_key(voice):
-            return str(voice)
-        # sort
-        voice_list.sort(key=voice_sort_key)
+            voice_id_sets.append(self.gender_voice_ids[gender])
+        voice_ids = None
+        if len(voice_id_sets) > 0:
+            # start from the smallest set
+            voice_id_sets.sort(key=len)
+            voice_ids = voice_id_sets[0].intersection(*voice_id_sets[1:])
+        search_text = self.search_line_edit.text()
+        if len(search_text.strip()) > 0:
+            # best matches first, restricted to the voices matching the filters
+            ranked_voice_ids = self.voice_search_index.search(search_text)
+            if voice_ids != None:
+                ranked_voice_ids = [voice_id for voice_id in ranked_voice_ids if voice_id in voice_ids]
+            voice_list = [self.sorted_voice_list[voice_id] for voice_id in ranked_voice_ids]
+        elif voice_ids == None:
+            voice_list = self.sorted_voice_list
+        else:
+            # ids are positions in the sorted list, sorting them keeps the voices sorted
+            voice_list = [self.sorted_voice_list[voice_id] for voice_id in sorted(voice_ids)]
         self.filtered_voice_list = voice_list
+        # position of each voice in the combobox, voices are hashable
+        self.filtered_voice_index_map = {}
+        for index, voice in enumerate(self.filtered_voice_list):
+            self.filtered_voice_index_map.setdefault(voice, index)
         self.draw_all_voices(self.filtered_voice_list)
 
+    def search_text_changed(self, text):
+        self.filter_and_draw_voices(0)
+
     def draw_all_voices(self, voice_list):
-        self.voices_combobox.clear()
-        self.voices_combobox.addItems([str(voice) for voice in voice_list])
+        # select the first voice, voice_selected needs to run even if the index stays the same
+        self.voices_combobox.blockSignals(True)
+        self.voice_list_model.set_voice_list(voice_list)
+        current_index = 0 if len(voice_list) > 0 else -1
+        self.voices_combobox.setCurrentIndex(current_index)
+        self.voices_combobox.blockSignals(False)
+        self.voice_selected(current_index)
 
     def clear_voice_list_grid_layout(self):
         for i in reversed(range(self.voice_list_grid_layout.count())): 
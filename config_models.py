@@ -558,10 +558,43 @@ class KeyboardShortcuts:
 class ErrorHandling:
     realtime_tts_errors_dialog_type: constants.ErrorDialogType = constants.ErrorDialogType.Dialog
 
+@dataclass
+class BatchProcessing:
+    # how many notes can have audio requests in flight at the same time
+    parallelism: int = constants.BATCH_PROCESSING_DEFAULT_PARALLELISM
+    # number of modified notes written to the collection at once
+    note_update_chunk_size: int = constants.BATCH_PROCESSING_DEFAULT_NOTE_UPDATE_CHUNK_SIZE
+    # skip notes whose target field already has the expected audio
+    only_changed_notes: bool = False
+
+@dataclass
+class PriorityVoices:
+    # number of voices from a priority list requested at the same time, 1 means one after the other
+    hedged_request_count: int = constants.PRIORITY_VOICES_DEFAULT_HEDGED_REQUEST_COUNT
+    # delay before starting each additional voice request
+    hedged_request_stagger_ms: int = constants.PRIORITY_VOICES_DEFAULT_HEDGED_REQUEST_STAGGER_MS
+
+@dataclass
+class AudioCache:
+    # size budget for the user_files audio cache, 0 means unlimited
+    max_size_mb: int = constants.AUDIO_CACHE_DEFAULT_MAX_SIZE_MB
+    eviction_policy: constants.AudioCacheEvictionPolicy = constants.AudioCacheEvictionPolicy.LRU
+    # realtime settings keys whose audio files never get evicted
+    pinned_realtime_presets: List[str] = field(default_factory=list)
+    # text which only differs in whitespace shares the same audio file
+    normalize_whitespace: bool = False
+    # how long to remember that a service didn't have audio for a text, 0 to disable
+    not_found_ttl_hours: int = constants.AUDIO_CACHE_DEFAULT_NOT_FOUND_TTL_HOURS
+    # number of upcoming cards in the reviewer whose realtime audio is requested in advance, 0 to disable
+    realtime_prefetch_card_count: int = constants.AUDIO_CACHE_DEFAULT_REALTIME_PREFETCH_CARD_COUNT
+
 @dataclass
 class Preferences:
     keyboard_shortcuts: KeyboardShortcuts = field(default_factory=KeyboardShortcuts)
     error_handling: ErrorHandling = field(default_factory=ErrorHandling)
+    batch_processing: BatchProcessing = field(default_factory=BatchProcessing)
+    audio_cache: AudioCache = field(default_factory=AudioCache)
+    priority_voices: PriorityVoices = field(default_factory=PriorityVoices)
 
 def serialize_preferences(preferences):
     return databind.json.dump(preferences, Preferences)
@@ -661,6 +694,15 @@ def migrate_configuration(anki_utils, config):
                 batch['uuid'] = batch_uuid
                 batch['name'] = batch_name
                 config[constants.CONFIG_PRESETS][batch_uuid] = batch
+    if current_config_schema_version < 3:
+        # throttle_seconds slept before every request, it's replaced by the ServiceManager rate limiter
+        service_config_map = config.get(constants.CONFIG_CONFIGURATION, {}).get('service_config', {})
+        for service_name, service_config in service_config_map.items():
+            throttle_seconds = service_config.pop('throttle_seconds', None)
+            if throttle_seconds != None and throttle_seconds > 0:
+                service_config['requests_per_second'] = 1.0 / throttle_seconds
+                service_config['burst_size'] = 1
+                service_config['max_in_flight'] = 1
     # write current config
     config[constants.CONFIG_SCHEMA] = constants.CONFIG_SCHEMA_VERSION
 
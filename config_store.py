@@ -0,0 +1,51 @@
+import sys
+import json
+import hashlib
+import threading
+
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class ConfigWriteTimer():
+    def __init__(self, delay_ms):
+        self.delay_ms = delay_ms
+        self.timer_obj = None
+
+class ConfigStore():
+    """
+    writes the add-on config through anki_utils. a save only marks the config dirty, the write happens
+    once no other save came in for CONFIG_WRITE_DELAY_MS, so that a series of saves results in one write.
+    the config is written only if its content differs from what was last loaded or written.
+    """
+    def __init__(self, anki_utils, config):
+        self.anki_utils = anki_utils
+        self.config = config
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.written_fingerprint = self.get_fingerprint(config)
+        self.write_timer = ConfigWriteTimer(constants.CONFIG_WRITE_DELAY_MS)
+
+    def get_fingerprint(self, config):
+        config_str = json.dumps(config, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha224(config_str.encode('utf-8')).hexdigest()
+
+    def save(self):
+        with self.lock:
+            self.dirty = True
+        # the timer needs to be started from the main thread
+        self.anki_utils.run_on_main(lambda: self.anki_utils.call_on_timer_expire(self.write_timer, self.flush))
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            fingerprint = self.get_fingerprint(self.config)
+            if fingerprint == self.written_fingerprint:
+                logger.debug('config unchanged, not writing')
+                return
+            self.written_fingerprint = fingerprint
+        logger.debug('writing config')
+        self.anki_utils.write_config(self.config)
@@ -56,6 +56,13 @@ class BatchNoteStatus(enum.Enum):
     Done = enum.auto()
     Error = enum.auto()
     OK = enum.auto()
+    Unchanged = enum.auto() # the target field already had the audio
+
+class BatchStage(enum.Enum):
+    load_note = enum.auto()
+    process_text = enum.auto()
+    synthesis = enum.auto() # cumulative across the parallel audio requests
+    update_note = enum.auto() # registering media files and saving notes
 
 class TextReplacementRuleType(enum.Enum):
     Simple = enum.auto()
@@ -78,7 +85,7 @@ class MappingRuleType(enum.Enum):
     DeckNoteType = enum.auto()
 
 CONFIG_SCHEMA = 'config_schema'
-CONFIG_SCHEMA_VERSION = 2
+CONFIG_SCHEMA_VERSION = 3
 # deprecated, use CONFIG_PRESETS
 CONFIG_BATCH_CONFIG = 'batch_config'
 # this is the new config category, contains dict of uuids
@@ -90,6 +97,8 @@ CONFIG_PREFERENCES = 'preferences'
 CONFIG_KEYBOARD_SHORTCUTS = 'keyboard_shortcuts'
 CONFIG_LAST_USED_BATCH = 'last_used_batch'
 CONFIG_USE_SELECTION = 'use_selection' # whether to use the selected portion of the field
+# saves made within this delay of each other are written to the config once
+CONFIG_WRITE_DELAY_MS = 500
 
 ADDON_NAME = 'HyperTTS'
 MENU_PREFIX = ADDON_NAME + ':'
@@ -203,6 +212,38 @@ GUI_TEXT_SHORTCUTS_EDITOR_PREVIEW_AUDIO = """Preview Audio for a note using the
 
 GUI_TEXT_ERROR_HANDLING_REALTIME_TTS = """How to display errors during Realtime TTS"""
 
+GUI_TEXT_BATCH_PROCESSING_PARALLELISM = """Number of notes for which audio is requested simultaneously when adding audio"""\
+""" to notes from the browser. Higher values speed up large batches, but some services may reject too many simultaneous requests."""
+GUI_TEXT_BATCH_PROCESSING_ONLY_CHANGED_NOTES = """Only add audio to notes which changed: skip notes whose target field already has """\
+"""the audio for the current text and voice (single voice selection only)"""
+GUI_TEXT_BATCH_PROCESSING_NOTE_UPDATE_CHUNK_SIZE = """Number of notes saved to the collection at once when adding audio to notes. """\
+"""Larger values make large batches faster, smaller values save progress more often."""
+
+GUI_TEXT_PRIORITY_VOICES_HEDGED_REQUEST_COUNT = """With Priority voice selection, number of voices which are asked for audio at the same time. """\
+"""The first voice in the list which has the audio is still used, but there is no need to wait for a voice to come back """\
+"""empty before asking the next one. 1 asks the voices one after the other."""
+GUI_TEXT_PRIORITY_VOICES_HEDGED_REQUEST_STAGGER = """Delay before asking each additional voice. If a higher priority voice has the audio """\
+"""before the delay is over, the other voices are not asked."""
+
+GUI_TEXT_STARTUP_TIMINGS = """Time taken by each step of loading HyperTTS when Anki started. """\
+"""With HYPER_TTS_DEBUG_LOGGING set, these timings are also written to the log."""
+
+GUI_TEXT_VOICE_SEARCH_PLACEHOLDER = """Type to search voices by name, language, service or gender"""
+
+GUI_TEXT_AUDIO_CACHE_MAX_SIZE = """Maximum size of the audio cache in megabytes (0 for unlimited). When the cache grows larger,"""\
+""" the least useful audio files get deleted in the background, they will be requested again if needed."""
+GUI_TEXT_AUDIO_CACHE_EVICTION_POLICY = """Which files to delete first:
+<b>LRU:</b> files which haven't been played for the longest time.
+<b>LFU:</b> files which have been played the least number of times."""
+GUI_TEXT_AUDIO_CACHE_NORMALIZE_WHITESPACE = """Reuse audio for text which only differs in spaces and line breaks"""
+GUI_TEXT_AUDIO_CACHE_NOT_FOUND_TTL = """When a dictionary service doesn't have audio for a word, don't ask it again for this many hours """\
+"""(0 to always ask). With priority voice selection, the next voice is used right away."""
+GUI_TEXT_AUDIO_CACHE_REALTIME_PREFETCH = """While reviewing, get the Realtime TTS audio for this many upcoming cards in advance, """\
+"""so that it plays right away when they are shown (0 to disable, requires the v3 scheduler). """\
+"""Audio requested for cards you don't reach still counts against your service quota."""
+GUI_TEXT_AUDIO_CACHE_PINNED_REALTIME_PRESETS = """Audio for these Realtime presets is never deleted. """\
+"""Audio files which were added to your collection are never deleted either."""
+
 GRAPHICS_PRO_BANNER = 'hypertts_pro_banner.png'
 GRAPHICS_LITE_BANNER = 'hypertts_lite_banner.png'
 GRAPHICS_SERVICE_COMPATIBLE = 'hypertts_service_compatible_banner.png'
@@ -214,6 +255,39 @@ TEXT_PROCESSING_DEFAULT_SSML_CHARACTERS = True
 TEXT_PROCESSING_DEFAULT_REPLACE_AFTER = True
 TEXT_PROCESSING_DEFAULT_IGNORE_CASE = False
 
+BATCH_PROCESSING_DEFAULT_PARALLELISM = 1
+BATCH_PROCESSING_MAX_PARALLELISM = 16
+BATCH_PROCESSING_DEFAULT_NOTE_UPDATE_CHUNK_SIZE = 250
+# how many notes can be waiting for their audio, ahead of the note being completed
+BATCH_PROCESSING_MAX_PENDING_NOTES = 100
+BATCH_PROCESSING_MAX_NOTE_UPDATE_CHUNK_SIZE = 10000
+
+# float service options, such as requests_per_second
+SERVICE_CONFIG_FLOAT_DECIMALS = 3
+SERVICE_CONFIG_FLOAT_MAXIMUM = 1000
+
+PRIORITY_VOICES_DEFAULT_HEDGED_REQUEST_COUNT = 1
+PRIORITY_VOICES_MAX_HEDGED_REQUEST_COUNT = 8
+PRIORITY_VOICES_DEFAULT_HEDGED_REQUEST_STAGGER_MS = 0
+PRIORITY_VOICES_MAX_HEDGED_REQUEST_STAGGER_MS = 10000
+
+AUDIO_CACHE_DEFAULT_MAX_SIZE_MB = 0 # unlimited
+AUDIO_CACHE_MAX_SIZE_MB_MAXIMUM = 1000000
+# eviction deletes this many files at a time, pausing in between
+AUDIO_CACHE_EVICTION_BATCH_SIZE = 100
+AUDIO_CACHE_EVICTION_PAUSE_SECONDS = 0.05
+# audio files named by get_audio_filename, the group is the hash
+AUDIO_CACHE_FILENAME_REGEXP = r'^hypertts-([0-9a-f]+)\.(mp3|ogg)$'
+# files accessed more recently than this are never evicted
+AUDIO_CACHE_EVICTION_MIN_AGE_SECONDS = 60
+AUDIO_CACHE_DEFAULT_NOT_FOUND_TTL_HOURS = 1
+AUDIO_CACHE_MAX_NOT_FOUND_TTL_HOURS = 24 * 365
+# prefetching spends quota on cards the user may not reach, off unless enabled
+AUDIO_CACHE_DEFAULT_REALTIME_PREFETCH_CARD_COUNT = 0
+AUDIO_CACHE_MAX_REALTIME_PREFETCH_CARD_COUNT = 20
+# upcoming cards are looked up once the card being shown has been displayed for this long
+AUDIO_CACHE_REALTIME_PREFETCH_DELAY_MS = 1000
+
 # prevent message boxes from getting too big
 MESSAGE_TEXT_MAX_LENGTH = 500
 
@@ -231,4 +305,8 @@ class Gender(enum.Enum):
 class ErrorDialogType(str, enum.Enum):
     Dialog = 'Dialog'
     Tooltip = 'Tooltip'
-    Nothing = 'Nothing'
\ No newline at end of file
+    Nothing = 'Nothing'
+
+class AudioCacheEvictionPolicy(str, enum.Enum):
+    LRU = 'LRU' # least recently used
+    LFU = 'LFU' # least frequently used
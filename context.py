@@ -3,8 +3,10 @@ import sys
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 
 class AudioRequestContext():
-    def __init__(self, audio_request_reason: constants.AudioRequestReason):
+    def __init__(self, audio_request_reason: constants.AudioRequestReason, realtime_preset=None):
         self.audio_request_reason = audio_request_reason
+        # realtime settings key the audio is requested for, if any
+        self.realtime_preset = realtime_preset
 
     def get_request_mode(self) -> constants.RequestMode:
         request_mode_map = {
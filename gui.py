@@ -26,6 +26,7 @@ component_configuration = __import__('component_configuration', globals(), local
 component_preferences = __import__('component_preferences', globals(), locals(), [], sys._addon_import_level_base)
 text_utils = __import__('text_utils', globals(), locals(), [], sys._addon_import_level_base)
 ttsplayer = __import__('ttsplayer', globals(), locals(), [], sys._addon_import_level_base)
+prefetch = __import__('prefetch', globals(), locals(), [], sys._addon_import_level_base)
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
 gui_utils = __import__('gui_utils', globals(), locals(), [], sys._addon_import_level_base)
 logger = logging_utils.get_child_logger(__name__)
@@ -264,4 +265,16 @@ def init(hypertts):
     aqt.gui_hooks.editor_did_init_buttons.append(setup_editor_buttons)
 
     # register TTS player
-    aqt.sound.av_player.players.append(ttsplayer.AnkiHyperTTSPlayer(aqt.mw.taskman, hypertts))
\ No newline at end of file
+    aqt.sound.av_player.players.append(ttsplayer.AnkiHyperTTSPlayer(aqt.mw.taskman, hypertts))
+
+    # get audio for the next cards in the reviewer ahead of time
+    realtime_prefetcher = prefetch.RealtimePrefetcher(hypertts)
+    aqt.gui_hooks.reviewer_did_show_question.append(realtime_prefetcher.card_shown)
+    aqt.gui_hooks.profile_will_close.append(realtime_prefetcher.close)
+
+    # config saves are delayed, write any pending changes before anki exits
+    aqt.gui_hooks.profile_will_close.append(hypertts.config_store.flush)
+    # audio cache hits are recorded in memory
+    aqt.gui_hooks.profile_will_close.append(hypertts.audio_cache.flush_hits)
+    # index the audio files written before the audio cache index existed
+    hypertts.schedule_audio_cache_backfill()
\ No newline at end of file
@@ -7,6 +7,12 @@ import hashlib
 import random
 import copy
 import json
+import collections
+import threading
+import time
+import tempfile
+import concurrent.futures
+from dataclasses import dataclass
 from typing import List, Dict
 import pprint
 
@@ -24,11 +30,83 @@ errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_b
 text_utils = __import__('text_utils', globals(), locals(), [], sys._addon_import_level_base)
 config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
 context = __import__('context', globals(), locals(), [], sys._addon_import_level_base)
+audio_cache = __import__('audio_cache', globals(), locals(), [], sys._addon_import_level_base)
+singleflight = __import__('singleflight', globals(), locals(), [], sys._addon_import_level_base)
+batch_status_module = __import__('batch_status', globals(), locals(), [], sys._addon_import_level_base)
+batch_journal = __import__('batch_journal', globals(), locals(), [], sys._addon_import_level_base)
+config_store = __import__('config_store', globals(), locals(), [], sys._addon_import_level_base)
+preset_store = __import__('preset_store', globals(), locals(), [], sys._addon_import_level_base)
+startup_timings = __import__('startup_timings', globals(), locals(), [], sys._addon_import_level_base)
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
 gui = __import__('gui', globals(), locals(), [], sys._addon_import_level_base)
 logger = logging_utils.get_child_logger(__name__)
 
 
+@dataclass
+class BatchNoteAudioRequest:
+    """a note which has been prepared for batch processing, audio synthesis may still be in flight"""
+    note_id: int
+    note: any = None
+    source_text: str = None
+    processed_text: str = None
+    request_key: str = None
+    future: concurrent.futures.Future = None
+    # (full filename, audio filename) when a previous note of the batch already got the audio for this request
+    audio_file: tuple = None
+    exception: Exception = None
+    # the target field already has the audio, nothing to do for this note
+    existing_sound_file: str = None
+
+class BatchNoteUpdates():
+    """
+    collects the notes modified by a batch and writes them to the collection in chunks: the audio files
+    for the chunk get registered with the media folder in bulk, then the notes are saved with a single
+    update_notes call, and recorded in the batch journal. whatever is left gets written when exiting the context,
+    even if the batch was interrupted, so that notes reported as done are saved.
+    """
+    def __init__(self, anki_utils, anki_collection, batch_status, chunk_size, stage_timings):
+        self.anki_utils = anki_utils
+        self.batch_status = batch_status
+        self.stage_timings = stage_timings
+        self.anki_collection = anki_collection
+        self.chunk_size = max(chunk_size, 1)
+        self.note_ids = []
+        self.notes = []
+        # notes with the same text share an audio file, which only needs to be registered once
+        self.media_files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.flush()
+        return False
+
+    def add_note(self, note_id, note, full_filename):
+        self.note_ids.append(note_id)
+        self.notes.append(note)
+        self.media_files[full_filename] = True
+        if len(self.notes) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.notes) == 0:
+            return
+        logger.debug(f'updating {len(self.notes)} notes, {len(self.media_files)} media files')
+        note_ids = self.note_ids
+        notes = self.notes
+        media_files = self.media_files
+        # cleared before writing, a chunk which failed to save isn't written again when exiting the context
+        self.note_ids = []
+        self.notes = []
+        self.media_files = {}
+        with self.stage_timings.time_stage(constants.BatchStage.update_note):
+            # media files need to be in place before notes refer to them
+            self.anki_utils.media_add_files(list(media_files.keys()))
+            self.anki_collection.update_notes(notes)
+            self.batch_status.record_saved_notes(note_ids)
+
+
 class HyperTTS():
     """
     should have awareness of:
@@ -43,34 +121,195 @@ class HyperTTS():
         self.service_manager = service_manager
         self.error_manager = errors.ErrorManager(self.anki_utils)
         self.config = self.anki_utils.get_config()
+        self.config_store = config_store.ConfigStore(self.anki_utils, self.config)
+        self.preset_store = preset_store.PresetStore(self.anki_utils, self.config, self.config_store)
         self.latest_saved_batch_name = None
+        # concurrent requests for the same audio file wait on a single synthesis
+        self.audio_single_flight = singleflight.SingleFlight()
+        # hedged priority voice requests from all callers share one pool, so that batches don't multiply its threads
+        self.hedged_request_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=constants.PRIORITY_VOICES_MAX_HEDGED_REQUEST_COUNT, thread_name_prefix='hypertts_hedged')
+        self.audio_cache = audio_cache.AudioCache(self.anki_utils)
+        self.audio_cache_eviction_lock = threading.Lock()
+        self.audio_cache_eviction_running = False
+        self.preferences_cache = None
+        self.preferences_cache_lock = threading.Lock()
 
         # do maintenance on the configuration
-        self.perform_config_migration()
-
+        with startup_timings.timings.time_phase('config migration'):
+            self.perform_config_migration()
+
+
+    def get_batch_journal(self, batch: config_models.BatchConfig, note_id_list):
+        return batch_journal.BatchJournal(self.anki_utils, batch_journal.BatchJournal.get_batch_id(batch, note_id_list), batch.uuid)
+
+    def process_batch_audio_journal(self, note_id_list, batch, batch_status, anki_collection, resume):
+        # progress is recorded on disk as notes get saved. when resuming, notes saved during
+        # a previous run are skipped. the journal is discarded once the batch completes
+        journal = self.get_batch_journal(batch, note_id_list)
+        remaining_note_id_list = note_id_list
+        if resume:
+            journal_entries = journal.load()
+            batch_status.load_journal_entries(journal_entries)
+            remaining_note_id_list = [note_id for note_id in note_id_list if note_id not in journal_entries]
+            logger.info(f'resuming batch {journal.batch_id}, {len(journal_entries)} notes already done, {len(remaining_note_id_list)} remaining')
+        else:
+            journal.start()
+        batch_status.set_journal(journal)
+        try:
+            self.process_batch_audio(remaining_note_id_list, batch, batch_status, anki_collection)
+        finally:
+            batch_status.set_journal(None)
+        if batch_status.must_continue:
+            journal.delete()
 
     def process_batch_audio(self, note_id_list, batch, batch_status, anki_collection):
-        # for each note, generate audio
+        # the batch runs as a pipeline of stages:
+        # - notes get loaded and their text processed on this thread, the only one which uses the collection
+        # - audio requests run on a bounded pool of worker threads, notes which make the same audio request share it
+        # - notes are updated and reported to batch_status in the order of note_id_list, then saved in chunks
+        batch_processing = self.get_cached_preferences().batch_processing
+        parallelism = batch_processing.parallelism
+        max_pending_notes = max(constants.BATCH_PROCESSING_MAX_PENDING_NOTES, parallelism)
+        audio_request_context = context.AudioRequestContext(constants.AudioRequestReason.batch)
+        stage_timings = batch_status_module.StageTimings()
+        batch_status.set_stage_timings(stage_timings)
+        note_updates = BatchNoteUpdates(self.anki_utils, anki_collection, batch_status, batch_processing.note_update_chunk_size, stage_timings)
         with batch_status.get_batch_running_action_context():
-
-            modified_notes = []
-
-            for note_id in note_id_list:
-                with batch_status.get_note_action_context(note_id, False) as note_action_context:
-                    note = self.anki_utils.get_note_by_id(note_id)
-                    # process note
-                    source_text, processed_text, sound_file, full_filename = self.process_note_audio(batch, note, False,
-                        context.AudioRequestContext(constants.AudioRequestReason.batch), None, anki_collection)
-                    # update note action context
-                    note_action_context.set_source_text(source_text)
-                    note_action_context.set_processed_text(processed_text)
-                    note_action_context.set_sound(sound_file)
-                    note_action_context.set_status(constants.BatchNoteStatus.Done)                    
-                    
-                    modified_notes.append(note)
+            with note_updates, concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+                # audio requests in flight, by request key. a request is dropped once no pending note waits for it,
+                # and its audio file kept, so that with random or priority voice selection, later notes with the same
+                # text get the same voice instead of requesting the audio again
+                audio_futures = {}
+                resolved_audio_files = {}
+                requested_keys = set()
+                pending_requests = collections.deque()
+                pending_request_keys = collections.Counter()
+                for request in self.prepare_batch_audio(note_id_list, batch, stage_timings):
+                    self.submit_batch_note_audio(executor, batch, request, audio_futures, resolved_audio_files, 
+                        audio_request_context, stage_timings)
+                    if request.future != None:
+                        requested_keys.add(request.request_key)
+                    pending_requests.append(request)
+                    pending_request_keys[request.request_key] += 1
+                    # complete notes whose audio is ready. don't get more than parallelism audio requests ahead
+                    # of the note being completed, or hold on to too many notes waiting for the same request
+                    while len(pending_requests) > 0 and batch_status.must_continue and \
+                        (self.batch_note_audio_ready(pending_requests[0]) or len(pending_request_keys) > parallelism \
+                         or len(pending_requests) > max_pending_notes):
+                        self.complete_pending_batch_note_audio(batch, pending_requests, pending_request_keys, audio_futures, 
+                            resolved_audio_files, batch_status, note_updates)
+                    if batch_status.must_continue == False:
+                        break
+                while len(pending_requests) > 0 and batch_status.must_continue:
+                    self.complete_pending_batch_note_audio(batch, pending_requests, pending_request_keys, audio_futures, 
+                        resolved_audio_files, batch_status, note_updates)
                 if batch_status.must_continue == False:
                     logger.info('batch_status execution interrupted')
-                    break
+                    for request in pending_requests:
+                        if request.future != None:
+                            request.future.cancel()
+            batch_status.set_unique_request_count(len(requested_keys))
+            logger.info(f'batch audio for {len(note_id_list)} notes, {len(requested_keys)} unique audio requests, '
+                f'stage timings: {stage_timings.get_summary()}')
+
+    def prepare_batch_audio(self, note_id_list, batch: config_models.BatchConfig, stage_timings):
+        # load each note and process its text, so that duplicate audio requests can be found
+        only_changed_notes = self.get_cached_preferences().batch_processing.only_changed_notes
+        for note_id in note_id_list:
+            request = BatchNoteAudioRequest(note_id)
+            try:
+                with stage_timings.time_stage(constants.BatchStage.load_note):
+                    request.note = self.anki_utils.get_note_by_id(note_id)
+                if batch.target.target_field not in request.note:
+                    raise errors.TargetFieldNotFoundError(batch.target.target_field)
+                with stage_timings.time_stage(constants.BatchStage.process_text):
+                    request.source_text = self.get_source_text(request.note, batch.source, None)
+                    request.processed_text = self.process_text(request.source_text, batch.text_processing)
+                    request.request_key = self.get_batch_request_key(request.processed_text, batch.voice_selection)
+                    if only_changed_notes:
+                        request.existing_sound_file = self.get_existing_sound_file(request.note, batch, request.processed_text)
+            except Exception as e:
+                # will be reported when the note gets completed, so that errors show up in order
+                request.exception = e
+            yield request
+
+    def get_existing_sound_file(self, note, batch: config_models.BatchConfig, processed_text):
+        # with a single voice, the audio file the note would get is known before requesting it. if the target
+        # field already refers to it (possibly under its name from before the canonical hash), return it
+        if batch.voice_selection.selection_mode != constants.VoiceSelectionMode.single:
+            return None
+        voice_with_options = batch.voice_selection.voice
+        format = self.get_audio_format(voice_with_options.options)
+        target_field_content = note[batch.target.target_field]
+        for hash_str in [self.get_hash_for_audio_request(processed_text, voice_with_options.voice, voice_with_options.options),
+            self.get_legacy_hash_for_audio_request(processed_text, voice_with_options.voice, voice_with_options.options)]:
+            audio_filename = self.get_audio_filename(hash_str, format)
+            if f'[sound:{audio_filename}]' in target_field_content:
+                return audio_filename
+        return None
+
+    def get_batch_request_key(self, processed_text, voice_selection):
+        # with a single voice, this is the hash of the audio request. with random or priority voice selection, the voice
+        # is only chosen when requesting audio, and notes with the same text share the chosen voice
+        if voice_selection.selection_mode == constants.VoiceSelectionMode.single:
+            voice_with_options = voice_selection.voice
+            return self.get_hash_for_audio_request(processed_text, voice_with_options.voice, voice_with_options.options)
+        return processed_text
+
+    def submit_batch_note_audio(self, executor, batch: config_models.BatchConfig, request: BatchNoteAudioRequest, audio_futures, 
+            resolved_audio_files, audio_request_context, stage_timings):
+        if request.exception != None or request.existing_sound_file != None:
+            return
+        if request.request_key in resolved_audio_files:
+            request.audio_file = resolved_audio_files[request.request_key]
+            return
+        if request.request_key not in audio_futures:
+            audio_futures[request.request_key] = executor.submit(self.get_batch_audio_file, request.processed_text, 
+                batch.voice_selection, audio_request_context, stage_timings)
+        request.future = audio_futures[request.request_key]
+
+    def get_batch_audio_file(self, processed_text, voice_selection, audio_request_context, stage_timings):
+        with stage_timings.time_stage(constants.BatchStage.synthesis):
+            return self.get_audio_file(processed_text, voice_selection, audio_request_context)
+
+    def batch_note_audio_ready(self, request: BatchNoteAudioRequest):
+        return request.future == None or request.future.done()
+
+    def complete_pending_batch_note_audio(self, batch: config_models.BatchConfig, pending_requests, pending_request_keys, audio_futures, 
+            resolved_audio_files, batch_status, note_updates):
+        request = pending_requests.popleft()
+        self.complete_batch_note_audio(batch, request, batch_status, note_updates)
+        pending_request_keys[request.request_key] -= 1
+        if pending_request_keys[request.request_key] == 0:
+            del pending_request_keys[request.request_key]
+            future = audio_futures.pop(request.request_key, None)
+            if future != None and not future.cancelled() and future.exception() == None:
+                resolved_audio_files[request.request_key] = future.result()
+
+    def complete_batch_note_audio(self, batch: config_models.BatchConfig, request: BatchNoteAudioRequest, batch_status, note_updates):
+        with batch_status.get_note_action_context(request.note_id, False) as note_action_context:
+            if request.exception != None:
+                raise request.exception
+            if request.existing_sound_file != None:
+                note_action_context.set_source_text(request.source_text)
+                note_action_context.set_processed_text(request.processed_text)
+                note_action_context.set_sound(request.existing_sound_file)
+                note_action_context.set_status(constants.BatchNoteStatus.Unchanged)
+                return
+            if request.audio_file != None:
+                full_filename, audio_filename = request.audio_file
+            else:
+                full_filename, audio_filename = request.future.result()
+            # the audio file gets added to the collection along with the note
+            sound_tag, sound_file = self.get_sound_tag(audio_filename)
+            self.set_target_field_sound_tag(batch.target, request.note, sound_tag)
+            note_updates.add_note(request.note_id, request.note, full_filename)
+            # update note action context
+            note_action_context.set_source_text(request.source_text)
+            note_action_context.set_processed_text(request.processed_text)
+            note_action_context.set_sound(sound_file)
+            note_action_context.set_status(constants.BatchNoteStatus.Done)
 
     def process_note_audio(self, batch: config_models.BatchConfig, note, add_mode, audio_request_context, text_override, anki_collection):
         target_field = batch.target.target_field
@@ -84,13 +323,21 @@ class HyperTTS():
         full_filename, audio_filename = self.get_audio_file(processed_text, batch.voice_selection, audio_request_context)
         sound_tag, sound_file = self.get_collection_sound_tag(full_filename, audio_filename)
 
+        self.set_target_field_sound_tag(batch.target, note, sound_tag)
+        if not add_mode:
+            anki_collection.update_note(note)
+
+        return source_text, processed_text, sound_file, full_filename
+
+    def set_target_field_sound_tag(self, batch_target: config_models.BatchTarget, note, sound_tag):
+        target_field = batch_target.target_field
         target_field_content = note[target_field]
         
         # do we need to remove existing sound tags ?
-        if batch.target.remove_sound_tag == True:
+        if batch_target.remove_sound_tag == True:
             target_field_content = self.strip_sound_tag(target_field_content)
         
-        if batch.target.text_and_sound_tag == True:
+        if batch_target.text_and_sound_tag == True:
             # user wants text and sound tag together, append the sound tag
             target_field_content = f'{target_field_content} {sound_tag}'
         else:
@@ -101,10 +348,6 @@ class HyperTTS():
         target_field_content = target_field_content.strip()
 
         note[target_field] = target_field_content
-        if not add_mode:
-            anki_collection.update_note(note)
-
-        return source_text, processed_text, sound_file, full_filename
 
     def get_note_audio(self, batch, note, audio_request_context, text_override):
         source_text = self.get_source_text(note, batch.source, text_override)
@@ -113,12 +356,13 @@ class HyperTTS():
             raise errors.SourceTextEmpty()        
         return self.get_audio_file(processed_text, batch.voice_selection, audio_request_context)
 
-    def get_realtime_audio(self, realtime_model: config_models.RealtimeConfigSide, text):
+    def get_realtime_audio(self, realtime_model: config_models.RealtimeConfigSide, text, realtime_preset=None):
         source_text = text
         processed_text = text_utils.process_text(source_text, realtime_model.text_processing)
         if len(processed_text) == 0:
             raise errors.SourceTextEmpty()
-        return self.get_audio_file(processed_text, realtime_model.voice_selection, context.AudioRequestContext(constants.AudioRequestReason.realtime))
+        audio_request_context = context.AudioRequestContext(constants.AudioRequestReason.realtime, realtime_preset=realtime_preset)
+        return self.get_audio_file(processed_text, realtime_model.voice_selection, audio_request_context)
 
     def get_audio_file(self, processed_text, voice_selection, audio_request_context):
         # sanity checks
@@ -130,6 +374,9 @@ class HyperTTS():
         voice_list = None
         priority_mode = voice_selection.selection_mode == constants.VoiceSelectionMode.priority
         if priority_mode:
+            priority_voices = self.get_cached_preferences().priority_voices
+            if priority_voices.hedged_request_count > 1 and len(voice_selection.voice_list) > 1:
+                return self.get_audio_file_hedged(processed_text, voice_selection, audio_request_context, priority_voices)
             voice_list = copy.copy(voice_selection.voice_list)
         sound_found = False
         # loop while we haven't found the sound. this will be used for priority mode
@@ -137,11 +384,7 @@ class HyperTTS():
         while loop_condition:
             try:
                 voice_with_options = self.choose_voice(voice_selection, voice_list)
-                logger.debug(f'about to generate audio file and write to file for {processed_text}')
-                full_filename, audio_filename = self.generate_audio_write_file(processed_text, 
-                    voice_with_options.voice, voice_with_options.options, audio_request_context)
-                logger.debug(f'finished generating audio file and write to file for {processed_text}')
-                return full_filename, audio_filename
+                return self.get_voice_audio_file(processed_text, voice_with_options, audio_request_context)
             except errors.AudioNotFoundError as exc:
                 # try the next voice, as long as one is available
                 if not priority_mode:
@@ -150,6 +393,66 @@ class HyperTTS():
             loop_condition = priority_mode and sound_found == False and len(voice_list) > 0
         raise errors.AudioNotFoundAnyVoiceError(processed_text)
 
+    def get_audio_file_hedged(self, processed_text, voice_selection, audio_request_context, priority_voices: config_models.PriorityVoices):
+        # request the top voices of the priority list concurrently, each one after a stagger delay. the result is still
+        # the first voice in priority order which has the audio, we just don't wait for a miss before asking the next voice.
+        voice_list = copy.copy(voice_selection.voice_list)
+        hedged_request_count = priority_voices.hedged_request_count
+        stagger_seconds = priority_voices.hedged_request_stagger_ms / 1000.0
+        done_event = threading.Event()
+        pending_futures = collections.deque()
+        executor = self.hedged_request_executor
+        try:
+            while len(voice_list) > 0 or len(pending_futures) > 0:
+                while len(voice_list) > 0 and len(pending_futures) < hedged_request_count:
+                    # the highest priority pending voice starts right away
+                    delay_seconds = stagger_seconds * len(pending_futures)
+                    pending_futures.append(executor.submit(self.get_hedged_voice_audio_file, 
+                        processed_text, voice_list.pop(0), audio_request_context, delay_seconds, done_event))
+                try:
+                    return pending_futures.popleft().result()
+                except errors.AudioNotFoundError:
+                    pass
+            raise errors.AudioNotFoundAnyVoiceError(processed_text)
+        finally:
+            # lower priority requests which haven't started don't get made, those in flight are discarded
+            done_event.set()
+            for future in pending_futures:
+                future.cancel()
+
+    def get_hedged_voice_audio_file(self, processed_text, voice_with_options, audio_request_context, delay_seconds, done_event):
+        if delay_seconds > 0:
+            done_event.wait(delay_seconds)
+        if done_event.is_set():
+            # a higher priority voice already returned audio, while this request was waiting its turn
+            return None
+        return self.get_voice_audio_file(processed_text, voice_with_options, audio_request_context, done_event=done_event)
+
+    def get_voice_audio_file(self, processed_text, voice_with_options, audio_request_context, done_event=None):
+        try:
+            self.check_audio_not_found(processed_text, voice_with_options.voice)
+            logger.debug(f'about to generate audio file and write to file for {processed_text}')
+            full_filename, audio_filename = self.generate_audio_write_file(processed_text, 
+                voice_with_options.voice, voice_with_options.options, audio_request_context)
+            logger.debug(f'finished generating audio file and write to file for {processed_text}')
+            return full_filename, audio_filename
+        except errors.AudioNotFoundError as exc:
+            # discarded hedged requests don't record anything
+            if done_event == None or not done_event.is_set():
+                self.record_audio_not_found(processed_text, voice_with_options.voice)
+            raise exc
+
+    def check_audio_not_found(self, processed_text, voice):
+        # skip services which recently didn't have audio for this text
+        not_found_ttl_hours = self.get_cached_preferences().audio_cache.not_found_ttl_hours
+        if not_found_ttl_hours > 0 and self.audio_cache.is_audio_not_found(voice.service.name, voice.voice_key, processed_text, not_found_ttl_hours * 3600):
+            logger.info(f'audio known not to be found for [{processed_text}] (voice: {voice})')
+            raise errors.AudioNotFoundError(processed_text, voice)
+
+    def record_audio_not_found(self, processed_text, voice):
+        if self.get_cached_preferences().audio_cache.not_found_ttl_hours > 0:
+            self.audio_cache.add_audio_not_found(voice.service.name, voice.voice_key, processed_text)
+
     def choose_voice(self, voice_selection, voice_list) -> config_models.VoiceWithOptions:
         if voice_selection.selection_mode == constants.VoiceSelectionMode.single:
             return voice_selection.voice
@@ -192,7 +495,7 @@ class HyperTTS():
 
     def editor_note_process_rule(self, rule: config_models.MappingRule, editor_context: config_models.EditorContext):
         """process a single rule, unconditionally"""
-        preset = self.load_preset(rule.preset_id)
+        preset = self.get_cached_preset(rule.preset_id)
         self.editor_note_add_audio(preset, editor_context)
 
 
@@ -316,7 +619,7 @@ class HyperTTS():
         def preview_fn():
             for absolute_index, subset_index, rule in preset_mapping_rules.iterate_applicable_rules(deck_note_type, False):
                 logger.debug(f'previewing audio for rule {rule}')
-                preset = self.load_preset(rule.preset_id)
+                preset = self.get_cached_preset(rule.preset_id)
                 # self.anki_utils.tooltip_message(f'Previewing audio for rule {preset.name}')
                 self.anki_utils.run_on_main(lambda: self.anki_utils.tooltip_message(f'Previewing audio for {preset.name}'))
                 self.preview_note_audio_editor(preset, editor_context)
@@ -344,7 +647,7 @@ class HyperTTS():
         def apply_fn():
             for absolute_index, subset_index, rule in preset_mapping_rules.iterate_applicable_rules(deck_note_type, False):
                 logger.debug(f'previewing audio for rule {rule}')
-                preset = self.load_preset(rule.preset_id)
+                preset = self.get_cached_preset(rule.preset_id)
                 # self.anki_utils.tooltip_message(f'Previewing audio for rule {preset.name}')
                 self.anki_utils.run_on_main(lambda: self.anki_utils.tooltip_message(f'Generating audio for {preset.name}'))
                 self.editor_note_add_audio(preset, editor_context)
@@ -372,31 +675,179 @@ class HyperTTS():
     # processing of sound tags / collection stuff
     # ===========================================
 
-    def generate_audio_write_file(self, source_text, voice, voice_options, audio_request_context):
+    def get_audio_format(self, voice_options):
         format = options.AudioFormat.mp3 # default to mp3
         if options.AUDIO_FORMAT_PARAMETER in voice_options:
             format = options.AudioFormat[voice_options[options.AUDIO_FORMAT_PARAMETER]]
+        return format
+
+    def generate_audio_write_file(self, source_text, voice, voice_options, audio_request_context):
+        format = self.get_audio_format(voice_options)
 
         # write to user files directory
         hash_str = self.get_hash_for_audio_request(source_text, voice, voice_options)
         audio_filename = self.get_audio_filename(hash_str, format)
         full_filename = self.get_full_audio_file_name(hash_str, format)
         logger.info(f'requesting audio for hash {hash_str}, full filename {full_filename}')
-        if not os.path.exists(full_filename) or os.path.getsize(full_filename) == 0:
+        self.audio_single_flight.do(hash_str, 
+            lambda: self.write_audio_file(hash_str, source_text, voice, voice_options, format, audio_request_context, audio_filename, full_filename))
+        return full_filename, audio_filename
+
+    def write_audio_file(self, hash_str, source_text, voice, voice_options, format, audio_request_context, audio_filename, full_filename):
+        realtime_preset = None
+        if audio_request_context != None:
+            realtime_preset = audio_request_context.realtime_preset
+        in_index = self.audio_cache.lookup(hash_str, realtime_preset=realtime_preset) != None
+        size = self.get_file_size(full_filename)
+        if in_index and size > 0:
+            logger.info(f'file exists in cache')
+            return
+        if in_index:
+            # the file was deleted outside of HyperTTS, request it again
+            logger.warning(f'audio cache index refers to missing file {full_filename}, removing it')
+            self.audio_cache.remove_entry(hash_str)
+        if size > 0:
+            # file was written before the cache index existed
+            logger.info(f'file exists in cache, adding it to the index')
+        elif self.migrate_legacy_audio_file(source_text, voice, voice_options, format, full_filename):
+            size = os.path.getsize(full_filename)
+        else:
             audio_data = self.service_manager.get_tts_audio(source_text, voice, voice_options, audio_request_context)
             logger.info(f'not found in cache, requesting')
-            logger.debug(f'opening {full_filename}')
-            f = open(full_filename, 'wb')
-            logger.debug(f'done opening {full_filename}')
-            f.write(audio_data)
-            logger.debug(f'wrote audio data')
-            f.close()
-        else:
-            logger.info(f'file exists in cache')
-        return full_filename, audio_filename
+            self.write_file_atomic(full_filename, audio_data)
+            size = len(audio_data)
+        self.audio_cache.add_entry(hash_str, audio_filename, size, voice.service.name, voice.voice_key, format.name, realtime_preset=realtime_preset)
+        self.schedule_audio_cache_eviction()
+
+    def get_file_size(self, full_filename):
+        # a single stat, 0 if the file doesn't exist
+        try:
+            return os.stat(full_filename).st_size
+        except FileNotFoundError:
+            return 0
+
+    def write_file_atomic(self, full_filename, data):
+        # write to a temporary file first, so that a partially written file never appears under the final name
+        file_descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(full_filename), suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temp_filename, full_filename)
+        except:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+        logger.debug(f'wrote audio data to {full_filename}')
+
+    def migrate_legacy_audio_file(self, source_text, voice, voice_options, format, full_filename):
+        # if the audio was cached under its legacy hash, rename the file to the canonical name.
+        # notes refer to the copy in the collection media, they are unaffected
+        legacy_hash_str = self.get_legacy_hash_for_audio_request(source_text, voice, voice_options)
+        legacy_full_filename = self.get_full_audio_file_name(legacy_hash_str, format)
+        if legacy_full_filename == full_filename:
+            return False
+        if not os.path.exists(legacy_full_filename) or os.path.getsize(legacy_full_filename) == 0:
+            return False
+        logger.info(f'found audio under legacy hash {legacy_hash_str}, renaming to {full_filename}')
+        os.replace(legacy_full_filename, full_filename)
+        self.audio_cache.remove_entry(legacy_hash_str)
+        return True
+
+    # audio cache eviction
+    # ====================
+
+    def schedule_audio_cache_backfill(self):
+        # files written before the cache index existed only get indexed once
+        if self.audio_cache.is_backfill_done():
+            return
+        self.anki_utils.run_in_background(self.backfill_audio_cache, self.backfill_audio_cache_done)
+
+    def backfill_audio_cache(self):
+        # adds the audio files already in user_files to the index in small chunks, pausing in between.
+        # their modification time stands for the last access, so that they get evicted first
+        entries = []
+        file_count = 0
+        with os.scandir(self.anki_utils.get_user_files_dir()) as dir_entries:
+            for dir_entry in dir_entries:
+                match = re.match(constants.AUDIO_CACHE_FILENAME_REGEXP, dir_entry.name)
+                if match == None or not dir_entry.is_file():
+                    continue
+                stat_result = dir_entry.stat()
+                entries.append((match.group(1), dir_entry.name, stat_result.st_size, stat_result.st_mtime))
+                if len(entries) >= constants.AUDIO_CACHE_EVICTION_BATCH_SIZE:
+                    self.audio_cache.add_missing_entries(entries)
+                    file_count += len(entries)
+                    entries = []
+                    time.sleep(constants.AUDIO_CACHE_EVICTION_PAUSE_SECONDS)
+        self.audio_cache.add_missing_entries(entries)
+        file_count += len(entries)
+        self.audio_cache.set_backfill_done()
+        logger.info(f'audio cache backfill done, found {file_count} files')
+
+    def backfill_audio_cache_done(self, result):
+        with self.error_manager.get_single_action_context('Indexing Audio Cache'):
+            result.result()
+            # the files found may put the cache over budget
+            self.schedule_audio_cache_eviction()
+
+    def schedule_audio_cache_eviction(self):
+        audio_cache_preferences = self.get_cached_preferences().audio_cache
+        if audio_cache_preferences.max_size_mb == 0:
+            return
+        if self.audio_cache.get_evictable_size() <= audio_cache_preferences.max_size_mb * 1024 * 1024:
+            return
+        with self.audio_cache_eviction_lock:
+            if self.audio_cache_eviction_running:
+                return
+            self.audio_cache_eviction_running = True
+        self.anki_utils.run_on_main(lambda: self.anki_utils.run_in_background(
+            lambda: self.evict_audio_cache(audio_cache_preferences), self.evict_audio_cache_done))
+
+    def evict_audio_cache(self, audio_cache_preferences: config_models.AudioCache):
+        # deletes files in small chunks, pausing in between, until the cache fits within its budget.
+        # files added to the collection media are flagged so that they don't count against the budget any more.
+        max_size = audio_cache_preferences.max_size_mb * 1024 * 1024
+        # candidates are ordered by access, which needs the recent hits
+        self.audio_cache.flush_hits()
+        accessed_before = time.time() - constants.AUDIO_CACHE_EVICTION_MIN_AGE_SECONDS
+        total_size = self.audio_cache.get_evictable_size()
+        evicted_count = 0
+        while total_size > max_size:
+            entries = self.audio_cache.get_eviction_candidates(audio_cache_preferences.eviction_policy, 
+                audio_cache_preferences.pinned_realtime_presets, accessed_before, constants.AUDIO_CACHE_EVICTION_BATCH_SIZE)
+            if len(entries) == 0:
+                logger.warning(f'audio cache size {total_size} exceeds budget {max_size}, but all remaining files are pinned or recently used')
+                break
+            for entry in entries:
+                if self.anki_utils.media_file_exists(entry.filename):
+                    self.audio_cache.set_in_collection(entry.hash_str)
+                    total_size -= entry.size
+                    if total_size <= max_size:
+                        break
+                    continue
+                full_filename = os.path.join(self.anki_utils.get_user_files_dir(), entry.filename)
+                if os.path.exists(full_filename):
+                    os.remove(full_filename)
+                self.audio_cache.remove_entry(entry.hash_str)
+                total_size -= entry.size
+                evicted_count += 1
+                if total_size <= max_size:
+                    break
+            time.sleep(constants.AUDIO_CACHE_EVICTION_PAUSE_SECONDS)
+        logger.info(f'audio cache eviction done, evicted {evicted_count} files, cache size: {total_size}')
+        return evicted_count
+
+    def evict_audio_cache_done(self, result):
+        with self.audio_cache_eviction_lock:
+            self.audio_cache_eviction_running = False
+        with self.error_manager.get_single_action_context('Cleaning up Audio Cache'):
+            result.result()
 
     def get_collection_sound_tag(self, full_filename, audio_filename):
         self.anki_utils.media_add_file(full_filename)
+        return self.get_sound_tag(audio_filename)
+
+    def get_sound_tag(self, audio_filename):
         return f'[sound:{audio_filename}]', audio_filename
 
     def get_full_audio_file_name(self, hash_str, format: options.AudioFormat):
@@ -419,6 +870,20 @@ class HyperTTS():
         return filename
 
     def get_hash_for_audio_request(self, source_text, voice, options):
+        # canonical key: independent of dict ordering, and of options explicitly set to the voice's default
+        if self.get_cached_preferences().audio_cache.normalize_whitespace:
+            source_text = re.sub(r'\s+', ' ', source_text).strip()
+        non_default_options = {key: value for key, value in options.items()
+            if not (key in voice.options and voice.options[key].get('default', None) == value)}
+        combined_data = {
+            'source_text': source_text,
+            'voice_key': voice.voice_key,
+            'options': non_default_options
+        }
+        return hashlib.sha224(json.dumps(combined_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get_legacy_hash_for_audio_request(self, source_text, voice, options):
+        # how audio files were named before the canonical key, used to find files already in the cache
         combined_data = {
             'source_text': source_text,
             'voice_key': voice.voice_key,
@@ -441,7 +906,8 @@ class HyperTTS():
     def get_audio_filename_tts_tag(self, tts_tag):
         hypertts_preset = self.extract_hypertts_preset(tts_tag.other_args)
         realtime_side_model = self.get_realtime_side_config(hypertts_preset)
-        full_filename, audio_filename = self.get_realtime_audio(realtime_side_model, tts_tag.field_text)
+        full_filename, audio_filename = self.get_realtime_audio(realtime_side_model, tts_tag.field_text, 
+            realtime_preset=self.get_realtime_settings_key(hypertts_preset))
         return full_filename
 
     def build_realtime_tts_tag(self, realtime_side_model: config_models.RealtimeConfigSide, setting_key):
@@ -474,15 +940,21 @@ class HyperTTS():
         return components[1]
 
     def get_realtime_side_config(self, hypertts_preset):
-        # based 
+        # called for every tag during review, so the deserialized config is cached. the cached objects are
+        # shared and must not be modified, use load_realtime_config to edit a preset
+        settings_key = self.get_realtime_settings_key(hypertts_preset)
+        realtime_model = self.preset_store.get_object(constants.CONFIG_REALTIME_CONFIG, settings_key, self.deserialize_realtime_config)
+        if realtime_model == None:
+            raise errors.RealtimePresetNotFound(settings_key)
         if constants.AnkiCardSide.Front.name in hypertts_preset:
-            # front
-            preset_name = hypertts_preset.replace(constants.AnkiCardSide.Front.name + '_', '')
-            return self.load_realtime_config(preset_name).front
+            return realtime_model.front
         else:
-            # back
-            preset_name = hypertts_preset.replace(constants.AnkiCardSide.Back.name + '_', '')
-            return self.load_realtime_config(preset_name).back
+            return realtime_model.back
+
+    def get_realtime_settings_key(self, hypertts_preset):
+        if constants.AnkiCardSide.Front.name in hypertts_preset:
+            return hypertts_preset.replace(constants.AnkiCardSide.Front.name + '_', '')
+        return hypertts_preset.replace(constants.AnkiCardSide.Back.name + '_', '')
 
 
     def card_template_has_tts_tag(self, note, side, card_ord):
@@ -604,7 +1076,7 @@ class HyperTTS():
     def get_fields_from_note(self, note):
         return list(note.keys())
 
-    def populate_batch_status_processed_text(self, note_id_list, batch_source, text_processing, batch_status):
+    def populate_batch_status_processed_text(self, note_id_list, batch_source, text_processing, batch_status, voice_selection=None):
         with batch_status.get_batch_running_action_context():
             for note_id in note_id_list:
                 with batch_status.get_note_action_context(note_id, True) as note_action_context:
@@ -616,6 +1088,14 @@ class HyperTTS():
                 if batch_status.must_continue == False:
                     logger.info('batch_status execution interrupted')
                     break
+            # notes which make the same audio request share it. without a voice selection, count distinct texts
+            processed_text_list = [note_status.processed_text for note_status in batch_status.note_status_array 
+                if note_status.status == constants.BatchNoteStatus.OK and note_status.processed_text]
+            if voice_selection != None:
+                request_keys = set([self.get_batch_request_key(processed_text, voice_selection) for processed_text in processed_text_list])
+            else:
+                request_keys = set(processed_text_list)
+            batch_status.set_unique_request_count(len(request_keys))
 
     def get_source_processed_text(self, note, batch_source, text_processing):
         source_text = self.get_source_text(note, batch_source, None)
@@ -629,39 +1109,41 @@ class HyperTTS():
     # presets
     
     def get_preset_list(self) -> List[config_models.PresetInfo]:
-        if constants.CONFIG_PRESETS not in self.config:
-            return []
         preset_list = []
-        for preset_id, preset_data in self.config[constants.CONFIG_PRESETS].items():
-            preset_list.append(config_models.PresetInfo(id=preset_id, name=preset_data['name']))
+        for preset_id, preset_name in self.preset_store.get_names(constants.CONFIG_PRESETS).items():
+            preset_list.append(config_models.PresetInfo(id=preset_id, name=preset_name))
         # sort alphabetically
         preset_list.sort(key=lambda x: x.name)
         return preset_list
 
     def save_preset(self, preset: config_models.BatchConfig):
         preset.validate()
-        if constants.CONFIG_PRESETS not in self.config:
-            self.config[constants.CONFIG_PRESETS] = {}
-        self.config[constants.CONFIG_PRESETS][preset.uuid] = preset.serialize()
-        self.anki_utils.write_config(self.config)
+        self.preset_store.put(constants.CONFIG_PRESETS, preset.uuid, preset.name, preset.serialize())
         logger.info(f'saved preset [{preset.name}]')
 
     def load_preset(self, preset_id: str) -> config_models.BatchConfig:
         logger.info(f'loading preset [{preset_id}]')
-        if preset_id not in self.config[constants.CONFIG_PRESETS]:
+        stored_preset = self.preset_store.get(constants.CONFIG_PRESETS, preset_id)
+        if stored_preset == None:
             raise errors.PresetNotFound(preset_id)
-        return self.deserialize_batch_config(self.config[constants.CONFIG_PRESETS][preset_id])
+        return self.deserialize_batch_config(stored_preset.data)
+
+    def get_cached_preset(self, preset_id: str) -> config_models.BatchConfig:
+        """same as load_preset, but the preset is shared with other callers and must not be modified"""
+        preset = self.preset_store.get_object(constants.CONFIG_PRESETS, preset_id, self.deserialize_batch_config)
+        if preset == None:
+            raise errors.PresetNotFound(preset_id)
+        return preset
 
     def get_preset_name(self, preset_id: str) -> str:
-        if preset_id not in self.config[constants.CONFIG_PRESETS]:
+        preset_names = self.preset_store.get_names(constants.CONFIG_PRESETS)
+        if preset_id not in preset_names:
             raise errors.PresetNotFound(preset_id)        
-        return self.config[constants.CONFIG_PRESETS][preset_id]['name']
+        return preset_names[preset_id]
 
     def delete_preset(self, preset_id: str):
-        if preset_id not in self.config[constants.CONFIG_PRESETS]:
+        if not self.preset_store.delete(constants.CONFIG_PRESETS, preset_id):
             raise errors.PresetNotFound(preset_id)
-        del self.config[constants.CONFIG_PRESETS][preset_id]
-        self.anki_utils.write_config(self.config)        
 
     def get_next_preset_name(self) -> str:
         """returns the next available preset name which doesn't collide with others"""
@@ -679,7 +1161,7 @@ class HyperTTS():
     # mapping rules
     def save_mapping_rules(self, mapping_rules: config_models.PresetMappingRules):
         self.config[constants.CONFIG_MAPPING_RULES] = config_models.serialize_preset_mapping_rules(mapping_rules)
-        self.anki_utils.write_config(self.config)
+        self.config_store.save()
         logger.info('saved mapping rules')
 
     def load_mapping_rules(self) -> config_models.PresetMappingRules:
@@ -691,30 +1173,30 @@ class HyperTTS():
 
     def save_realtime_config(self, realtime_model, settings_key):
         realtime_model.validate()
-        if constants.CONFIG_REALTIME_CONFIG not in self.config:
-            self.config[constants.CONFIG_REALTIME_CONFIG] = {}
         
         if settings_key == None:
             # find a free name
+            existing_keys = set(self.get_realtime_preset_keys())
             key_index = 0
             candidate_key = f'realtime_{key_index}'
-            while candidate_key in self.config[constants.CONFIG_REALTIME_CONFIG]:
+            while candidate_key in existing_keys:
                 key_index += 1
                 candidate_key = f'realtime_{key_index}'
             final_key = candidate_key
         else:
             # use the key provided
             final_key = settings_key
-        self.config[constants.CONFIG_REALTIME_CONFIG][final_key] = realtime_model.serialize()
-        self.anki_utils.write_config(self.config)
+        self.preset_store.put(constants.CONFIG_REALTIME_CONFIG, final_key, None, realtime_model.serialize())
         return final_key
 
     def load_realtime_config(self, settings_key):
         logger.info(f'loading realtime config [{settings_key}]')
-        if settings_key not in self.config[constants.CONFIG_REALTIME_CONFIG]:
+        stored_realtime_config = self.preset_store.get(constants.CONFIG_REALTIME_CONFIG, settings_key)
+        if stored_realtime_config == None:
             raise errors.RealtimePresetNotFound(settings_key)
-        realtime_config = self.config[constants.CONFIG_REALTIME_CONFIG][settings_key]
-        logger.info(f'loaded realtime config {pprint.pformat(realtime_config, compact=True, width=500)}')
+        realtime_config = stored_realtime_config.data
+        if logging_utils.debug_logging_enabled():
+            logger.debug(f'loaded realtime config {pprint.pformat(realtime_config, compact=True, width=500)}')
         return self.deserialize_realtime_config(realtime_config)
 
     # services config
@@ -722,8 +1204,29 @@ class HyperTTS():
     def save_configuration(self, configuration_model):
         configuration_model = self.service_manager.remove_non_existent_services(configuration_model)
         configuration_model.validate()
+        # serialized again so that missing entries have their default value
+        previous_configuration = config_models.serialize_configuration(self.get_configuration())
         self.config[constants.CONFIG_CONFIGURATION] = config_models.serialize_configuration(configuration_model)
-        self.anki_utils.write_config(self.config)
+        self.config_store.save()
+        # voices in cached presets may have changed
+        self.preset_store.clear_object_cache()
+        self.clear_audio_not_found_for_changed_services(previous_configuration, self.config[constants.CONFIG_CONFIGURATION])
+
+    def clear_audio_not_found_for_changed_services(self, previous_configuration, configuration):
+        # a service which didn't have audio may have it once it's configured differently, for example with
+        # a new api key after its subscription expired
+        pro_keys = ['hypertts_pro_api_key', 'use_vocabai_api', 'vocabai_api_url_override']
+        if any([previous_configuration.get(key, None) != configuration.get(key, None) for key in pro_keys]):
+            logger.info('HyperTTS Pro configuration changed, clearing the audio not found cache')
+            self.audio_cache.remove_audio_not_found()
+            return
+        for config_key in ['service_enabled', 'service_config']:
+            previous_services = previous_configuration.get(config_key, {})
+            services = configuration.get(config_key, {})
+            for service_name in set(previous_services.keys()).union(services.keys()):
+                if previous_services.get(service_name, None) != services.get(service_name, None):
+                    logger.info(f'configuration of {service_name} changed, clearing its audio not found cache')
+                    self.audio_cache.remove_audio_not_found(service_name)
 
     def get_configuration(self):
         return self.deserialize_configuration(self.config.get(constants.CONFIG_CONFIGURATION, {}))
@@ -733,25 +1236,42 @@ class HyperTTS():
 
     def set_editor_use_selection(self, use_selection):
         self.config[constants.CONFIG_USE_SELECTION] = use_selection
-        self.anki_utils.write_config(self.config)
+        self.config_store.save()
 
     def get_editor_use_selection(self):
         return self.config.get(constants.CONFIG_USE_SELECTION, False)
 
     # preferences
     def get_preferences(self):
+        """a new Preferences object, which the caller may modify and save"""
         return self.deserialize_preferences(self.config.get(constants.CONFIG_PREFERENCES, {}))
 
+    def get_cached_preferences(self):
+        """
+        Preferences object shared between callers, it must not be modified. it's deserialized once after
+        each save, audio requests read the preferences several times each
+        """
+        with self.preferences_cache_lock:
+            if self.preferences_cache == None:
+                self.preferences_cache = self.get_preferences()
+            return self.preferences_cache
+
+    def get_realtime_preset_keys(self):
+        return self.preset_store.get_keys(constants.CONFIG_REALTIME_CONFIG)
+
     def save_preferences(self, preferences_model):
-        self.config[constants.CONFIG_PREFERENCES] = config_models.serialize_preferences(preferences_model)
-        self.anki_utils.write_config(self.config)
+        with self.preferences_cache_lock:
+            self.config[constants.CONFIG_PREFERENCES] = config_models.serialize_preferences(preferences_model)
+            self.preferences_cache = None
+        self.config_store.save()
 
     # deserialization routines for loading from config
     # ================================================
 
     def perform_config_migration(self):
         self.config = config_models.migrate_configuration(self.anki_utils, self.config)
-        self.anki_utils.write_config(self.config)
+        self.preferences_cache = None
+        self.config_store.save()
 
     def deserialize_batch_config(self, batch_config):
         batch = config_models.BatchConfig(self.anki_utils)
@@ -846,4 +1366,4 @@ class HyperTTS():
     # ==============
     def get_tts_player_action_context(self):
         return self.error_manager.get_single_action_context_configurable('Playing Realtime Audio', 
-            self.get_preferences().error_handling.realtime_tts_errors_dialog_type)
\ No newline at end of file
+            self.get_cached_preferences().error_handling.realtime_tts_errors_dialog_type)
\ No newline at end of file
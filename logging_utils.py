@@ -110,6 +110,10 @@ def configure_silent():
     global SILENT_LOGGING_MODE
     SILENT_LOGGING_MODE = True
 
+def debug_logging_enabled():
+    # in silent mode, loggers are NullLogger or SentryLogger which don't have levels
+    return not SILENT_LOGGING_MODE
+
 def get_child_logger(name):
     child_logger_name = name.split('.')[-1]
     if SILENT_LOGGING_MODE:
@@ -33,6 +33,8 @@ rm -f meta.json
 rm -rf __pycache__
 rm -f user_files/*.mp3
 rm -f user_files/*.ogg
+rm -f user_files/*.sqlite3
+rm -f user_files/*.journal
 rm -rvf htmlcov/
 ADDON_FILENAME=${HOME}/anki-addons-releases/anki-hyper-tts-${VERSION_NUMBER}.ankiaddon
 zip --exclude "*node_modules*" "*__pycache__*" "test_*.py" "*test_services*" "*.ini" "*.workspace" "*.md" "*.sh" requirements.txt "*.code-workspace" "web" -r ${ADDON_FILENAME} *
@@ -0,0 +1,84 @@
+import sys
+import threading
+import concurrent.futures
+
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class PrefetchTimer():
+    def __init__(self, delay_ms):
+        self.delay_ms = delay_ms
+        self.timer_obj = None
+
+class RealtimePrefetcher():
+    """
+    when the reviewer shows a card, requests the audio for the HyperTTS tags of the next few cards in the queue,
+    so that it's already in the audio cache when they get shown. the queue is looked up and the next cards rendered
+    on the main thread, once the card has been displayed for a moment, and only for the last card shown. requests
+    run one at a time on a single background thread, so that they don't compete with the audio for the card being
+    reviewed. errors are only logged, they will be reported if they happen again when the card gets shown.
+    """
+    def __init__(self, hypertts):
+        self.hypertts = hypertts
+        self.lock = threading.Lock()
+        self.executor = None
+        # tags submitted and not done yet, the same card can show up again in the next lookahead
+        self.pending_tags = set()
+        self.prefetch_timer = PrefetchTimer(constants.AUDIO_CACHE_REALTIME_PREFETCH_DELAY_MS)
+        self.review_queue_unavailable_logged = False
+
+    def get_executor(self):
+        if self.executor == None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='hypertts-prefetch')
+        return self.executor
+
+    def card_shown(self, card):
+        card_count = self.hypertts.get_cached_preferences().audio_cache.realtime_prefetch_card_count
+        if card_count == 0:
+            return
+        # don't delay showing the card, a card answered before the timer expires isn't looked up
+        card_id = card.id
+        self.hypertts.anki_utils.call_on_timer_expire(self.prefetch_timer, lambda: self.prefetch_upcoming_cards(card_id, card_count))
+
+    def prefetch_upcoming_cards(self, card_id, card_count):
+        try:
+            if not self.hypertts.anki_utils.review_queue_available():
+                if not self.review_queue_unavailable_logged:
+                    logger.info("the scheduler doesn't expose its review queue, realtime audio prefetch requires the v3 scheduler")
+                    self.review_queue_unavailable_logged = True
+                return
+            tts_tags = self.hypertts.anki_utils.get_upcoming_review_tts_tags(card_id, card_count)
+        except Exception as e:
+            logger.warning(f'could not get upcoming cards for prefetch: {e}')
+            return
+        with self.lock:
+            for tts_tag in tts_tags:
+                tag_key = (tts_tag.field_text, tuple(tts_tag.other_args))
+                if tag_key in self.pending_tags:
+                    continue
+                self.pending_tags.add(tag_key)
+                self.get_executor().submit(self.prefetch_tts_tag, tts_tag, tag_key)
+
+    def prefetch_tts_tag(self, tts_tag, tag_key):
+        try:
+            logger.debug(f'prefetching audio for {tts_tag.field_text}')
+            self.hypertts.get_audio_filename_tts_tag(tts_tag)
+        except Exception as e:
+            logger.info(f'could not prefetch audio for {tts_tag.field_text}: {e}')
+        finally:
+            with self.lock:
+                self.pending_tags.discard(tag_key)
+
+    def close(self, wait=False):
+        # when the profile is closing, pending requests are dropped. with wait, they get to finish first
+        if self.prefetch_timer.timer_obj != None:
+            self.prefetch_timer.timer_obj.stop()
+            self.prefetch_timer.timer_obj = None
+        with self.lock:
+            executor = self.executor
+            self.executor = None
+            self.pending_tags = set()
+        if executor != None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
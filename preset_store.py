@@ -0,0 +1,145 @@
+import sys
+import os
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+@dataclass
+class StoredPreset:
+    key: str
+    name: str
+    data: dict
+    version: int
+
+
+class PresetStore():
+    """
+    presets and realtime presets, stored one per row in an sqlite database in the user_files directory,
+    so that saving one of them doesn't rewrite the others. the kind of a row is the add-on config key under
+    which it used to be stored (CONFIG_PRESETS or CONFIG_REALTIME_CONFIG), entries found there get moved to the
+    database. each row has a version which increases every time it's saved.
+    """
+    DATABASE_FILENAME = 'hypertts-presets.sqlite3'
+    KINDS = [constants.CONFIG_PRESETS, constants.CONFIG_REALTIME_CONFIG]
+
+    def __init__(self, anki_utils, config, config_store):
+        self.anki_utils = anki_utils
+        self.config = config
+        self.config_store = config_store
+        self.connection = None
+        # a single connection is shared between threads, access is serialized
+        self.lock = threading.Lock()
+        # deserialized objects by (kind, key), along with the version they were deserialized from
+        self.object_cache = {}
+
+    def get_connection(self):
+        if self.connection == None:
+            database_path = os.path.join(self.anki_utils.get_user_files_dir(), self.DATABASE_FILENAME)
+            logger.info(f'opening preset store {database_path}')
+            self.connection = sqlite3.connect(database_path, check_same_thread=False)
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS presets (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                name TEXT,
+                data TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                PRIMARY KEY (kind, key)
+            )""")
+            self.connection.commit()
+        # checked every time, it's cheap and it also picks up presets restored into the config
+        self.migrate_config(self.connection)
+        return self.connection
+
+    def migrate_config(self, connection):
+        migrate_kinds = [kind for kind in self.KINDS if kind in self.config]
+        if len(migrate_kinds) == 0:
+            return
+        for kind in migrate_kinds:
+            entries = self.config[kind]
+            logger.info(f'moving {len(entries)} entries of {kind} from the add-on config to the preset store')
+            # entries already in the store are newer, the config may not have been written after a previous migration
+            connection.executemany('INSERT OR IGNORE INTO presets (kind, key, name, data, version) VALUES (?, ?, ?, ?, 1)',
+                [(kind, key, data.get('name', None), json.dumps(data)) for key, data in entries.items()])
+        connection.commit()
+        # only remove them from the config once they are safely in the database
+        for kind in migrate_kinds:
+            del self.config[kind]
+        self.config_store.save()
+
+    def get_keys(self, kind):
+        with self.lock:
+            rows = self.get_connection().execute('SELECT key FROM presets WHERE kind = ? ORDER BY key', (kind,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_names(self, kind):
+        """names by key, without loading the data"""
+        with self.lock:
+            rows = self.get_connection().execute('SELECT key, name FROM presets WHERE kind = ?', (kind,)).fetchall()
+        return {key: name for key, name in rows}
+
+    def get(self, kind, key) -> StoredPreset:
+        """the stored entry, or None if there is none for this key"""
+        with self.lock:
+            row = self.get_connection().execute('SELECT key, name, data, version FROM presets WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+        if row == None:
+            return None
+        key, name, data, version = row
+        return StoredPreset(key, name, json.loads(data), version)
+
+    def get_object(self, kind, key, deserialize_fn):
+        """
+        deserialize_fn(data) applied to the stored entry, cached until the entry is saved again. the returned object
+        is shared, it must not be modified. None if there is no entry for this key
+        """
+        with self.lock:
+            cached_entry = self.object_cache.get((kind, key), None)
+        if cached_entry != None:
+            return cached_entry[1]
+        stored_preset = self.get(kind, key)
+        if stored_preset == None:
+            return None
+        deserialized = deserialize_fn(stored_preset.data)
+        with self.lock:
+            # the entry may have been saved again while it was being deserialized
+            current_row = self.get_connection().execute('SELECT version FROM presets WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if current_row != None and current_row[0] == stored_preset.version:
+                self.object_cache[(kind, key)] = (stored_preset.version, deserialized)
+        return deserialized
+
+    def put(self, kind, key, name, data):
+        """save the entry, returns its new version"""
+        with self.lock:
+            connection = self.get_connection()
+            connection.execute("""INSERT INTO presets (kind, key, name, data, version) VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (kind, key) DO UPDATE SET name = excluded.name, data = excluded.data, version = version + 1""",
+                (kind, key, name, json.dumps(data)))
+            version = connection.execute('SELECT version FROM presets WHERE kind = ? AND key = ?', (kind, key)).fetchone()[0]
+            connection.commit()
+            self.object_cache.pop((kind, key), None)
+        return version
+
+    def delete(self, kind, key):
+        """returns whether there was an entry to delete"""
+        with self.lock:
+            connection = self.get_connection()
+            cursor = connection.execute('DELETE FROM presets WHERE kind = ? AND key = ?', (kind, key))
+            connection.commit()
+            self.object_cache.pop((kind, key), None)
+        return cursor.rowcount > 0
+
+    def clear_object_cache(self):
+        # deserialized voices depend on which services are enabled
+        with self.lock:
+            self.object_cache = {}
+
+    def close(self):
+        with self.lock:
+            if self.connection != None:
+                self.connection.close()
+                self.connection = None
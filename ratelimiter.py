@@ -0,0 +1,64 @@
+import sys
+import time
+import threading
+
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class RateLimitedRequestContext():
+    def __init__(self, rate_limiter):
+        self.rate_limiter = rate_limiter
+
+    def __enter__(self):
+        self.rate_limiter.acquire()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.rate_limiter.release()
+        return False
+
+class RateLimiter():
+    """
+    token bucket limiting the rate of requests made to a service, combined with a cap on the number
+    of requests in flight. requests only wait when the bucket is empty, so a request which took longer
+    than the interval between requests doesn't pay for it a second time.
+    a requests_per_second or max_in_flight value of 0 means unlimited.
+    """
+    def __init__(self, requests_per_second, burst_size, max_in_flight):
+        self.requests_per_second = requests_per_second
+        self.burst_size = max(burst_size, 1)
+        self.max_in_flight = max_in_flight
+        self.condition = threading.Condition()
+        self.tokens = self.burst_size
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst_size, self.tokens + (now - self.last_refill) * self.requests_per_second)
+        self.last_refill = now
+
+    def acquire(self):
+        with self.condition:
+            if self.max_in_flight > 0:
+                while self.in_flight >= self.max_in_flight:
+                    self.condition.wait()
+            # count this request as in flight right away, so that the slot is held while we wait for a token
+            self.in_flight += 1
+            if self.requests_per_second > 0:
+                self.refill()
+                while self.tokens < 1:
+                    wait_seconds = (1 - self.tokens) / self.requests_per_second
+                    logger.debug(f'rate limit reached, waiting {wait_seconds:.3f}s')
+                    self.condition.wait(wait_seconds)
+                    self.refill()
+                self.tokens -= 1
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def get_request_context(self):
+        return RateLimitedRequestContext(self)
@@ -3,19 +3,19 @@ import abc
 from posixpath import dirname
 import typing
 
-if hasattr(sys, '_pytest_mode'):
-    import services.voicelist
-else:
-    # import running from within Anki
-    from .services import voicelist
-
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_base)
 services = __import__('services', globals(), locals(), [], sys._addon_import_level_base)
 languages = __import__('languages', globals(), locals(), [], sys._addon_import_level_base)
 errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_base)
+voicecatalogue = __import__('voicecatalogue', globals(), locals(), [], sys._addon_import_level_base)
 
 class ServiceBase(abc.ABC):
+    # rate limiting settings, applied by the ServiceManager to every request made to the service
+    CONFIG_REQUESTS_PER_SECOND = 'requests_per_second'
+    CONFIG_BURST_SIZE = 'burst_size'
+    CONFIG_MAX_IN_FLIGHT = 'max_in_flight'
+
     def __init__(self):
         self._config = {}
     
@@ -69,8 +69,8 @@ class ServiceBase(abc.ABC):
 
     # some helper functions
     def basic_voice_list(self) -> typing.List[voice.VoiceBase]:
-        """basic processing for voice list which should work for most services which are represented in voicelist.py"""
-        service_voices_json = [voice for voice in services.voicelist.VOICE_LIST if voice['service'] == self.name]
+        """basic processing for voice list which should work for most services which are represented in the voice catalogue"""
+        service_voices_json = voicecatalogue.catalogue.get_voice_data_list(self.name)
         service_voices = [voice.Voice(v['name'], 
                             constants.Gender[v['gender']], 
                             languages.AudioLanguage[v['language']], 
@@ -83,6 +83,15 @@ class ServiceBase(abc.ABC):
     def configuration_options(self):
         return {}
 
+    # rate limiting settings shown along with the configuration options. services which
+    # don't make network requests override this to return an empty dict
+    def rate_limit_configuration_options(self):
+        return {
+            self.CONFIG_REQUESTS_PER_SECOND: float,
+            self.CONFIG_BURST_SIZE: int,
+            self.CONFIG_MAX_IN_FLIGHT: int
+        }
+
     def configure(self, config):
         self._config = config
 
@@ -3,6 +3,7 @@ import sys
 import os
 import importlib
 import typing
+import threading
 import requests
 
 
@@ -12,7 +13,9 @@ errors = __import__('errors', globals(), locals(), [], sys._addon_import_level_b
 version = __import__('version', globals(), locals(), [], sys._addon_import_level_base)
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 config_models = __import__('config_models', globals(), locals(), [], sys._addon_import_level_base)
+ratelimiter = __import__('ratelimiter', globals(), locals(), [], sys._addon_import_level_base)
 cloudlanguagetools_module = __import__('cloudlanguagetools', globals(), locals(), [], sys._addon_import_level_base)
+startup_timings = __import__('startup_timings', globals(), locals(), [], sys._addon_import_level_base)
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
 logger = logging_utils.get_child_logger(__name__)
 
@@ -31,9 +34,16 @@ class ServiceManager():
         self.cloudlanguagetools_enabled = False
         self.allow_test_services = allow_test_services
         self.cloudlanguagetools = cloudlanguagetools
+        self.rate_limiters = {}
+        # voices of each service by canonical voice key, built when first needed
+        self.voice_registry = {}
+        self.voice_registry_lock = threading.Lock()
 
     def configure(self, configuration_model):
         hypertts_pro_mode = configuration_model.hypertts_pro_api_key_set()
+        self.configure_rate_limiters(configuration_model)
+        # enabled services and their configuration may change the voices available
+        self.clear_voice_registry()
         for service_name, enabled in configuration_model.get_service_enabled_map().items():
             if not self.service_exists(service_name):
                 logger.error(f'could not find service {service_name}, cannot configure')
@@ -42,10 +52,12 @@ class ServiceManager():
             logger.info(f'configuring service {service_name}, hypertts_pro_mode: {hypertts_pro_mode}, clt_enabled: {service.cloudlanguagetools_enabled()}')
             if not (hypertts_pro_mode == True and service.cloudlanguagetools_enabled()):
                 service.enabled = enabled
-                # do we need to set configuration for this service ? only do so if the service is enabled
-                if enabled and service_name in configuration_model.get_service_config():
-                    service_config = configuration_model.get_service_config()[service_name]
-                    service.configure(service_config)
+                # do we need to set configuration for this service ? only do so if the service is enabled,
+                # and its own options were set, rate limiting settings alone don't configure it
+                service_config = configuration_model.get_service_config().get(service_name, {})
+                if enabled and any([key in service.configuration_options() for key in service_config.keys()]):
+                    with startup_timings.timings.time_phase(f'configure {service_name}'):
+                        service.configure(service_config)
         # if we enable cloudlanguagetools, it may force some services to enabled
         self.cloudlanguagetools.configure(configuration_model)
         if hypertts_pro_mode:
@@ -86,8 +98,10 @@ class ServiceManager():
         return module_names
 
     def init_services(self):
-        self.import_services()
-        self.instantiate_services()
+        with startup_timings.timings.time_phase('import services'):
+            self.import_services()
+        with startup_timings.timings.time_phase('instantiate services'):
+            self.instantiate_services()
 
     def import_services(self):
         module_names = self.discover_services()
@@ -95,11 +109,13 @@ class ServiceManager():
         # sys.path.insert(0, self.services_directory)
         for module_name in module_names:
             logger.info(f'importing module {module_name}')
-            __import__(self.package_name, globals(), locals(), [module_name], sys._addon_import_level_base)
+            with startup_timings.timings.time_phase(f'import {module_name}'):
+                __import__(self.package_name, globals(), locals(), [module_name], sys._addon_import_level_base)
 
     def instantiate_services(self):
         for subclass in service.ServiceBase.__subclasses__():
-            subclass_instance = subclass()
+            with startup_timings.timings.time_phase(f'instantiate {subclass.__name__}'):
+                subclass_instance = subclass()
             if subclass_instance.test_service() and self.allow_test_services == False:
                 logger.info(f'skipping test service {subclass_instance.name}')
                 continue
@@ -127,6 +143,23 @@ class ServiceManager():
                 logger.info(f'enabling {service.name} with cloud language tools')
                 service.enabled = True
 
+    def configure_rate_limiters(self, configuration_model):
+        # requests through HyperTTS Pro are rate limited too
+        self.rate_limiters = {}
+        for service_name, service_config in configuration_model.get_service_config().items():
+            if self.service_exists(service_name):
+                self.configure_rate_limiter(self.get_service(service_name), service_config)
+
+    def configure_rate_limiter(self, service, service_config):
+        # missing or 0 values mean unlimited
+        requests_per_second = service_config.get(service.CONFIG_REQUESTS_PER_SECOND, None) or 0
+        burst_size = service_config.get(service.CONFIG_BURST_SIZE, None) or 1
+        max_in_flight = service_config.get(service.CONFIG_MAX_IN_FLIGHT, None) or 0
+        if requests_per_second > 0 or max_in_flight > 0:
+            logger.info(f'rate limiting {service.name}: requests_per_second: {requests_per_second} '
+                        f'burst_size: {burst_size} max_in_flight: {max_in_flight}')
+            self.rate_limiters[service.name] = ratelimiter.RateLimiter(requests_per_second, burst_size, max_in_flight)
+
     def service_configuration_options(self, service_name):
         return self.services[service_name].configuration_options()
 
@@ -168,6 +201,13 @@ class ServiceManager():
             raise raise_exception
 
     def get_tts_audio_implementation(self, source_text, voice, options, audio_request_context):
+        rate_limiter = self.rate_limiters.get(voice.service.name, None)
+        if rate_limiter == None:
+            return self.get_tts_audio_request(source_text, voice, options, audio_request_context)
+        with rate_limiter.get_request_context():
+            return self.get_tts_audio_request(source_text, voice, options, audio_request_context)
+
+    def get_tts_audio_request(self, source_text, voice, options, audio_request_context):
         if self.use_cloud_language_tools(voice):
             return self.cloudlanguagetools.get_tts_audio(source_text, voice, options, audio_request_context)
         else:
@@ -187,11 +227,34 @@ class ServiceManager():
                 full_list.extend(voices)
         return full_list
 
+    def get_canonical_voice_key(self, voice_key):
+        return voice.get_canonical_voice_key(voice_key)
+
+    def get_service_voice_registry(self, service_name):
+        with self.voice_registry_lock:
+            service_voice_registry = self.voice_registry.get(service_name, None)
+        if service_voice_registry == None:
+            # only load the voice list for services we need, this is particularly important for ElevenLabsCustom
+            # which does an actual query to their API
+            voice_list = self.full_voice_list(single_service_name=service_name)
+            service_voice_registry = {}
+            for voice in voice_list:
+                service_voice_registry.setdefault(self.get_canonical_voice_key(voice.voice_key), voice)
+            with self.voice_registry_lock:
+                self.voice_registry[service_name] = service_voice_registry
+        return service_voice_registry
+
+    def clear_voice_registry(self):
+        with self.voice_registry_lock:
+            self.voice_registry = {}
+
     def deserialize_voice(self, voice_data):
-        # avoid loading voice list for services we don't need, this is particularly important for ElevenLabsCustom which does
-        # an actual query to their API
-        voice_list = self.full_voice_list(single_service_name=voice_data['service'])
-        voice_subset = [voice for voice in voice_list if voice.voice_key == voice_data['voice_key'] and voice.service.name == voice_data['service']]
-        if len(voice_subset) == 0:
+        # a disabled service has no voices, it may have been disabled without going through configure
+        service_name = voice_data['service']
+        if not self.service_exists(service_name) or not self.get_service(service_name).enabled:
+            raise errors.VoiceNotFound(voice_data)
+        service_voice_registry = self.get_service_voice_registry(service_name)
+        canonical_voice_key = self.get_canonical_voice_key(voice_data['voice_key'])
+        if canonical_voice_key not in service_voice_registry:
             raise errors.VoiceNotFound(voice_data)
-        return voice_subset[0]
\ No newline at end of file
+        return service_voice_registry[canonical_voice_key]
\ No newline at end of file
@@ -1,9 +1,7 @@
 import sys
 import requests
 import datetime
-import time
-import boto3
-import botocore
+import threading
 import contextlib
 
 
@@ -19,11 +17,13 @@ class Amazon(service.ServiceBase):
     CONFIG_ACCESS_KEY_ID = 'aws_access_key_id'
     CONFIG_SECRET_ACCESS_KEY = 'aws_secret_access_key'
     CONFIG_REGION = 'aws_region'
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
 
     def __init__(self):
         service.ServiceBase.__init__(self)
         self.access_token = None
+        # boto3 is slow to import, the client gets created on the first request
+        self.polly_client = None
+        self.polly_client_lock = threading.Lock()
 
     def cloudlanguagetools_enabled(self):
         return True
@@ -64,17 +64,29 @@ class Amazon(service.ServiceBase):
                 'sa-east-1',
                 'us-gov-east-1',
                 'us-gov-west-1',                
-            ],
-            self.CONFIG_THROTTLE_SECONDS: float
+            ]
         }
 
     def configure(self, config):
         self._config = config
-        self.polly_client = boto3.client("polly",
-            aws_access_key_id=self.get_configuration_value_mandatory(self.CONFIG_ACCESS_KEY_ID),
-            aws_secret_access_key=self.get_configuration_value_mandatory(self.CONFIG_SECRET_ACCESS_KEY),
-            region_name=self.get_configuration_value_optional(self.CONFIG_REGION, 'us-east-1'),
-            config=botocore.config.Config(connect_timeout=constants.RequestTimeout, read_timeout=constants.RequestTimeout))        
+        with self.polly_client_lock:
+            self.polly_client = None
+        # report missing keys when the configuration is saved, only the client creation is deferred
+        self.get_configuration_value_mandatory(self.CONFIG_ACCESS_KEY_ID)
+        self.get_configuration_value_mandatory(self.CONFIG_SECRET_ACCESS_KEY)
+        self.get_configuration_value_optional(self.CONFIG_REGION, 'us-east-1')
+
+    def get_polly_client(self):
+        import boto3
+        import botocore.config
+        with self.polly_client_lock:
+            if self.polly_client == None:
+                self.polly_client = boto3.client("polly",
+                    aws_access_key_id=self.get_configuration_value_mandatory(self.CONFIG_ACCESS_KEY_ID),
+                    aws_secret_access_key=self.get_configuration_value_mandatory(self.CONFIG_SECRET_ACCESS_KEY),
+                    region_name=self.get_configuration_value_optional(self.CONFIG_REGION, 'us-east-1'),
+                    config=botocore.config.Config(connect_timeout=constants.RequestTimeout, read_timeout=constants.RequestTimeout))
+            return self.polly_client
 
 
     def voice_list(self):
@@ -85,10 +97,6 @@ class Amazon(service.ServiceBase):
         aws_access_key_id=self.get_configuration_value_mandatory(self.CONFIG_ACCESS_KEY_ID)
         aws_secret_access_key=self.get_configuration_value_mandatory(self.CONFIG_SECRET_ACCESS_KEY)
 
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)        
-
         pitch = voice_options.get('pitch', voice.options['pitch']['default'])
         pitch_str = f'{pitch:+.0f}%'
         rate = voice_options.get('rate', voice.options['rate']['default'])
@@ -113,8 +121,10 @@ class Amazon(service.ServiceBase):
     </prosody>
 </speak>"""
 
+        polly_client = self.get_polly_client()
+        import botocore.exceptions
         try:
-            response = self.polly_client.synthesize_speech(Text=ssml_str, TextType="ssml", OutputFormat=audio_format_map[audio_format], VoiceId=voice.voice_key['voice_id'], Engine=voice.voice_key['engine'])
+            response = polly_client.synthesize_speech(Text=ssml_str, TextType="ssml", OutputFormat=audio_format_map[audio_format], VoiceId=voice.voice_key['voice_id'], Engine=voice.voice_key['engine'])
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as error:
             raise errors.RequestError(source_text, voice, str(error))
 
@@ -1,7 +1,6 @@
 import sys
 import requests
 import datetime
-import time
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -14,7 +13,6 @@ logger = logging_utils.get_child_logger(__name__)
 class Azure(service.ServiceBase):
     CONFIG_REGION = 'region'
     CONFIG_API_KEY = 'api_key'
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
 
     def __init__(self):
         service.ServiceBase.__init__(self)
@@ -58,8 +56,7 @@ class Azure(service.ServiceBase):
                 'uksouth',
                 'germanywestcentral'
             ],
-            self.CONFIG_API_KEY: str,
-            self.CONFIG_THROTTLE_SECONDS: float
+            self.CONFIG_API_KEY: str
         }
 
     def get_token(self, subscription_key, region):
@@ -92,10 +89,6 @@ class Azure(service.ServiceBase):
 
         region = self.get_configuration_value_mandatory(self.CONFIG_REGION)
         subscription_key = self.get_configuration_value_mandatory(self.CONFIG_API_KEY)
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)
         
         if self.token_refresh_required():
             self.get_token(subscription_key, region)
@@ -1,7 +1,6 @@
 import sys
 import re
 import requests
-import bs4
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -45,6 +44,7 @@ class Cambridge(service.ServiceBase):
         logger.info(f'loading url: {complete_url}')
         response = requests.get(complete_url, headers=headers)
 
+        import bs4
         soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
         section_class_map = {
@@ -1,7 +1,6 @@
 import sys
 import re
 import requests
-import bs4
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -54,6 +53,7 @@ class Collins(service.ServiceBase):
         if response.status_code != 200:
             raise errors.RequestError(source_text, voice, f'search returned status code {response.status_code}')
         
+        import bs4
         soup = bs4.BeautifulSoup(response.content, 'html.parser')
         headword_div = soup.find('div', {'class': 'he'})
         sound_tag = headword_div.find('a', {
@@ -1,7 +1,6 @@
 import sys
 import re
 import requests
-import bs4
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -43,6 +42,7 @@ class DigitalesWorterbuchDeutschenSprache(service.ServiceBase):
         full_url = self.SEARCH_URL + source_text
         response = requests.get(full_url, headers=headers)
 
+        import bs4
         soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
         source_tag = soup.find('source', {'type': 'audio/mpeg'})
@@ -3,7 +3,6 @@ import os
 import hashlib
 import aqt.sound
 import tempfile
-import espeakng
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -51,6 +50,10 @@ class ESpeakNg(service.ServiceBase):
     def service_fee(self) -> constants.ServiceFee:
         return constants.ServiceFee.Free
 
+    def rate_limit_configuration_options(self):
+        # local service, no requests to rate limit
+        return {}
+
     def get_audio_language(self, espeakng_language):
         if espeakng_language in AUDIO_LANGUAGE_OVERRIDE_MAP:
             return AUDIO_LANGUAGE_OVERRIDE_MAP[espeakng_language]
@@ -69,6 +72,7 @@ class ESpeakNg(service.ServiceBase):
         }
 
         try:
+            import espeakng
             result = []
             esng = espeakng.ESpeakNG()
             for espeakng_voice in esng.voices:
@@ -89,7 +93,7 @@ class ESpeakNg(service.ServiceBase):
         return []
 
     def get_tts_audio(self, source_text, voice: voice.VoiceBase, options):
-
+        import espeakng
         esng = espeakng.ESpeakNG()
         esng.voice = voice.voice_key
         wavs = esng.synth_wav(source_text)
@@ -1,7 +1,6 @@
 import sys
 import requests
 import datetime
-import time
 import urllib
 import json
 
@@ -16,7 +15,6 @@ logger = logging_utils.get_child_logger(__name__)
 class Forvo(service.ServiceBase):
     CONFIG_API_KEY = 'api_key'
     CONFIG_API_URL = 'api_url'
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
 
     CONFIG_API_URL_FREE = 'https://apifree.forvo.com/'
     CONFIG_API_URL_COMMERCIAL = 'https://apicommercial.forvo.com/'
@@ -46,8 +44,7 @@ class Forvo(service.ServiceBase):
                 self.CONFIG_API_URL_FREE,
                 self.CONFIG_API_URL_COMMERCIAL,
                 self.CONFIG_API_URL_CORPORATE,
-            ],
-            self.CONFIG_THROTTLE_SECONDS: float
+            ]
         }
 
 
@@ -58,10 +55,6 @@ class Forvo(service.ServiceBase):
 
         api_key = self.get_configuration_value_mandatory(self.CONFIG_API_KEY)
         api_url = self.get_configuration_value_optional(self.CONFIG_API_URL, self.CONFIG_API_URL_FREE)
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)
 
         # prevent getting blocked by cloudflare
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:85.0) Gecko/20100101 Firefox/85.0'}
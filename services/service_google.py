@@ -1,7 +1,6 @@
 import sys
 import requests
 import base64
-import time
 
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
@@ -15,7 +14,6 @@ logger = logging_utils.get_child_logger(__name__)
 class Google(service.ServiceBase):
     CONFIG_API_KEY = 'api_key'
     CONFIG_EXPLORER_API_KEY = 'explorer_api_key'
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
 
     def __init__(self):
         service.ServiceBase.__init__(self)
@@ -34,8 +32,7 @@ class Google(service.ServiceBase):
     def configuration_options(self):
         return {
             self.CONFIG_API_KEY: str,
-            self.CONFIG_EXPLORER_API_KEY: bool,
-            self.CONFIG_THROTTLE_SECONDS: float
+            self.CONFIG_EXPLORER_API_KEY: bool
         }
 
     def voice_list(self):
@@ -45,10 +42,6 @@ class Google(service.ServiceBase):
         # configuration options
         api_key = self.get_configuration_value_mandatory(self.CONFIG_API_KEY)
         is_explorer_api_key = self.get_configuration_value_optional(self.CONFIG_EXPLORER_API_KEY, False)
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)
 
         audio_format_str = voice_options.get(options.AUDIO_FORMAT_PARAMETER, options.AudioFormat.mp3.name)
         audio_format = options.AudioFormat[audio_format_str]
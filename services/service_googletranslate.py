@@ -1,6 +1,4 @@
 import sys
-import time
-import gtts
 import io
 
 
@@ -30,16 +28,9 @@ GENDER_MAP = {
 }
 
 class GoogleTranslate(service.ServiceBase):
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
-
     def __init__(self):
         service.ServiceBase.__init__(self)
 
-    def configuration_options(self):
-        return {
-            self.CONFIG_THROTTLE_SECONDS: float
-        }
-
     @property
     def service_type(self) -> constants.ServiceType:
         return constants.ServiceType.tts
@@ -60,6 +51,7 @@ class GoogleTranslate(service.ServiceBase):
         return None
 
     def voice_list(self):
+        import gtts
         languages = gtts.lang.tts_langs()
         # pprint.pprint(languages)
         voices = []
@@ -73,12 +65,7 @@ class GoogleTranslate(service.ServiceBase):
         return voices
 
     def get_tts_audio(self, source_text, voice: voice.VoiceBase, options):
-        # configuration options
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)
-
+        import gtts
         try:
             tts = gtts.gTTS(text=source_text, lang=voice.voice_key)
             buffer = io.BytesIO()
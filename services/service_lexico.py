@@ -1,7 +1,6 @@
 import sys
 import re
 import requests
-import bs4
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -46,6 +45,7 @@ class Lexico(service.ServiceBase):
         if response.status_code != 200:
             logger.debug(response.content)
         
+        import bs4
         soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
         h3_pronunciations = soup.find('h3', {'class': 'pronunciations'})
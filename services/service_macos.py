@@ -439,6 +439,10 @@ class MacOS(service.ServiceBase):
     def service_fee(self) -> constants.ServiceFee:
         return constants.ServiceFee.Free
 
+    def rate_limit_configuration_options(self):
+        # local service, no requests to rate limit
+        return {}
+
     def voice_list(self):
         if platform.system() != "Darwin":
             logger.info(f'running on os {os.name}, disabling {self.name} service')
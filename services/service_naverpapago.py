@@ -1,7 +1,6 @@
 import sys
 import requests
 import base64
-import time
 import uuid
 import hmac
 import hashlib
@@ -18,7 +17,6 @@ logger = logging_utils.get_child_logger(__name__)
 
 
 class NaverPapago(service.ServiceBase):
-    CONFIG_THROTTLE_SECONDS = 'throttle_seconds'
 
     TRANSLATE_ENDPOINT = 'https://papago.naver.com/apis/tts/'
     TRANSLATE_MKID = TRANSLATE_ENDPOINT + 'makeID'    
@@ -28,11 +26,6 @@ class NaverPapago(service.ServiceBase):
     def __init__(self):
         service.ServiceBase.__init__(self)
 
-    def configuration_options(self):
-        return {
-            self.CONFIG_THROTTLE_SECONDS: float
-        }
-
     @property
     def service_type(self) -> constants.ServiceType:
         return constants.ServiceType.tts
@@ -96,11 +89,6 @@ class NaverPapago(service.ServiceBase):
         }
 
     def get_tts_audio(self, source_text, voice: voice.VoiceBase, options):
-        # configuration options
-        throttle_seconds = self.get_configuration_value_optional(self.CONFIG_THROTTLE_SECONDS, 0)
-        if throttle_seconds > 0:
-            time.sleep(throttle_seconds)
-
         url = self.TRANSLATE_MKID
         params = {
             'alpha': 0,
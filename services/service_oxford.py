@@ -1,7 +1,6 @@
 import sys
 import re
 import requests
-import bs4
 
 voice = __import__('voice', globals(), locals(), [], sys._addon_import_level_services)
 service = __import__('service', globals(), locals(), [], sys._addon_import_level_services)
@@ -43,6 +42,7 @@ class Oxford(service.ServiceBase):
         response = requests.get(url, headers=headers)
         logger.debug(f'response.status_code: {response.status_code}')
         
+        import bs4
         soup = bs4.BeautifulSoup(response.content, 'html.parser')
 
         section_class_map = {
@@ -251,6 +251,10 @@ class Windows(service.ServiceBase):
     def service_fee(self) -> constants.ServiceFee:
         return constants.ServiceFee.Free
 
+    def rate_limit_configuration_options(self):
+        # local service, no requests to rate limit
+        return {}
+
     def voice_list(self):
         try:
             if os.name != 'nt':
@@ -0,0 +1,47 @@
+import sys
+import threading
+
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class SingleFlightCall():
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+class SingleFlight():
+    """
+    concurrent callers asking for the same key share a single execution of the function:
+    the first caller runs it, the others wait and get the same result (or exception)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key, None)
+            leader = call == None
+            if leader:
+                call = SingleFlightCall()
+                self.calls[key] = call
+
+        if not leader:
+            logger.info(f'waiting for in-flight request {key}')
+            call.done.wait()
+            if call.exception != None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
@@ -0,0 +1,75 @@
+import sys
+import time
+import threading
+import contextlib
+
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+class StartupPhase():
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.seconds = None
+
+class StartupTimings():
+    """
+    wall time of each phase of the add-on startup, in the order in which the phases started.
+    phases can be nested, for example each service import within the import of all services.
+    once startup is finished, phases are no longer recorded, so that reconfiguring services doesn't add to it.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = []
+        self.depth = 0
+        self.start_time = time.monotonic()
+        self.total_seconds = None
+
+    @contextlib.contextmanager
+    def time_phase(self, name):
+        with self.lock:
+            if self.total_seconds != None:
+                phase = None
+            else:
+                phase = StartupPhase(name, self.depth)
+                self.phases.append(phase)
+                self.depth += 1
+        if phase == None:
+            yield
+            return
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start_time
+            with self.lock:
+                phase.seconds = elapsed
+                self.depth -= 1
+
+    def finish(self):
+        with self.lock:
+            if self.total_seconds == None:
+                self.total_seconds = time.monotonic() - self.start_time
+
+    def get_phases(self):
+        """(name, depth, seconds) tuples, seconds is None for a phase which didn't complete"""
+        with self.lock:
+            return [(phase.name, phase.depth, phase.seconds) for phase in self.phases]
+
+    def get_summary(self):
+        lines = []
+        for name, depth, seconds in self.get_phases():
+            seconds_str = 'not completed' if seconds == None else f'{seconds * 1000:.0f}ms'
+            lines.append(f'{"  " * depth}{name}: {seconds_str}')
+        with self.lock:
+            total_seconds = self.total_seconds
+        if total_seconds != None:
+            lines.append(f'total: {total_seconds * 1000:.0f}ms')
+        return '\n'.join(lines)
+
+    def log_summary(self):
+        if logging_utils.debug_logging_enabled():
+            logger.debug(f'startup timings:\n{self.get_summary()}')
+
+timings = StartupTimings()
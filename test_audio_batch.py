@@ -2,6 +2,9 @@ import sys
 import os
 import re
 import datetime
+import time
+import threading
+import pytest
 
 addon_dir = os.path.dirname(os.path.realpath(__file__))
 external_dir = os.path.join(addon_dir, 'external')
@@ -13,6 +16,7 @@ import constants
 import languages
 import config_models
 import batch_status
+import errors
 
 
 logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
@@ -832,6 +836,138 @@ def test_priority_voices_success(qtbot):
     assert audio_data['voice']['name'] == 'voice_a_3'
 
 
+def test_priority_voices_not_found_cache(qtbot):
+    # pytest test_audio_batch.py -k test_priority_voices_not_found_cache
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    requested_services = []
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        requested_services.append(voice.service.name)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    voice_list = hypertts_instance.service_manager.full_voice_list()
+    voice_1 = [x for x in voice_list if x.name == 'notfound'][0] # special voice in serviceB
+    voice_2 = [x for x in voice_list if x.name == 'voice_a_3'][0]
+    priority = config_models.VoiceSelectionPriority()
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_1, {}))
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_2, {}))
+
+    # the first time, ServiceB is asked and doesn't have the audio
+    hypertts_instance.get_audio_file('老人家', priority, None)
+    assert requested_services == ['ServiceB', 'ServiceA']
+
+    # the second time, the miss is remembered and the audio file is cached
+    requested_services.clear()
+    full_filename, audio_filename = hypertts_instance.get_audio_file('老人家', priority, None)
+    assert requested_services == []
+    audio_data = hypertts_instance.anki_utils.extract_mock_tts_audio(full_filename)
+    assert audio_data['voice']['name'] == 'voice_a_3'
+
+    # once the entry expires, ServiceB gets asked again
+    audio_cache = hypertts_instance.audio_cache
+    audio_cache.get_connection().execute('UPDATE audio_not_found SET created = 0')
+    audio_cache.get_connection().commit()
+    assert audio_cache.is_audio_not_found('ServiceB', voice_1.voice_key, '老人家', 3600) == False
+    requested_services.clear()
+    hypertts_instance.get_audio_file('老人家', priority, None)
+    assert requested_services == ['ServiceB']
+
+    # ServiceB gets asked again once its configuration changes, ServiceA's entries are kept
+    audio_cache.add_audio_not_found('ServiceA', voice_2.voice_key, 'old people')
+    configuration = hypertts_instance.get_configuration()
+    configuration.set_service_configuration_key('ServiceB', 'api_key', 'new_key')
+    hypertts_instance.save_configuration(configuration)
+    assert audio_cache.is_audio_not_found('ServiceA', voice_2.voice_key, 'old people', 3600) == True
+    requested_services.clear()
+    hypertts_instance.get_audio_file('老人家', priority, None)
+    assert requested_services == ['ServiceB']
+
+    # the negative cache can be disabled
+    preferences = config_models.Preferences()
+    preferences.audio_cache.not_found_ttl_hours = 0
+    hypertts_instance.save_preferences(preferences)
+    requested_services.clear()
+    hypertts_instance.get_audio_file('老人家', priority, None)
+    assert requested_services == ['ServiceB']
+
+def test_priority_voices_hedged(qtbot):
+    # pytest test_audio_batch.py -k test_priority_voices_hedged
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    preferences = config_models.Preferences()
+    preferences.priority_voices.hedged_request_count = 3
+    preferences.audio_cache.not_found_ttl_hours = 0
+    hypertts_instance.save_preferences(preferences)
+
+    # every request takes 200ms, the ServiceB voice doesn't have the audio.
+    # the requests of the first call wait for each other, they only get through if they are all in flight at once
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    requested_voices = []
+    barriers = [threading.Barrier(3, timeout=5)]
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        requested_voices.append(voice.name)
+        if len(barriers) > 0:
+            barriers[0].wait()
+        time.sleep(0.2)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    voice_list = hypertts_instance.service_manager.full_voice_list()
+    voice_1 = [x for x in voice_list if x.name == 'notfound'][0] # special voice in serviceB
+    voice_2 = [x for x in voice_list if x.name == 'voice_a_3'][0]
+    voice_3 = [x for x in voice_list if x.name == 'voice_a_1'][0]
+    priority = config_models.VoiceSelectionPriority()
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_1, {}))
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_2, {}))
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_3, {}))
+
+    # all 3 voices are requested at once, the first voice which has the audio wins
+    full_filename, audio_filename = hypertts_instance.get_audio_file('老人家', priority, None)
+    barriers.clear()
+    assert sorted(requested_voices) == sorted(['notfound', 'voice_a_3', 'voice_a_1'])
+    audio_data = hypertts_instance.anki_utils.extract_mock_tts_audio(full_filename)
+    assert audio_data['voice']['name'] == 'voice_a_3'
+
+    # when no voice has the audio
+    priority = config_models.VoiceSelectionPriority()
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_1, {}))
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_1, {}))
+    with pytest.raises(errors.AudioNotFoundAnyVoiceError):
+        hypertts_instance.get_audio_file('你好', priority, None)
+
+    # with a stagger delay, lower priority voices aren't requested if a higher priority voice has the audio
+    preferences.priority_voices.hedged_request_stagger_ms = 1000
+    hypertts_instance.save_preferences(preferences)
+    requested_voices.clear()
+    priority = config_models.VoiceSelectionPriority()
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_2, {}))
+    priority.add_voice(config_models.VoiceWithOptionsPriority(voice_3, {}))
+    hypertts_instance.get_audio_file('大使馆', priority, None)
+    time.sleep(0.1)
+    assert requested_voices == ['voice_a_3']
+
+    # a discarded request doesn't start, and doesn't record that the voice doesn't have the audio
+    preferences.audio_cache.not_found_ttl_hours = 1
+    hypertts_instance.save_preferences(preferences)
+    requested_voices.clear()
+    done_event = threading.Event()
+    done_event.set()
+    voice_with_options = config_models.VoiceWithOptionsPriority(voice_1, {})
+    assert hypertts_instance.get_hedged_voice_audio_file('再见', voice_with_options, None, 0, done_event) == None
+    assert requested_voices == []
+    def get_tts_audio_discarded(source_text, voice, options, audio_request_context):
+        done_event.set()
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio_discarded
+    done_event.clear()
+    with pytest.raises(errors.AudioNotFoundError):
+        hypertts_instance.get_hedged_voice_audio_file('再见', voice_with_options, None, 0, done_event)
+    assert hypertts_instance.audio_cache.is_audio_not_found(voice_1.service.name, voice_1.voice_key, '再见', 3600) == False
+
 def test_priority_voices_not_found(qtbot):
 
     config_gen = testing_utils.TestConfigGenerator()
@@ -868,3 +1004,389 @@ def test_priority_voices_not_found(qtbot):
 
     # make sure we got a AudioNotFoundError in the batch error manager
     assert str(batch_status_obj[0].error) == 'Audio not found in any voices for [老人家]'
+
+
+def test_simple_parallelism(qtbot):
+    # pytest test_audio_batch.py -k test_simple_parallelism
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    # request audio for 3 notes at a time
+    preferences = config_models.Preferences()
+    preferences.batch_processing.parallelism = 3
+    hypertts_instance.save_preferences(preferences)
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+
+    # create list of notes, including one with an empty source field
+    # ==============================================================
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_3, config_gen.note_id_4, config_gen.note_id_5]
+
+    # run batch add audio
+    # ===================
+    rows_notified = []
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    def batch_change(note_id, row, total_count, start_time, current_time):
+        rows_notified.append(row)
+    listener.batch_change = batch_change
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+
+    # notes are reported in order, even though audio is requested in parallel
+    assert rows_notified == sorted(rows_notified)
+    assert listener.batch_ended == True
+
+    expected_text = {
+        config_gen.note_id_1: '老人家',
+        config_gen.note_id_2: '你好',
+        config_gen.note_id_4: '赚钱',
+        config_gen.note_id_5: '大使馆',
+    }
+    for note_id, source_text in expected_text.items():
+        note = hypertts_instance.anki_utils.get_note_by_id(note_id)
+        sound_tag = note.set_values['Sound']
+        audio_full_path = hypertts_instance.anki_utils.extract_sound_tag_audio_full_path(sound_tag)
+        audio_data = hypertts_instance.anki_utils.extract_mock_tts_audio(audio_full_path)
+        assert audio_data['source_text'] == source_text
+
+    assert batch_status_obj[1].status == constants.BatchNoteStatus.Done
+    assert str(batch_status_obj[2].error) == 'Source text is empty'
+    assert batch_status_obj[3].status == constants.BatchNoteStatus.Done
+
+    # time spent in each stage is available
+    stage_timings = batch_status_obj.stage_timings
+    assert stage_timings.get_count(constants.BatchStage.load_note) == 5
+    assert stage_timings.get_count(constants.BatchStage.process_text) == 5
+    assert stage_timings.get_count(constants.BatchStage.synthesis) == 4
+    assert stage_timings.get_count(constants.BatchStage.update_note) == 1
+
+def test_simple_load_notes_ahead(qtbot):
+    # pytest test_audio_batch.py -k test_simple_load_notes_ahead
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+
+    # notes get loaded on the batch thread, the next one while audio for the first note is being requested
+    loaded_notes = []
+    loading_threads = set()
+    anki_utils_get_note_by_id = hypertts_instance.anki_utils.get_note_by_id
+    def get_note_by_id(note_id):
+        loaded_notes.append(note_id)
+        loading_threads.add(threading.get_ident())
+        return anki_utils_get_note_by_id(note_id)
+    hypertts_instance.anki_utils.get_note_by_id = get_note_by_id
+
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    loaded_notes_during_first_request = []
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        if len(loaded_notes_during_first_request) == 0:
+            time.sleep(0.2)
+            loaded_notes_during_first_request.extend(loaded_notes)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+
+    assert loaded_notes_during_first_request == note_id_list[:2]
+    assert loading_threads == set([threading.get_ident()])
+    for row in range(len(note_id_list)):
+        assert batch_status_obj[row].status == constants.BatchNoteStatus.Done
+
+def test_simple_note_update_chunks(qtbot):
+    # pytest test_audio_batch.py -k test_simple_note_update_chunks
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    preferences = config_models.Preferences()
+    preferences.batch_processing.note_update_chunk_size = 3
+    hypertts_instance.save_preferences(preferences)
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+
+    # note 3 has an empty source field, it doesn't get updated
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_3, config_gen.note_id_4, config_gen.note_id_5]
+
+    mock_collection = testing_utils.MockCollection()
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, mock_collection)
+
+    # one full chunk, then the remaining note at the end of the batch
+    assert mock_collection.update_notes_calls == [3, 1]
+    for note_id in [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]:
+        assert hypertts_instance.anki_utils.get_note_by_id(note_id).flush_called == True
+    assert hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_3).flush_called == False
+    # audio files get registered with the media folder once per chunk
+    assert hypertts_instance.anki_utils.media_add_files_calls == [3, 1]
+    assert len(hypertts_instance.anki_utils.added_media_files) == 4
+
+    # running the batch again, files are already in the media folder
+    mock_collection = testing_utils.MockCollection()
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, mock_collection)
+    assert len(hypertts_instance.anki_utils.added_media_files) == 4
+
+def test_note_updates_error(qtbot):
+    # pytest test_audio_batch.py -k test_note_updates_error
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    # a chunk which fails to save isn't written again when exiting the context, the original error comes through
+    class FailingCollection(testing_utils.MockCollection):
+        def update_notes(self, notes):
+            self.update_notes_calls.append(len(notes))
+            raise Exception(f'update_notes call {len(self.update_notes_calls)}')
+    anki_collection = FailingCollection()
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, [config_gen.note_id_1], listener)
+    note = hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_1)
+    with pytest.raises(Exception, match='update_notes call 1'):
+        with hypertts.BatchNoteUpdates(hypertts_instance.anki_utils, anki_collection, batch_status_obj, 1, batch_status.StageTimings()) as note_updates:
+            note_updates.add_note(config_gen.note_id_1, note, 'hypertts-1.mp3')
+    assert anki_collection.update_notes_calls == [1]
+
+def test_simple_resume(qtbot):
+    # pytest test_audio_batch.py -k test_simple_resume
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+    journal = hypertts_instance.get_batch_journal(batch, note_id_list)
+
+    # stop the batch as soon as the first note is done
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    def batch_change(note_id, row, total_count, start_time, current_time):
+        if batch_status_obj[row].status == constants.BatchNoteStatus.Done:
+            batch_status_obj.stop()
+    listener.batch_change = batch_change
+    hypertts_instance.process_batch_audio_journal(note_id_list, batch, batch_status_obj, testing_utils.MockCollection(), False)
+
+    # the saved note is in the journal
+    journal_entries = journal.load()
+    assert list(journal_entries.keys()) == [config_gen.note_id_1]
+    assert journal_entries[config_gen.note_id_1]['sound_file'] == batch_status_obj[0].sound_file
+
+    # resume, only the remaining notes get processed
+    loaded_notes = []
+    anki_utils_get_note_by_id = hypertts_instance.anki_utils.get_note_by_id
+    def get_note_by_id(note_id):
+        loaded_notes.append(note_id)
+        return anki_utils_get_note_by_id(note_id)
+    hypertts_instance.anki_utils.get_note_by_id = get_note_by_id
+
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio_journal(note_id_list, batch, batch_status_obj, testing_utils.MockCollection(), True)
+
+    assert loaded_notes == [config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+    for row in range(len(note_id_list)):
+        assert batch_status_obj[row].status == constants.BatchNoteStatus.Done
+    assert batch_status_obj[0].sound_file == journal_entries[config_gen.note_id_1]['sound_file']
+
+    # the batch completed, the journal is gone
+    assert journal.exists() == False
+
+def test_stale_journals(qtbot):
+    # pytest test_audio_batch.py -k test_stale_journals
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    other_batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    other_batch.uuid = 'other_preset'
+    journal = hypertts_instance.get_batch_journal(batch, [config_gen.note_id_1])
+    journal.start()
+    other_journal = hypertts_instance.get_batch_journal(other_batch, [config_gen.note_id_1])
+    other_journal.start()
+    old_batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    old_batch.uuid = 'old_preset'
+    old_journal = hypertts_instance.get_batch_journal(old_batch, [config_gen.note_id_2])
+    old_journal.start()
+    os.utime(old_journal.get_path(), (time.time() - 60 * 24 * 3600, time.time() - 60 * 24 * 3600))
+
+    # the same preset with other notes: the previous journal of the preset can't be resumed any more
+    new_journal = hypertts_instance.get_batch_journal(batch, [config_gen.note_id_1, config_gen.note_id_2])
+    new_journal.start()
+    assert new_journal.exists()
+    assert journal.exists() == False
+    assert other_journal.exists()
+    assert old_journal.exists() == False
+
+def test_simple_only_changed_notes(qtbot):
+    # pytest test_audio_batch.py -k test_simple_only_changed_notes
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+
+    # notes 1 and 2 have kept their audio, note 4 has changed, note 5 has lost its audio
+    for note_id in [config_gen.note_id_1, config_gen.note_id_2]:
+        note = hypertts_instance.anki_utils.get_note_by_id(note_id)
+        note.field_dict['Sound'] = note.set_values['Sound']
+    note_4 = hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_4)
+    note_4.field_dict['Sound'] = note_4.set_values['Sound']
+    note_4.field_dict['Chinese'] = '人民币'
+
+    preferences = config_models.Preferences()
+    preferences.batch_processing.only_changed_notes = True
+    hypertts_instance.save_preferences(preferences)
+
+    requested_text = []
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        requested_text.append(source_text)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    mock_collection = testing_utils.MockCollection()
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, mock_collection)
+
+    assert batch_status_obj[0].status == constants.BatchNoteStatus.Unchanged
+    assert batch_status_obj[1].status == constants.BatchNoteStatus.Unchanged
+    assert batch_status_obj[0].sound_file in hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_1).field_dict['Sound']
+    assert batch_status_obj[2].status == constants.BatchNoteStatus.Done
+    assert batch_status_obj[3].status == constants.BatchNoteStatus.Done
+    # only the changed note needed new audio, and only notes 4 and 5 were saved
+    assert requested_text == ['人民币']
+    assert mock_collection.update_notes_calls == [2]
+
+def test_unique_request_count_preview(qtbot):
+    # pytest test_audio_batch.py -k test_unique_request_count_preview
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    preferences = config_models.Preferences()
+    preferences.audio_cache.normalize_whitespace = True
+    hypertts_instance.save_preferences(preferences)
+
+    # notes 1 and 2 only differ in whitespace, so they make the same audio request
+    hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_1).field_dict['Chinese'] = '老 人家'
+    hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_2).field_dict['Chinese'] = '老  人家'
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2]
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+
+    # counted before the batch runs, without requesting audio
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.populate_batch_status_processed_text(note_id_list, batch.source, batch.text_processing, batch_status_obj)
+    assert batch_status_obj.unique_request_count == 2
+    hypertts_instance.populate_batch_status_processed_text(note_id_list, batch.source, batch.text_processing, batch_status_obj,
+        voice_selection=batch.voice_selection)
+    assert batch_status_obj.unique_request_count == 1
+
+def test_simple_duplicate_text(qtbot):
+    # pytest test_audio_batch.py -k test_simple_duplicate_text
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    preferences = config_models.Preferences()
+    preferences.batch_processing.parallelism = 2
+    hypertts_instance.save_preferences(preferences)
+
+    # note 4 has the same text as note 1
+    hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_4).field_dict['Chinese'] = '老人家'
+
+    # count requests made to the service
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    requested_text = []
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        requested_text.append(source_text)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_3, config_gen.note_id_4, config_gen.note_id_5]
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+
+    # note 3 is empty, and notes 1 and 4 share an audio request
+    assert batch_status_obj.unique_request_count == 3
+    assert sorted(requested_text) == sorted(['老人家', '你好', '大使馆'])
+
+    note_1 = hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_1)
+    note_4 = hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_4)
+    assert note_1.set_values['Sound'] == note_4.set_values['Sound']
+    assert batch_status_obj[0].status == constants.BatchNoteStatus.Done
+    assert str(batch_status_obj[2].error) == 'Source text is empty'
+    assert batch_status_obj[3].status == constants.BatchNoteStatus.Done
+    assert batch_status_obj[3].sound_file == batch_status_obj[0].sound_file
+    # the shared audio file only gets registered with the media folder once
+    assert hypertts_instance.anki_utils.media_add_files_calls == [3]
+
+def test_random_voices_duplicate_text(qtbot):
+    # pytest test_audio_batch.py -k test_random_voices_duplicate_text
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    # note 5 has the same text as note 1, the request for note 1 is done by the time note 5 comes up
+    hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_5).field_dict['Chinese'] = '老人家'
+
+    service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+    requested_text = []
+    def get_tts_audio(source_text, voice, options, audio_request_context):
+        requested_text.append(source_text)
+        return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+    hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+    voice_list = hypertts_instance.service_manager.full_voice_list()
+    random = config_models.VoiceSelectionRandom()
+    for voice_name in ['voice_a_1', 'voice_a_2', 'voice_a_3']:
+        voice = [x for x in voice_list if x.name == voice_name][0]
+        random.add_voice(config_models.VoiceWithOptionsRandom(voice, {}))
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+    batch.set_voice_selection(random)
+
+    # each distinct text is synthesized once, with the same voice
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+    assert sorted(requested_text) == sorted(['老人家', '你好', '赚钱'])
+    assert batch_status_obj[3].status == constants.BatchNoteStatus.Done
+    assert batch_status_obj[3].sound_file == batch_status_obj[0].sound_file
+
+def test_simple_parallelism_interrupted(qtbot):
+    # pytest test_audio_batch.py -k test_simple_parallelism_interrupted
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    preferences = config_models.Preferences()
+    preferences.batch_processing.parallelism = 2
+    hypertts_instance.save_preferences(preferences)
+
+    batch = testing_utils.create_simple_batch(hypertts_instance, save_preset=False)
+
+    note_id_list = [config_gen.note_id_1, config_gen.note_id_2, config_gen.note_id_4, config_gen.note_id_5]
+
+    # stop the batch as soon as the first note is done
+    listener = MockBatchStatusListener(hypertts_instance.anki_utils)
+    batch_status_obj = batch_status.BatchStatus(hypertts_instance.anki_utils, note_id_list, listener)
+    def batch_change(note_id, row, total_count, start_time, current_time):
+        if batch_status_obj[row].status == constants.BatchNoteStatus.Done:
+            batch_status_obj.stop()
+    listener.batch_change = batch_change
+    hypertts_instance.process_batch_audio(note_id_list, batch, batch_status_obj, testing_utils.MockCollection())
+
+    assert batch_status_obj[0].status == constants.BatchNoteStatus.Done
+    # the remaining notes were not applied
+    for row in [1, 2, 3]:
+        assert batch_status_obj[row].status == None
+    note_5 = hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_5)
+    assert 'Sound' not in note_5.set_values
+    # the completed note was still saved
+    assert hypertts_instance.anki_utils.get_note_by_id(config_gen.note_id_1).flush_called == True
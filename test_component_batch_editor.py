@@ -136,7 +136,7 @@ def test_batch_dialog_editor_create_then_load(qtbot):
         dialog.close()
 
         # make sure the preset was saved
-        assert preset_uuid in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        assert preset_uuid in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
 
     hypertts_instance.anki_utils.dialog_input_fn_map[constants.DIALOG_ID_BATCH] = batch_dialog_input_sequence
     component_batch.create_dialog_editor_new_preset(hypertts_instance, editor_context)                
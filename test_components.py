@@ -30,6 +30,11 @@ import component_realtime
 import component_hyperttspro
 import component_shortcuts
 import component_errorhandling
+import component_batchprocessing
+import component_audiocache
+import component_priorityvoices
+import component_startuptimings
+import startup_timings
 import component_preferences
 import component_presetmappingrules
 import component_mappingrule
@@ -429,6 +434,11 @@ def test_voice_selection_filters(qtbot):
     for voice in voiceselection.filtered_voice_list:
         assert voice.gender == constants.Gender.Female
         assert voice.language.lang == languages.Language.ja
+    # voices stay sorted, and the combobox shows the first one
+    voice_labels = [str(voice) for voice in voiceselection.filtered_voice_list]
+    assert voice_labels == sorted(voice_labels)
+    assert voiceselection.voices_combobox.currentText() == voice_labels[0]
+    assert voiceselection.get_selected_voice() == voiceselection.filtered_voice_list[0]
 
     # reset filters again
     qtbot.mouseClick(voiceselection.reset_filters_button, aqt.qt.Qt.MouseButton.LeftButton)    
@@ -439,6 +449,59 @@ def test_voice_selection_filters(qtbot):
 
     # dialog.exec()
 
+def test_voice_selection_search(qtbot):
+    manager = servicemanager.ServiceManager(testing_utils.get_test_services_dir(), 'test_services', True)
+    manager.init_services()
+    manager.get_service('ServiceA').enabled = True
+    manager.get_service('ServiceB').enabled = True
+    anki_utils = testing_utils.MockAnkiUtils({})
+
+    hypertts_instance = hypertts.HyperTTS(anki_utils, manager)
+
+    dialog = gui_testing_utils.EmptyDialog()
+    dialog.setupUi()
+
+    model_change_callback = gui_testing_utils.MockModelChangeCallback()
+    voiceselection = component_voiceselection.VoiceSelection(hypertts_instance, dialog, model_change_callback.model_updated)
+    dialog.addChildWidget(voiceselection.draw())
+
+    def get_voice_names():
+        return [voice.name for voice in voiceselection.filtered_voice_list]
+
+    # search by language name
+    qtbot.keyClicks(voiceselection.search_line_edit, 'japanese')
+    assert sorted(get_voice_names()) == ['alex', 'jane', 'notfound', 'voice_a_3']
+    assert voiceselection.voices_combobox.count() == 4
+    assert voiceselection.get_selected_voice() == voiceselection.filtered_voice_list[0]
+
+    # every word has to match, male doesn't match female
+    qtbot.keyClicks(voiceselection.search_line_edit, ' male')
+    assert sorted(get_voice_names()) == ['alex', 'jane', 'notfound']
+
+    # typos still match
+    voiceselection.search_line_edit.setText('jpanese')
+    assert sorted(get_voice_names()) == ['alex', 'jane', 'notfound', 'voice_a_3']
+
+    # voices with a word equal to the search come before voices with a word starting with it
+    voiceselection.search_line_edit.setText('a')
+    voice_names = get_voice_names()
+    assert sorted(voice_names[:3]) == ['voice_a_1', 'voice_a_2', 'voice_a_3']
+    assert voice_names[3:] == ['alex']
+
+    # search is restricted to the voices matching the filters
+    voiceselection.search_line_edit.setText('japanese')
+    voiceselection.services_combobox.setCurrentText('ServiceA')
+    assert get_voice_names() == ['voice_a_3']
+
+    voiceselection.search_line_edit.setText('nothing like this')
+    assert get_voice_names() == []
+    assert voiceselection.voices_combobox.count() == 0
+
+    # reset filters clears the search
+    qtbot.mouseClick(voiceselection.reset_filters_button, aqt.qt.Qt.MouseButton.LeftButton)
+    assert voiceselection.search_line_edit.text() == ''
+    assert len(voiceselection.filtered_voice_list) == len(voiceselection.voice_list)
+
 def test_voice_selection_samples(qtbot):
     hypertts_instance = gui_testing_utils.get_hypertts_instance()
 
@@ -516,6 +579,22 @@ def test_voice_selection_load_model(qtbot):
     assert format_widget != None
     assert format_widget.currentText() == 'ogg_opus'
 
+    # single voice, hidden by the filters and the search
+    # ==================================================
+
+    voiceselection.languages_combobox.setCurrentText('Japanese')
+    voiceselection.search_line_edit.setText('voice_a_3')
+    assert str(voice_a_2) not in [str(voice) for voice in voiceselection.filtered_voice_list]
+
+    model = config_models.VoiceSelectionSingle()
+    model.voice = config_models.VoiceWithOptions(voice_a_2, {})
+
+    voiceselection.load_model(model)
+
+    assert voiceselection.voices_combobox.currentText() == str(voice_a_2)
+    assert voiceselection.languages_combobox.currentText() == constants.LABEL_FILTER_ALL
+    assert voiceselection.search_line_edit.text() == ''
+
     # single voice, mp3 format
     # ========================
 
@@ -782,6 +861,21 @@ def test_batch_preview(qtbot):
     batch_preview.load_model(batch_config)
     dialog.addChildLayout(batch_preview.draw())
 
+    # with text processing, the preview shows how many audio requests will be made
+    batch_config.set_text_processing(config_models.TextProcessing())
+    batch_preview.load_model(batch_config)
+    assert batch_preview.unique_requests_label.text() == '2 notes, 2 unique audio requests'
+    assert batch_preview.resume_button.isVisibleTo(dialog) == False
+
+    # a previous run of the same batch was interrupted
+    journal = hypertts_instance.get_batch_journal(batch_config, note_id_list)
+    journal.start()
+    journal.record_notes([(config_gen.note_id_1, 'Done', 'hypertts-1.mp3')])
+    batch_preview.load_model(batch_config)
+    assert batch_preview.resume_button.isVisibleTo(dialog) == True
+    assert batch_preview.resume_label.text() == 'A previous run was interrupted after 1 notes'
+    journal.delete()
+
     # dialog.exec()
     # return 
 
@@ -817,7 +911,7 @@ def test_batch_dialog_1(qtbot):
 
         print(hypertts_instance.anki_utils.written_config)
         expected_uuid = 'uuid_1'
-        assert expected_uuid in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        assert expected_uuid in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
 
         # try to deserialize that config, it should have the English field selected
         deserialized_model = hypertts_instance.load_preset(expected_uuid)
@@ -878,10 +972,10 @@ def test_batch_dialog_1(qtbot):
         qtbot.mouseClick(dialog.batch_component.profile_save_button, aqt.qt.Qt.MouseButton.LeftButton)
 
         # make sure the preset was saved
-        pprint.pprint(hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS])
-        assert expected_uuid in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        pprint.pprint(hypertts_instance.get_preset_list())
+        assert expected_uuid in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
         # ensure the name of the preset that was saved is correct
-        assert hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS][expected_uuid]['name'] == 'my preset 2 (copy)'
+        assert hypertts_instance.get_preset_name(expected_uuid) == 'my preset 2 (copy)'
 
         # rename the preset, and save it 
         hypertts_instance.anki_utils.ask_user_get_text_response = 'my preset 3'
@@ -889,7 +983,7 @@ def test_batch_dialog_1(qtbot):
         # save
         qtbot.mouseClick(dialog.batch_component.profile_save_button, aqt.qt.Qt.MouseButton.LeftButton)
         # make sure the name is correct
-        assert hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS][expected_uuid]['name'] == 'my preset 3'
+        assert hypertts_instance.get_preset_name(expected_uuid) == 'my preset 3'
 
     hypertts_instance.anki_utils.dialog_input_fn_map[constants.DIALOG_ID_BATCH] = dialog_input_sequence
     component_batch.create_component_batch_browser_new_preset(hypertts_instance, note_id_list, 'my preset 1')
@@ -970,7 +1064,7 @@ def test_batch_dialog_1(qtbot):
         qtbot.mouseClick(dialog.batch_component.profile_delete_button, aqt.qt.Qt.MouseButton.LeftButton)
 
         # make sure the profile was deleted
-        assert 'uuid_1' not in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        assert 'uuid_1' not in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
 
         # we should have a new preset
         assert dialog.batch_component.profile_name_label.text() == 'Preset 1'
@@ -1018,7 +1112,7 @@ def test_batch_dialog_new_preset_save_enabled(qtbot):
 
         # now save the profile, it should work
         qtbot.mouseClick(dialog.batch_component.profile_save_button, aqt.qt.Qt.MouseButton.LeftButton)
-        assert 'uuid_2' in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        assert 'uuid_2' in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
 
     hypertts_instance.anki_utils.dialog_input_fn_map[constants.DIALOG_ID_BATCH] = dialog_input_sequence
     component_batch.create_component_batch_browser_new_preset(hypertts_instance, note_id_list, 'my preset 5')
@@ -1878,7 +1972,7 @@ def test_batch_dialog_load_random(qtbot):
         # save
         qtbot.mouseClick(dialog.batch_component.profile_save_button, aqt.qt.Qt.MouseButton.LeftButton)
 
-        assert 'uuid_1' in hypertts_instance.anki_utils.written_config[constants.CONFIG_PRESETS]
+        assert 'uuid_1' in hypertts_instance.preset_store.get_keys(constants.CONFIG_PRESETS)
 
     hypertts_instance.anki_utils.dialog_input_fn_map[constants.DIALOG_ID_BATCH] = dialog_input_sequence
     component_batch.create_component_batch_browser_new_preset(hypertts_instance, note_id_list, 'my preset 1')
@@ -2084,10 +2178,9 @@ def test_realtime_component(qtbot):
     qtbot.mouseClick(realtime.apply_button, aqt.qt.Qt.MouseButton.LeftButton)
 
     # assertions on config saved
-    assert constants.CONFIG_REALTIME_CONFIG in hypertts_instance.anki_utils.written_config
-    assert 'realtime_0' in hypertts_instance.anki_utils.written_config[constants.CONFIG_REALTIME_CONFIG]
+    assert 'realtime_0' in hypertts_instance.get_realtime_preset_keys()
 
-    realtime_config_saved = hypertts_instance.anki_utils.written_config[constants.CONFIG_REALTIME_CONFIG]['realtime_0']
+    realtime_config_saved = hypertts_instance.preset_store.get(constants.CONFIG_REALTIME_CONFIG, 'realtime_0').data
     assert realtime_config_saved['front']['source']['field_name'] == 'English'
     assert realtime_config_saved['back']['source']['field_name'] == 'Chinese'
 
@@ -2113,9 +2206,6 @@ def test_realtime_component(qtbot):
 
     logger.info('loading an existing realtime configuration')
 
-    # patch the config
-    hypertts_instance.anki_utils.config[constants.CONFIG_REALTIME_CONFIG] = hypertts_instance.anki_utils.written_config[constants.CONFIG_REALTIME_CONFIG]
-
     # patch the templates
     # note_1.note_type()['tmpls'][0]['qfmt'] += '\n' + expected_front_tts_tag
     # note_1.note_type()['tmpls'][0]['afmt'] += '\n' + expected_back_tts_tag
@@ -2148,10 +2238,9 @@ def test_realtime_component(qtbot):
     qtbot.mouseClick(realtime.apply_button, aqt.qt.Qt.MouseButton.LeftButton)
 
     # assertions on config saved
-    assert constants.CONFIG_REALTIME_CONFIG in hypertts_instance.anki_utils.written_config
-    assert 'realtime_0' in hypertts_instance.anki_utils.written_config[constants.CONFIG_REALTIME_CONFIG]
+    assert 'realtime_0' in hypertts_instance.get_realtime_preset_keys()
 
-    realtime_config_saved = hypertts_instance.anki_utils.written_config[constants.CONFIG_REALTIME_CONFIG]['realtime_0']
+    realtime_config_saved = hypertts_instance.preset_store.get(constants.CONFIG_REALTIME_CONFIG, 'realtime_0').data
     assert realtime_config_saved['front']['side_enabled'] == False
 
     # assertions on note type updated
@@ -2395,3 +2484,157 @@ def test_preferences_load(qtbot):
     assert preferences.shortcuts.editor_preview_audio_key_sequence.keySequence().toString() == 'Alt+P'
 
 
+
+def test_batch_processing(qtbot):
+    # pytest test_components.py -k test_batch_processing -s -rPP
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    dialog = gui_testing_utils.EmptyDialog()
+    dialog.setupUi()
+
+    # instantiate dialog
+    # ==================
+
+    model_change_callback = gui_testing_utils.MockModelChangeCallback()
+    batch_processing = component_batchprocessing.BatchProcessing(hypertts_instance, dialog, model_change_callback.model_updated)
+    dialog.addChildWidget(batch_processing.draw())
+
+    # load model
+    # ==========
+
+    model = config_models.BatchProcessing()
+    model.parallelism = 4
+    model.note_update_chunk_size = 50
+
+    batch_processing.load_model(model)
+
+    assert batch_processing.parallelism.value() == 4
+    assert batch_processing.note_update_chunk_size.value() == 50
+    assert model_change_callback.model == None
+
+    # try to make a change
+    # ====================
+
+    batch_processing.parallelism.setValue(8)
+    assert model_change_callback.model.parallelism == 8
+    batch_processing.note_update_chunk_size.setValue(100)
+    assert model_change_callback.model.note_update_chunk_size == 100
+    batch_processing.only_changed_notes.setChecked(True)
+    assert model_change_callback.model.only_changed_notes == True
+
+def test_audio_cache(qtbot):
+    # pytest test_components.py -k test_audio_cache -s -rPP
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+    hypertts_instance.config[constants.CONFIG_REALTIME_CONFIG] = {'realtime_0': {}, 'realtime_1': {}}
+
+    dialog = gui_testing_utils.EmptyDialog()
+    dialog.setupUi()
+
+    # instantiate dialog
+    # ==================
+
+    model_change_callback = gui_testing_utils.MockModelChangeCallback()
+    audio_cache = component_audiocache.AudioCache(hypertts_instance, dialog, model_change_callback.model_updated)
+    dialog.addChildWidget(audio_cache.draw())
+
+    # load model
+    # ==========
+
+    model = config_models.AudioCache()
+    model.max_size_mb = 500
+    model.eviction_policy = constants.AudioCacheEvictionPolicy.LFU
+    model.pinned_realtime_presets = ['realtime_1']
+
+    audio_cache.load_model(model)
+
+    assert audio_cache.max_size_mb.value() == 500
+    assert audio_cache.eviction_policy.currentText() == 'LFU'
+    assert audio_cache.pinned_realtime_presets.item(0).checkState() == aqt.qt.Qt.CheckState.Unchecked
+    assert audio_cache.pinned_realtime_presets.item(1).checkState() == aqt.qt.Qt.CheckState.Checked
+    assert model_change_callback.model == None
+
+    # try to make changes
+    # ===================
+
+    audio_cache.max_size_mb.setValue(200)
+    assert model_change_callback.model.max_size_mb == 200
+
+    audio_cache.eviction_policy.setCurrentText('LRU')
+    assert model_change_callback.model.eviction_policy == constants.AudioCacheEvictionPolicy.LRU
+
+    audio_cache.pinned_realtime_presets.item(0).setCheckState(aqt.qt.Qt.CheckState.Checked)
+    assert model_change_callback.model.pinned_realtime_presets == ['realtime_0', 'realtime_1']
+
+    audio_cache.normalize_whitespace.setChecked(True)
+    assert model_change_callback.model.normalize_whitespace == True
+
+    audio_cache.not_found_ttl_hours.setValue(0)
+    assert model_change_callback.model.not_found_ttl_hours == 0
+
+    audio_cache.realtime_prefetch_card_count.setValue(5)
+    assert model_change_callback.model.realtime_prefetch_card_count == 5
+
+def test_priority_voices(qtbot):
+    # pytest test_components.py -k test_priority_voices -s -rPP
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    dialog = gui_testing_utils.EmptyDialog()
+    dialog.setupUi()
+
+    model_change_callback = gui_testing_utils.MockModelChangeCallback()
+    priority_voices = component_priorityvoices.PriorityVoices(hypertts_instance, dialog, model_change_callback.model_updated)
+    dialog.addChildWidget(priority_voices.draw())
+
+    model = config_models.PriorityVoices()
+    model.hedged_request_count = 3
+    model.hedged_request_stagger_ms = 250
+    priority_voices.load_model(model)
+
+    assert priority_voices.hedged_request_count.value() == 3
+    assert priority_voices.hedged_request_stagger_ms.value() == 250
+    assert model_change_callback.model == None
+
+    priority_voices.hedged_request_count.setValue(2)
+    assert model_change_callback.model.hedged_request_count == 2
+    priority_voices.hedged_request_stagger_ms.setValue(100)
+    assert model_change_callback.model.hedged_request_stagger_ms == 100
+
+def test_startup_timings(qtbot):
+    # pytest test_components.py -k test_startup_timings -s -rPP
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    dialog = gui_testing_utils.EmptyDialog()
+    dialog.setupUi()
+
+    timings = startup_timings.StartupTimings()
+    with timings.time_phase('init services'):
+        with timings.time_phase('import service_a'):
+            pass
+        with timings.time_phase('import service_b'):
+            pass
+    with timings.time_phase('gui init'):
+        pass
+    timings.finish()
+    # phases after startup are not recorded
+    with timings.time_phase('configure ServiceA'):
+        pass
+
+    assert [(name, depth) for name, depth, seconds in timings.get_phases()] == [
+        ('init services', 0),
+        ('import service_a', 1),
+        ('import service_b', 1),
+        ('gui init', 0),
+    ]
+
+    startup_timings_component = component_startuptimings.StartupTimings(hypertts_instance, dialog, timings=timings)
+    dialog.addChildWidget(startup_timings_component.draw())
+
+    lines = startup_timings_component.timings_text.toPlainText().split('\n')
+    assert len(lines) == 5
+    assert lines[0].startswith('init services: ')
+    assert lines[1].startswith('  import service_a: ')
+    assert lines[4].startswith('total: ')
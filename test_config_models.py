@@ -786,6 +786,23 @@ class ConfigModelsTests(unittest.TestCase):
             },
             'error_handling': {
                 'realtime_tts_errors_dialog_type': 'Dialog'
+            },
+            'batch_processing': {
+                'parallelism': 1,
+                'note_update_chunk_size': 250,
+                'only_changed_notes': False
+            },
+            'audio_cache': {
+                'max_size_mb': 0,
+                'eviction_policy': 'LRU',
+                'pinned_realtime_presets': [],
+                'normalize_whitespace': False,
+                'not_found_ttl_hours': 1,
+                'realtime_prefetch_card_count': 0
+            },
+            'priority_voices': {
+                'hedged_request_count': 1,
+                'hedged_request_stagger_ms': 0
             }
         }
         self.assertEqual(config_models.serialize_preferences(preferences), expected_output)
@@ -799,6 +816,8 @@ class ConfigModelsTests(unittest.TestCase):
         self.assertEqual(preferences_1.error_handling.realtime_tts_errors_dialog_type, constants.ErrorDialogType.Dialog)
         self.assertEqual(preferences_1.keyboard_shortcuts.shortcut_editor_add_audio, None)
         self.assertEqual(preferences_1.keyboard_shortcuts.shortcut_editor_preview_audio, None)
+        self.assertEqual(preferences_1.batch_processing.parallelism, 1)
+        self.assertEqual(preferences_1.audio_cache.eviction_policy, constants.AudioCacheEvictionPolicy.LRU)
         self.assertEqual(config_models.serialize_preferences(preferences_1), 
         {
             'keyboard_shortcuts': {
@@ -807,7 +826,24 @@ class ConfigModelsTests(unittest.TestCase):
             },
             'error_handling': {
                 'realtime_tts_errors_dialog_type': 'Dialog'
-            }                           
+            },
+            'batch_processing': {
+                'parallelism': 1,
+                'note_update_chunk_size': 250,
+                'only_changed_notes': False
+            },
+            'audio_cache': {
+                'max_size_mb': 0,
+                'eviction_policy': 'LRU',
+                'pinned_realtime_presets': [],
+                'normalize_whitespace': False,
+                'not_found_ttl_hours': 1,
+                'realtime_prefetch_card_count': 0
+            },
+            'priority_voices': {
+                'hedged_request_count': 1,
+                'hedged_request_stagger_ms': 0
+            }
         })
 
         preferences_config = {
@@ -828,7 +864,24 @@ class ConfigModelsTests(unittest.TestCase):
             },
             'error_handling': {
                 'realtime_tts_errors_dialog_type': 'Dialog'
-            }                           
+            },
+            'batch_processing': {
+                'parallelism': 1,
+                'note_update_chunk_size': 250,
+                'only_changed_notes': False
+            },
+            'audio_cache': {
+                'max_size_mb': 0,
+                'eviction_policy': 'LRU',
+                'pinned_realtime_presets': [],
+                'normalize_whitespace': False,
+                'not_found_ttl_hours': 1,
+                'realtime_prefetch_card_count': 0
+            },
+            'priority_voices': {
+                'hedged_request_count': 1,
+                'hedged_request_stagger_ms': 0
+            }
         })        
 
     def test_preset_mapping_rules(self):
@@ -915,7 +968,30 @@ class ConfigModelsTests(unittest.TestCase):
         # config revision 0
         config = {}
         updated_config = config_models.migrate_configuration(anki_utils, config)
-        self.assertEqual(updated_config['config_schema'], 2)
+        self.assertEqual(updated_config['config_schema'], 3)
+
+    def test_migration_2_to_3(self):
+        anki_utils = testing_utils.MockAnkiUtils({})
+        config = {
+            'config_schema': 2,
+            'configuration': {
+                'service_config': {
+                    'Azure': {
+                        'api_key': 'key',
+                        'throttle_seconds': 0.5
+                    },
+                    'Forvo': {
+                        'api_key': 'key',
+                        'throttle_seconds': 0.0
+                    }
+                }
+            }
+        }
+        updated_config = config_models.migrate_configuration(anki_utils, config)
+        self.assertEqual(updated_config['config_schema'], 3)
+        self.assertEqual(updated_config['configuration']['service_config']['Azure'], 
+            {'api_key': 'key', 'requests_per_second': 2.0, 'burst_size': 1, 'max_in_flight': 1})
+        self.assertEqual(updated_config['configuration']['service_config']['Forvo'], {'api_key': 'key'})
 
 
     def test_migration_0_to_2(self):
@@ -967,7 +1043,7 @@ class ConfigModelsTests(unittest.TestCase):
         }
 
         updated_config = config_models.migrate_configuration(anki_utils, config)
-        self.assertEqual(updated_config['config_schema'], 2)
+        self.assertEqual(updated_config['config_schema'], 3)
         expected_preset_1_uuid = 'uuid_0'
         self.assertIn(expected_preset_1_uuid, updated_config['presets'])
         self.assertEqual(updated_config['presets'][expected_preset_1_uuid]['name'], 'preset_1')
@@ -3,6 +3,8 @@ import os
 import unittest
 import pytest
 import json
+import time
+import threading
 
 addon_dir = os.path.dirname(os.path.realpath(__file__))
 external_dir = os.path.join(addon_dir, 'external')
@@ -12,7 +14,11 @@ import errors
 import testing_utils
 import config_models
 import constants
+import options
 import gui_testing_utils
+import prefetch
+import config_store
+import hypertts
 
 class HyperTTSTests(unittest.TestCase):
 
@@ -93,6 +99,244 @@ yoyo
         priority = config_models.VoiceSelectionPriority()
         self.assertRaises(errors.NoVoicesAdded, hypertts_instance.get_audio_file, 'yoyo', priority, None)
 
+    def test_generate_audio_write_file_single_flight(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+        # count calls to the service, and make them slow enough that the requests overlap
+        service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+        request_count = [0]
+        def get_tts_audio(source_text, voice, options, audio_request_context):
+            request_count[0] += 1
+            time.sleep(0.1)
+            return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+        hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+
+        results = []
+        def request_audio(source_text):
+            results.append(hypertts_instance.generate_audio_write_file(source_text, voice_a_1, {}, None))
+
+        threads = [threading.Thread(target=request_audio, args=('old people',)) for i in range(4)]
+        threads.append(threading.Thread(target=request_audio, args=('young people',)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # one synthesis for each distinct text
+        self.assertEqual(request_count[0], 2)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(set(results)), 2)
+        for full_filename, audio_filename in results:
+            self.assertTrue(os.path.getsize(full_filename) > 0)
+        self.assertEqual(hypertts_instance.audio_single_flight.calls, {})
+
+    def test_generate_audio_write_file_cache_index(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+        service_manager_get_tts_audio = hypertts_instance.service_manager.get_tts_audio
+        request_count = [0]
+        def get_tts_audio(source_text, voice, options, audio_request_context):
+            request_count[0] += 1
+            return service_manager_get_tts_audio(source_text, voice, options, audio_request_context)
+        hypertts_instance.service_manager.get_tts_audio = get_tts_audio
+
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+
+        # the first request synthesizes the audio and indexes the file
+        full_filename, audio_filename = hypertts_instance.generate_audio_write_file('old people', voice_a_1, {}, None)
+        self.assertEqual(request_count[0], 1)
+        hash_str = hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {})
+
+        # the second one is answered by the index
+        hypertts_instance.generate_audio_write_file('old people', voice_a_1, {}, None)
+        self.assertEqual(request_count[0], 1)
+        entry = hypertts_instance.audio_cache.lookup(hash_str)
+        self.assertEqual(entry.filename, audio_filename)
+        self.assertEqual(entry.size, os.path.getsize(full_filename))
+        self.assertEqual(entry.service, 'ServiceA')
+        self.assertEqual(json.loads(entry.voice_key), {'name': 'voice_1'})
+        self.assertEqual(entry.format, 'mp3')
+        self.assertEqual(entry.hit_count, 2)
+        self.assertTrue(entry.last_access >= entry.created)
+
+        # files written before the index existed get added to it without requesting audio again
+        hypertts_instance.audio_cache.remove_entry(hash_str)
+        self.assertEqual(hypertts_instance.audio_cache.lookup(hash_str), None)
+        hypertts_instance.generate_audio_write_file('old people', voice_a_1, {}, None)
+        self.assertEqual(request_count[0], 1)
+        self.assertEqual(hypertts_instance.audio_cache.lookup(hash_str).hit_count, 1)
+
+        # hits are written to the database in one go
+        hit_count_query = 'SELECT hit_count FROM audio_files WHERE hash = ?'
+        self.assertEqual(hypertts_instance.audio_cache.get_connection().execute(hit_count_query, (hash_str,)).fetchone()[0], 0)
+        hypertts_instance.audio_cache.flush_hits()
+        self.assertEqual(hypertts_instance.audio_cache.get_connection().execute(hit_count_query, (hash_str,)).fetchone()[0], 1)
+        self.assertEqual(hypertts_instance.audio_cache.lookup(hash_str).hit_count, 2)
+
+        # a file deleted outside of HyperTTS gets requested again
+        os.remove(full_filename)
+        hypertts_instance.generate_audio_write_file('old people', voice_a_1, {}, None)
+        self.assertEqual(request_count[0], 2)
+        self.assertTrue(os.path.getsize(full_filename) > 0)
+        self.assertEqual(hypertts_instance.audio_cache.lookup(hash_str).hit_count, 1)
+        self.assertEqual([filename for filename in os.listdir(os.path.dirname(full_filename)) if filename.endswith('.tmp')], [])
+
+    def test_get_hash_for_audio_request(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+
+        hash_str = hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {'pitch': 5.0, 'style': 2})
+        # option order doesn't matter
+        self.assertEqual(hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {'style': 2, 'pitch': 5.0}), hash_str)
+        # options set to their default don't matter
+        self.assertEqual(hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {'style': 2, 'pitch': 5.0, 'speaking_rate': 1.0}), hash_str)
+        self.assertNotEqual(hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {'style': 2, 'pitch': 5.0, 'speaking_rate': 2.0}), hash_str)
+        # whitespace only matters when normalization is disabled
+        self.assertNotEqual(hypertts_instance.get_hash_for_audio_request(' old  people', voice_a_1, {'pitch': 5.0, 'style': 2}), hash_str)
+        preferences = config_models.Preferences()
+        preferences.audio_cache.normalize_whitespace = True
+        hypertts_instance.save_preferences(preferences)
+        self.assertEqual(hypertts_instance.get_hash_for_audio_request(' old  people', voice_a_1, {'pitch': 5.0, 'style': 2}), hash_str)
+
+    def test_cached_preferences(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+
+        deserialize_preferences = hypertts_instance.deserialize_preferences
+        deserialize_count = [0]
+        def count_deserialize_preferences(preferences_config):
+            deserialize_count[0] += 1
+            return deserialize_preferences(preferences_config)
+        hypertts_instance.deserialize_preferences = count_deserialize_preferences
+
+        # preferences are deserialized once, until they are saved again
+        for i in range(3):
+            hypertts_instance.get_hash_for_audio_request('old people', voice_a_1, {})
+        self.assertEqual(deserialize_count[0], 1)
+        preferences = hypertts_instance.get_preferences()
+        preferences.audio_cache.normalize_whitespace = True
+        hypertts_instance.save_preferences(preferences)
+        self.assertEqual(hypertts_instance.get_cached_preferences().audio_cache.normalize_whitespace, True)
+        self.assertEqual(deserialize_count[0], 3)
+
+    def test_generate_audio_write_file_legacy_hash(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+
+        # audio cached before canonical keys were introduced
+        legacy_hash_str = hypertts_instance.get_legacy_hash_for_audio_request('old people', voice_a_1, {'pitch': 5.0})
+        legacy_full_filename = hypertts_instance.get_full_audio_file_name(legacy_hash_str, options.AudioFormat.mp3)
+        with open(legacy_full_filename, 'wb') as f:
+            f.write(b'legacy audio')
+
+        hypertts_instance.service_manager.get_tts_audio = None
+        full_filename, audio_filename = hypertts_instance.generate_audio_write_file('old people', voice_a_1, {'pitch': 5.0}, None)
+        self.assertNotEqual(full_filename, legacy_full_filename)
+        self.assertFalse(os.path.exists(legacy_full_filename))
+        with open(full_filename, 'rb') as f:
+            self.assertEqual(f.read(), b'legacy audio')
+
+    def test_evict_audio_cache(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+        user_files_dir = hypertts_instance.anki_utils.get_user_files_dir()
+
+        # index 4 files of 512kb, accessed an hour ago, most recent last
+        audio_cache = hypertts_instance.audio_cache
+        for i in range(4):
+            filename = f'hypertts-file_{i}.mp3'
+            with open(os.path.join(user_files_dir, filename), 'wb') as f:
+                f.write(b'0' * 512 * 1024)
+            realtime_preset = 'realtime_0' if i == 0 else None
+            audio_cache.add_entry(f'file_{i}', filename, 512 * 1024, 'ServiceA', {'name': 'voice_1'}, 'mp3', realtime_preset=realtime_preset)
+            audio_cache.get_connection().execute('UPDATE audio_files SET last_access = ? WHERE hash = ?', (time.time() - 3600 + i, f'file_{i}'))
+        audio_cache.get_connection().commit()
+        # another realtime preset playing file_0 doesn't unpin it
+        audio_cache.lookup('file_0', realtime_preset='realtime_1')
+        audio_cache.flush_hits()
+        audio_cache.get_connection().execute('UPDATE audio_files SET last_access = ? WHERE hash = ?', (time.time() - 3600, 'file_0'))
+        audio_cache.get_connection().commit()
+        # file_1 was added to the collection
+        hypertts_instance.anki_utils.media_add_file(os.path.join(user_files_dir, 'hypertts-file_1.mp3'))
+
+        # 1mb budget: file_0 is pinned, file_1 is in the collection and doesn't count, so only file_2 gets evicted
+        audio_cache_preferences = config_models.AudioCache(max_size_mb=1, pinned_realtime_presets=['realtime_0'])
+        evicted_count = hypertts_instance.evict_audio_cache(audio_cache_preferences)
+        self.assertEqual(evicted_count, 1)
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_0.mp3')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_1.mp3')))
+        self.assertFalse(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_2.mp3')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_3.mp3')))
+        # file_1 won't be looked at again
+        self.assertEqual(audio_cache.get_evictable_size(), 1024 * 1024)
+        self.assertEqual(audio_cache.get_connection().execute('SELECT in_collection FROM audio_files WHERE hash = ?', ('file_1',)).fetchone()[0], 1)
+        self.assertEqual(len(audio_cache.get_eviction_candidates(constants.AudioCacheEvictionPolicy.LRU, [], time.time(), 10)), 2)
+
+        # under budget, writing new audio doesn't schedule eviction
+        preferences = config_models.Preferences()
+        preferences.audio_cache.max_size_mb = 2
+        hypertts_instance.save_preferences(preferences)
+        voice_list = hypertts_instance.service_manager.full_voice_list()
+        voice_a_1 = [voice for voice in voice_list if voice.name == 'voice_a_1'][0]
+        full_filename, audio_filename = hypertts_instance.generate_audio_write_file('old people', voice_a_1, {}, None)
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_0.mp3')))
+
+        # when over budget, writing new audio schedules eviction in the background, which won't touch the new file
+        with open(os.path.join(user_files_dir, 'hypertts-file_4.mp3'), 'wb') as f:
+            f.write(b'0' * 1024 * 1024)
+        audio_cache.add_entry('file_4', 'hypertts-file_4.mp3', 1024 * 1024, 'ServiceA', {'name': 'voice_1'}, 'mp3')
+        audio_cache.get_connection().execute('UPDATE audio_files SET last_access = ? WHERE hash = ?', (time.time() - 1800, 'file_4'))
+        audio_cache.get_connection().commit()
+        full_filename, audio_filename = hypertts_instance.generate_audio_write_file('old people 2', voice_a_1, {}, None)
+        self.assertTrue(os.path.exists(full_filename))
+        self.assertFalse(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_0.mp3')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_3.mp3')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_4.mp3')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'hypertts-file_1.mp3')))
+        self.assertEqual(hypertts_instance.audio_cache_eviction_running, False)
+
+    def test_backfill_audio_cache(self):
+        config_gen = testing_utils.TestConfigGenerator()
+        hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+        user_files_dir = hypertts_instance.anki_utils.get_user_files_dir()
+        audio_cache = hypertts_instance.audio_cache
+
+        # audio files written before the index existed, and a file which isn't audio
+        for filename, size in [('hypertts-0a1b.mp3', 512 * 1024), ('hypertts-2c3d.ogg', 1024 * 1024), ('other.txt', 10)]:
+            with open(os.path.join(user_files_dir, filename), 'wb') as f:
+                f.write(b'0' * size)
+        os.utime(os.path.join(user_files_dir, 'hypertts-2c3d.ogg'), (time.time() - 7200, time.time() - 7200))
+        preferences = config_models.Preferences()
+        preferences.audio_cache.max_size_mb = 1
+        hypertts_instance.save_preferences(preferences)
+
+        # the files get indexed, which puts the cache over budget, so the oldest one gets evicted
+        hypertts_instance.schedule_audio_cache_backfill()
+        self.assertTrue(audio_cache.is_backfill_done())
+        self.assertEqual(audio_cache.lookup('0a1b').size, 512 * 1024)
+        self.assertEqual(audio_cache.lookup('2c3d'), None)
+        self.assertFalse(os.path.exists(os.path.join(user_files_dir, 'hypertts-2c3d.ogg')))
+        self.assertTrue(os.path.exists(os.path.join(user_files_dir, 'other.txt')))
+        self.assertEqual(audio_cache.get_evictable_size(), 512 * 1024)
+
+        # only done once
+        with open(os.path.join(user_files_dir, 'hypertts-4e5f.mp3'), 'wb') as f:
+            f.write(b'0')
+        hypertts_instance.schedule_audio_cache_backfill()
+        self.assertEqual(audio_cache.lookup('4e5f'), None)
+
     def test_process_hypertts_tag(self):
         config_gen = testing_utils.TestConfigGenerator()
         hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
@@ -409,4 +653,193 @@ yoyo
         audio_full_path = hypertts_instance.anki_utils.extract_sound_tag_audio_full_path(sound_tag)
         audio_data = hypertts_instance.anki_utils.extract_mock_tts_audio(audio_full_path)
 
-        assert audio_data['source_text'] == '老人家'
\ No newline at end of file
+        assert audio_data['source_text'] == '老人家'
+
+def test_realtime_prefetch(qtbot):
+    # pytest test_hypertts.py -k test_realtime_prefetch
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    # disabled by default
+    assert config_models.Preferences().audio_cache.realtime_prefetch_card_count == 0
+    preferences = config_models.Preferences()
+    preferences.audio_cache.realtime_prefetch_card_count = 2
+    hypertts_instance.save_preferences(preferences)
+
+    prefetched_text = []
+    def get_audio_filename_tts_tag(tts_tag):
+        prefetched_text.append(tts_tag.field_text)
+        if tts_tag.field_text == 'error':
+            raise errors.SourceTextEmpty()
+    hypertts_instance.get_audio_filename_tts_tag = get_audio_filename_tts_tag
+
+    hypertts_instance.anki_utils.upcoming_review_tts_tags = [
+        testing_utils.MockTTSTag('old people', ['hypertts_preset=Front_realtime_0']),
+        testing_utils.MockTTSTag('error', ['hypertts_preset=Back_realtime_0']),
+        testing_utils.MockTTSTag('hello', ['hypertts_preset=Front_realtime_0']),
+    ]
+    current_card = testing_utils.MockCard(0, None, 0, None, None)
+    current_card.id = 1
+
+    # upcoming cards are only looked up once the timer expires, after the card has been displayed
+    timer_tasks = []
+    anki_utils_call_on_timer_expire = hypertts_instance.anki_utils.call_on_timer_expire
+    hypertts_instance.anki_utils.call_on_timer_expire = lambda timer_obj, task: timer_tasks.append((timer_obj, task))
+    prefetcher = prefetch.RealtimePrefetcher(hypertts_instance)
+    prefetcher.card_shown(current_card)
+    assert hypertts_instance.anki_utils.upcoming_review_card_count == None
+    assert timer_tasks[0][0].delay_ms == constants.AUDIO_CACHE_REALTIME_PREFETCH_DELAY_MS
+
+    # audio for upcoming cards gets requested in the background, errors are ignored
+    timer_tasks[0][1]()
+    prefetcher.close(wait=True)
+    assert prefetched_text == ['old people', 'error', 'hello']
+    hypertts_instance.anki_utils.call_on_timer_expire = anki_utils_call_on_timer_expire
+    assert hypertts_instance.anki_utils.upcoming_review_card_count == 2
+
+    # disabled
+    preferences.audio_cache.realtime_prefetch_card_count = 0
+    hypertts_instance.save_preferences(preferences)
+    prefetched_text.clear()
+    prefetcher.card_shown(current_card)
+    prefetcher.close(wait=True)
+    assert prefetched_text == []
+
+    # schedulers which don't expose their queue
+    preferences.audio_cache.realtime_prefetch_card_count = 2
+    hypertts_instance.save_preferences(preferences)
+    hypertts_instance.anki_utils.review_queue_available = lambda: False
+    prefetcher.card_shown(current_card)
+    prefetcher.close(wait=True)
+    assert prefetched_text == []
+    assert prefetcher.review_queue_unavailable_logged == True
+
+def test_realtime_side_config_cache(qtbot):
+    # pytest test_hypertts.py -k test_realtime_side_config_cache
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+
+    voice_list = hypertts_instance.service_manager.full_voice_list()
+    def build_realtime_config(voice_name):
+        voice = [x for x in voice_list if x.name == voice_name][0]
+        voice_selection = config_models.VoiceSelectionSingle()
+        voice_selection.set_voice(config_models.VoiceWithOptions(voice, {}))
+        front = config_models.RealtimeConfigSide()
+        front.side_enabled = True
+        front.source = config_models.RealtimeSourceAnkiTTS()
+        front.source.field_name = 'Chinese'
+        front.source.field_type = constants.AnkiTTSFieldType.Regular
+        front.text_processing = config_models.TextProcessing()
+        front.voice_selection = voice_selection
+        realtime_config = config_models.RealtimeConfig()
+        realtime_config.front = front
+        realtime_config.back = config_models.RealtimeConfigSide()
+        return realtime_config
+
+    settings_key = hypertts_instance.save_realtime_config(build_realtime_config('voice_a_1'), None)
+
+    # count deserializations
+    deserialize_realtime_config = hypertts_instance.deserialize_realtime_config
+    load_count = []
+    def counting_deserialize_realtime_config(realtime_config):
+        load_count.append(realtime_config)
+        return deserialize_realtime_config(realtime_config)
+    hypertts_instance.deserialize_realtime_config = counting_deserialize_realtime_config
+
+    front_1 = hypertts_instance.get_realtime_side_config(f'Front_{settings_key}')
+    front_2 = hypertts_instance.get_realtime_side_config(f'Front_{settings_key}')
+    back = hypertts_instance.get_realtime_side_config(f'Back_{settings_key}')
+    assert front_1 is front_2
+    assert back.side_enabled == False
+    assert front_1.voice_selection.voice.voice.name == 'voice_a_1'
+    assert len(load_count) == 1
+
+    # saving the preset invalidates the cache
+    hypertts_instance.save_realtime_config(build_realtime_config('voice_a_2'), settings_key)
+    front_3 = hypertts_instance.get_realtime_side_config(f'Front_{settings_key}')
+    assert front_3.voice_selection.voice.voice.name == 'voice_a_2'
+    assert len(load_count) == 2
+
+    # so does saving the services configuration
+    hypertts_instance.save_configuration(hypertts_instance.get_configuration())
+    hypertts_instance.get_realtime_side_config(f'Front_{settings_key}')
+    assert len(load_count) == 3
+
+def test_config_store(qtbot):
+    # pytest test_hypertts.py -k test_config_store
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+    anki_utils = hypertts_instance.anki_utils
+
+    # saving unchanged preferences doesn't write the config
+    preferences = hypertts_instance.get_preferences()
+    preferences.batch_processing.parallelism = 4
+    hypertts_instance.save_preferences(preferences)
+    assert anki_utils.written_config['preferences']['batch_processing']['parallelism'] == 4
+    anki_utils.written_config = None
+    hypertts_instance.save_preferences(preferences)
+    assert anki_utils.written_config == None
+
+    # a config which is already migrated doesn't get written on startup
+    hypertts_instance = hypertts.HyperTTS(anki_utils, hypertts_instance.service_manager)
+    assert anki_utils.written_config == None
+
+    # saves made before the timer expires are written once
+    timer_tasks = []
+    anki_utils.call_on_timer_expire = lambda timer, task: timer_tasks.append(task)
+    write_count = []
+    anki_utils.write_config = lambda config: write_count.append(True)
+    store = config_store.ConfigStore(anki_utils, {'presets': {}})
+    store.config['presets']['uuid_1'] = {'name': 'preset 1'}
+    store.save()
+    store.config['presets']['uuid_2'] = {'name': 'preset 2'}
+    store.save()
+    for task in timer_tasks:
+        task()
+    assert len(timer_tasks) == 2
+    assert len(write_count) == 1
+
+def test_preset_store(qtbot):
+    # pytest test_hypertts.py -k test_preset_store
+    config_gen = testing_utils.TestConfigGenerator()
+    hypertts_instance = config_gen.build_hypertts_instance_test_servicemanager('default')
+    anki_utils = hypertts_instance.anki_utils
+
+    # presets stored in the add-on config get moved to the store
+    batch = testing_utils.create_simple_batch(hypertts_instance, preset_id='uuid_0', name='preset 0', save_preset=False)
+    anki_utils.config[constants.CONFIG_PRESETS] = {'uuid_0': batch.serialize()}
+    anki_utils.config[constants.CONFIG_REALTIME_CONFIG] = {'realtime_0': {'front': {}, 'back': {}}}
+    assert [preset_info.name for preset_info in hypertts_instance.get_preset_list()] == ['preset 0']
+    assert hypertts_instance.get_realtime_preset_keys() == ['realtime_0']
+    assert constants.CONFIG_PRESETS not in anki_utils.written_config
+    assert constants.CONFIG_REALTIME_CONFIG not in anki_utils.written_config
+
+    # each save increases the version
+    store = hypertts_instance.preset_store
+    assert store.get(constants.CONFIG_PRESETS, 'uuid_0').version == 1
+    batch.name = 'preset 0 renamed'
+    hypertts_instance.save_preset(batch)
+    stored_preset = store.get(constants.CONFIG_PRESETS, 'uuid_0')
+    assert stored_preset.version == 2
+    assert stored_preset.name == 'preset 0 renamed'
+
+    # saving a preset doesn't write the add-on config
+    anki_utils.written_config = None
+    testing_utils.create_simple_batch(hypertts_instance, preset_id='uuid_1', name='preset 1')
+    assert anki_utils.written_config == None
+    assert hypertts_instance.get_preset_name('uuid_1') == 'preset 1'
+
+    # deserialized presets are cached until they are saved again
+    preset_1 = hypertts_instance.get_cached_preset('uuid_0')
+    assert hypertts_instance.get_cached_preset('uuid_0') is preset_1
+    assert hypertts_instance.load_preset('uuid_0') is not preset_1
+    hypertts_instance.save_preset(batch)
+    assert hypertts_instance.get_cached_preset('uuid_0') is not preset_1
+
+    hypertts_instance.delete_preset('uuid_0')
+    pytest.raises(errors.PresetNotFound, hypertts_instance.get_cached_preset, 'uuid_0')
+    pytest.raises(errors.PresetNotFound, hypertts_instance.delete_preset, 'uuid_0')
+
+    # the store persists across instances
+    hypertts_instance = hypertts.HyperTTS(anki_utils, hypertts_instance.service_manager)
+    assert [preset_info.id for preset_info in hypertts_instance.get_preset_list()] == ['uuid_1']
@@ -2,6 +2,9 @@ import sys
 import os
 import json
 import unittest
+import time
+import threading
+import tempfile
 
 # add external modules to sys.path
 addon_dir = os.path.dirname(os.path.realpath(__file__))
@@ -16,6 +19,8 @@ import servicemanager
 import voice
 import testing_utils
 import errors
+import ratelimiter
+import voicecatalogue
 
 
 class ServiceManagerTests(unittest.TestCase):
@@ -249,6 +254,94 @@ class ServiceManagerTests(unittest.TestCase):
         assert deserialized_voice.service.name == 'ServiceA'
 
 
+    def test_deserialize_voice_registry(self):
+        self.manager.init_services()
+
+        configuration = config_models.Configuration()
+        configuration.set_service_enabled('ServiceA', True)
+        configuration.set_service_enabled('ServiceB', False)
+        self.manager.configure(configuration)
+
+        # count voice list loads
+        service_a = self.manager.get_service('ServiceA')
+        service_a_voice_list = service_a.voice_list
+        voice_list_calls = []
+        def voice_list():
+            voice_list_calls.append(True)
+            return service_a_voice_list()
+        service_a.voice_list = voice_list
+
+        voice_1 = self.manager.deserialize_voice({'service': 'ServiceA', 'voice_key': {'name': 'voice_1'}})
+        voice_2 = self.manager.deserialize_voice({'service': 'ServiceA', 'voice_key': {'name': 'voice_2'}})
+        voice_1_again = self.manager.deserialize_voice({'service': 'ServiceA', 'voice_key': {'name': 'voice_1'}})
+        assert voice_1.name == 'voice_a_1'
+        assert voice_2.name == 'voice_a_2'
+        assert voice_1_again is voice_1
+        assert len(voice_list_calls) == 1
+
+        self.assertRaises(errors.VoiceNotFound, self.manager.deserialize_voice, {'service': 'ServiceA', 'voice_key': {'name': 'voice_42'}})
+        self.assertRaises(errors.VoiceNotFound, self.manager.deserialize_voice, {'service': 'ServiceB', 'voice_key': {'name': 'voice_1'}})
+        self.assertRaises(errors.VoiceNotFound, self.manager.deserialize_voice, {'service': 'ServiceZ', 'voice_key': {'name': 'voice_1'}})
+
+        # configuring the services again rebuilds the registry
+        self.manager.configure(configuration)
+        self.manager.deserialize_voice({'service': 'ServiceA', 'voice_key': {'name': 'voice_1'}})
+        assert len(voice_list_calls) == 2
+        del service_a.voice_list
+
+    def test_voice_flyweight(self):
+        self.manager.init_services()
+        service_a = self.manager.get_service('ServiceA')
+
+        # building the voice list again returns the same voices
+        voice_list_1 = service_a.voice_list()
+        voice_list_2 = service_a.voice_list()
+        assert all([voice_1 is voice_2 for voice_1, voice_2 in zip(voice_list_1, voice_list_2)])
+
+        # voices are hashable
+        voice_set = set(voice_list_1)
+        assert len(voice_set) == len(voice_list_1)
+        assert voice_list_2[0] in voice_set
+        voice_1 = voice_list_1[0]
+        assert {voice_1: True}[voice.Voice(voice_1.name, voice_1.gender, voice_1.language, voice_1.service, dict(voice_1.voice_key), voice_1.options)]
+
+        # a voice which changed is a new instance, but still equal
+        renamed_voice = voice.Voice('renamed', voice_1.gender, voice_1.language, voice_1.service, voice_1.voice_key, voice_1.options)
+        assert renamed_voice is not voice_1
+        assert renamed_voice == voice_1
+        assert hash(renamed_voice) == hash(voice_1)
+
+        # immutable
+        self.assertRaises(AttributeError, setattr, voice_1, '_name', 'other name')
+        self.assertRaises(AttributeError, setattr, voice_1, 'extra_attribute', 42)
+        assert voice_1 != None
+
+    def test_voice_catalogue(self):
+        voice_list = [
+            {'name': 'Voice 1', 'gender': 'Female', 'language': 'en_US', 'service': 'ServiceA', 'key': {'name': 'voice_1'}, 'options': {}},
+            {'name': 'Voice 2', 'gender': 'Male', 'language': 'fr_FR', 'service': 'ServiceA', 'key': {'name': 'voice_2'}, 'options': {'speed': {'default': 1.0}}},
+            {'name': 'Voice 3', 'gender': 'Male', 'language': 'en_US', 'service': 'ServiceB', 'key': {'name': 'voice_3'}, 'options': {}},
+        ]
+        with tempfile.TemporaryDirectory() as catalogue_dir:
+            voicecatalogue.write_catalogue(voice_list, catalogue_dir)
+            assert sorted(os.listdir(catalogue_dir)) == ['ServiceA.json.gz', 'ServiceB.json.gz']
+
+            catalogue = voicecatalogue.VoiceCatalogue(catalogue_dir)
+            assert catalogue.get_voice_data_list('ServiceA') == voice_list[0:2]
+            # only the requested service got loaded
+            assert list(catalogue.service_voices.keys()) == ['ServiceA']
+            assert catalogue.get_languages('ServiceA') == ['en_US', 'fr_FR']
+            assert catalogue.get_voice_data_list('ServiceB') == voice_list[2:3]
+            assert catalogue.get_voice_data_list('ServiceZ') == []
+
+            # the voice list can be exported back from the catalogue
+            assert voicecatalogue.read_catalogue(catalogue_dir) == voice_list
+
+        # the shipped catalogue
+        amazon_voices = voicecatalogue.catalogue.get_voice_data_list('Amazon')
+        assert len(amazon_voices) > 0
+        assert set(amazon_voices[0].keys()) == set(['name', 'gender', 'language', 'service', 'key', 'options'])
+
     def test_get_tts_audio(self):
         self.manager.init_services()
         self.manager.get_service('ServiceA').enabled = True
@@ -267,6 +360,69 @@ class ServiceManagerTests(unittest.TestCase):
         assert audio_result_dict['source_text'] == 'test sentence 123'
         assert audio_result_dict['voice']['voice_key'] == {'name': 'voice_1'}
 
+    def test_get_tts_audio_rate_limited(self):
+        self.manager.init_services()
+
+        configuration = config_models.Configuration()
+        configuration.set_service_enabled('ServiceA', True)
+        configuration.set_service_configuration_key('ServiceA', 'api_key', 'yoyo')
+        configuration.set_service_configuration_key('ServiceA', 'requests_per_second', 20.0)
+        configuration.set_service_configuration_key('ServiceA', 'burst_size', 2)
+        self.manager.configure(configuration)
+        assert 'ServiceA' in self.manager.rate_limiters
+        assert 'ServiceB' not in self.manager.rate_limiters
+
+        servicea_voice_1 = [voice for voice in self.manager.full_voice_list() if voice.service.name == 'ServiceA'][0]
+
+        # the first 2 requests go through right away, the next 4 must wait 50ms each
+        start_time = time.monotonic()
+        for i in range(6):
+            audio_result = self.manager.get_tts_audio(f'test sentence {i}', servicea_voice_1, {}, None)
+            assert json.loads(audio_result)['source_text'] == f'test sentence {i}'
+        elapsed = time.monotonic() - start_time
+        assert elapsed >= 0.18
+
+        # removing the settings removes the rate limiter
+        configuration.set_service_config({'ServiceA': {'api_key': 'yoyo'}})
+        self.manager.configure(configuration)
+        assert self.manager.rate_limiters == {}
+
+        # rate limiting settings alone don't configure the service, which would fail without its api_key
+        configuration.set_service_config({'ServiceA': {'requests_per_second': 20.0}})
+        self.manager.configure(configuration)
+        assert 'ServiceA' in self.manager.rate_limiters
+
+        # requests through HyperTTS Pro are rate limited too
+        configuration.hypertts_pro_api_key = 'pro_key'
+        self.manager.configure(configuration)
+        assert 'ServiceA' in self.manager.rate_limiters
+        configuration.hypertts_pro_api_key = None
+        self.manager.configure(configuration)
+
+    def test_rate_limiter_max_in_flight(self):
+        rate_limiter = ratelimiter.RateLimiter(0, 1, 2)
+        lock = threading.Lock()
+        in_flight = [0]
+        max_in_flight = [0]
+
+        def request():
+            with rate_limiter.get_request_context():
+                with lock:
+                    in_flight[0] += 1
+                    max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+                time.sleep(0.02)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=request) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max_in_flight[0] == 2
+        assert rate_limiter.in_flight == 0
+
     def test_services_configuration(self):
         self.manager.init_services()    
 
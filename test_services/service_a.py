@@ -62,12 +62,14 @@ class ServiceA(service.ServiceBase):
             logger.info(f'sleeping for {delay_s}s')
             time.sleep(delay_s)
 
-        self.requested_audio = {
+        # batches can request audio from several threads at once, don't encode a shared attribute
+        requested_audio = {
             'source_text': source_text,
             'voice': voice.serialize(),
             'options': options
         }
-        encoded_dict = json.dumps(self.requested_audio, indent=2).encode('utf-8')
+        self.requested_audio = requested_audio
+        encoded_dict = json.dumps(requested_audio, indent=2).encode('utf-8')
         return encoded_dict    
 
     def configuration_options(self):
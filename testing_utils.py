@@ -96,11 +96,17 @@ class MockEditor():
 
 class MockCollection():
     def __init__(self):
-        pass
+        # number of notes in each update_notes call
+        self.update_notes_calls = []
 
     def update_note(self, note):
         pass
 
+    def update_notes(self, notes):
+        self.update_notes_calls.append(len(notes))
+        for note in notes:
+            note.flush()
+
 class MockAnkiUtils():
     def __init__(self, config):
         self.config = config
@@ -115,6 +121,10 @@ class MockAnkiUtils():
 
         # sounds
         self.all_played_sounds = []
+        self.added_media_files = []
+        self.media_add_files_calls = []
+        self.upcoming_review_tts_tags = []
+        self.upcoming_review_card_count = None
 
         # undo handling
         self.undo_started = False
@@ -196,8 +206,21 @@ class MockAnkiUtils():
 
     def media_add_file(self, filename):
         self.added_media_file = filename
+        self.added_media_files.append(os.path.basename(filename))
         return filename
 
+    def media_add_files(self, filenames):
+        self.media_add_files_calls.append(len(filenames))
+        added_count = 0
+        for filename in filenames:
+            if os.path.basename(filename) not in self.added_media_files:
+                self.added_media_files.append(os.path.basename(filename))
+                added_count += 1
+        return added_count
+
+    def media_file_exists(self, filename):
+        return filename in self.added_media_files
+
     def undo_start(self):
         self.undo_started = True
 
@@ -217,6 +240,13 @@ class MockAnkiUtils():
     def extract_tts_tags(self, av_tags):
         return av_tags
 
+    def review_queue_available(self):
+        return True
+
+    def get_upcoming_review_tts_tags(self, current_card_id, card_count):
+        self.upcoming_review_card_count = card_count
+        return self.upcoming_review_tts_tags
+
     def save_note_type_update(self, note_model):
         logger.info('save_note_type_update')
         self.updated_note_model = note_model
@@ -473,8 +503,9 @@ class MockCard():
         return self.extract_tts_tags(template_format)
 
 class MockTTSTag():
-    def __init__(self, field_text):
+    def __init__(self, field_text, other_args=[]):
         self.field_text = field_text
+        self.other_args = other_args
 
 class MockNote():
     def __init__(self, note_id, model_id, field_dict, field_array, model):
@@ -1,13 +1,22 @@
 import sys
 import abc
+import json
+import weakref
+import threading
 
 constants = __import__('constants', globals(), locals(), [], sys._addon_import_level_base)
 languages = __import__('languages', globals(), locals(), [], sys._addon_import_level_base)
 
+def get_canonical_voice_key(voice_key):
+    # voice keys are strings or dicts, this is a hashable version independent of key order
+    return json.dumps(voice_key, sort_keys=True)
+
 class VoiceBase(abc.ABC):
     """
-    abstract base class which defines all the mandatory properties
+    abstract base class which defines all the mandatory properties.
+    voices are identified by their service and voice key, they can be used in sets and as dict keys
     """
+    __slots__ = ()
 
     @abc.abstractproperty
     def name():
@@ -46,21 +55,72 @@ class VoiceBase(abc.ABC):
         return f'{self.language.audio_lang_name}, {self.gender.name}, {self.name}, {self.service.name}'
 
     def __eq__(self, other):
+        if not isinstance(other, VoiceBase):
+            return NotImplemented
         return self.service.name == other.service.name and self.voice_key == other.voice_key
 
+    def __hash__(self):
+        return hash((self.service.name, get_canonical_voice_key(self.voice_key)))
+
 
 class Voice(VoiceBase):
     """
-    this basic implementation can be used by services which don't have a particular requirement
+    this basic implementation can be used by services which don't have a particular requirement.
+    voices are immutable, and there is a single instance per service and voice key: building a service's
+    voice list again returns the existing instances, unless the voice changed.
     """
+    __slots__ = ('_name', '_gender', '_language', '_service', '_voice_key', '_options', '_hash', '__weakref__')
+
+    instances = weakref.WeakValueDictionary()
+    instances_lock = threading.Lock()
+
+    def __new__(cls, name, gender, language, service, voice_key, options):
+        instance_key = (service.name, get_canonical_voice_key(voice_key))
+        with cls.instances_lock:
+            instance = cls.instances.get(instance_key, None)
+            if instance is not None and instance._matches(name, gender, language, service, options):
+                return instance
+            instance = object.__new__(cls)
+            object.__setattr__(instance, '_name', name)
+            object.__setattr__(instance, '_gender', gender)
+            object.__setattr__(instance, '_language', language)
+            object.__setattr__(instance, '_service', service)
+            object.__setattr__(instance, '_voice_key', voice_key)
+            object.__setattr__(instance, '_options', options)
+            object.__setattr__(instance, '_hash', hash(instance_key))
+            cls.instances[instance_key] = instance
+            return instance
+
+    def _matches(self, name, gender, language, service, options):
+        return self._name == name and self._gender == gender and self._language == language and \
+            self._service is service and self._options == options
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'voice is immutable, cannot set {name}')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'voice is immutable, cannot delete {name}')
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return VoiceBase.__eq__(self, other)
+
+    # immutable, copies are the voice itself
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
-    def __init__(self, name, gender, language, service, voice_key, options):
-        self._name = name
-        self._gender = gender
-        self._language = language
-        self._service = service
-        self._voice_key = voice_key
-        self._options = options
+    def __reduce__(self):
+        return (Voice, (self._name, self._gender, self._language, self._service, self._voice_key, self._options))
+
+    def __repr__(self):
+        return f'{self.service} {self.name}, {self.language}'
 
     def _get_name(self):
         return self._name
@@ -80,9 +140,6 @@ class Voice(VoiceBase):
     def _get_options(self):
         return self._options
 
-    def __repr__(self):
-        return f'{self.service} {self.name}, {self.language}'
-
     name = property(fget=_get_name)
     gender = property(fget=_get_gender)
     language = property(fget=_get_language)
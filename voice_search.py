@@ -0,0 +1,94 @@
+import sys
+import re
+import unicodedata
+import collections
+
+logging_utils = __import__('logging_utils', globals(), locals(), [], sys._addon_import_level_base)
+logger = logging_utils.get_child_logger(__name__)
+
+
+def get_words(text):
+    # lowercase without accents, so that "francais" finds "Français". voice ids such as voice_a_1 are split too
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join([c for c in text if not unicodedata.combining(c)])
+    return [word for word in re.split(r'[\W_]+', text) if word != '']
+
+def get_trigrams(word):
+    return set([word[i:i+3] for i in range(len(word) - 2)])
+
+class VoiceSearchIndex():
+    """
+    type-ahead search over voice name, locale, language, service and gender. voices are referred to by their
+    position in the voice list the index was built from. every word of the query needs to match a word of the voice:
+    words starting with the query word rank first, exact words higher. when no word starts with the query word,
+    for example because of a typo, words sharing enough of its trigrams match, ranked by how many they share.
+    """
+    EXACT_WORD_SCORE = 3
+    PREFIX_SCORE = 2
+    MIN_TRIGRAM_SIMILARITY = 0.5
+
+    def __init__(self, voice_list):
+        self.word_voice_ids = collections.defaultdict(set)
+        for voice_id, voice in enumerate(voice_list):
+            for word in self.get_voice_words(voice):
+                self.word_voice_ids[word].add(voice_id)
+        # voice ids by prefix of their words, and words by trigram
+        self.prefix_voice_ids = collections.defaultdict(set)
+        self.trigram_words = collections.defaultdict(set)
+        for word, voice_ids in self.word_voice_ids.items():
+            for length in range(1, len(word) + 1):
+                self.prefix_voice_ids[word[:length]].update(voice_ids)
+            for trigram in get_trigrams(word):
+                self.trigram_words[trigram].add(word)
+        logger.debug(f'built voice search index, {len(voice_list)} voices, {len(self.word_voice_ids)} words')
+
+    def get_voice_words(self, voice):
+        fields = [
+            voice.name,
+            voice.language.audio_lang_name,
+            voice.language.lang.lang_name,
+            voice.service.name,
+            voice.gender.name]
+        # some services don't name their voices
+        return set(get_words(' '.join([field for field in fields if field != None])))
+
+    def match_query_word(self, query_word):
+        """score of each voice matching query_word"""
+        prefix_voice_ids = self.prefix_voice_ids.get(query_word, None)
+        if prefix_voice_ids != None:
+            scores = dict.fromkeys(prefix_voice_ids, self.PREFIX_SCORE)
+            for voice_id in self.word_voice_ids.get(query_word, []):
+                scores[voice_id] = self.EXACT_WORD_SCORE
+            return scores
+
+        # approximate match
+        scores = {}
+        query_trigrams = get_trigrams(query_word)
+        if len(query_trigrams) == 0:
+            return scores
+        shared_trigram_counts = collections.Counter()
+        for trigram in query_trigrams:
+            shared_trigram_counts.update(self.trigram_words.get(trigram, []))
+        for word, shared_trigram_count in shared_trigram_counts.items():
+            similarity = shared_trigram_count / max(len(query_trigrams), len(get_trigrams(word)))
+            if similarity < self.MIN_TRIGRAM_SIMILARITY:
+                continue
+            for voice_id in self.word_voice_ids[word]:
+                scores[voice_id] = max(scores.get(voice_id, 0), similarity)
+        return scores
+
+    def search(self, query):
+        """ids of the voices matching the query, best match first. voices which rank the same keep their order"""
+        query_words = get_words(query)
+        if len(query_words) == 0:
+            return []
+        total_scores = None
+        for query_word in query_words:
+            scores = self.match_query_word(query_word)
+            if total_scores == None:
+                total_scores = scores
+            else:
+                total_scores = {voice_id: score + scores[voice_id] for voice_id, score in total_scores.items() if voice_id in scores}
+            if len(total_scores) == 0:
+                return []
+        return sorted(total_scores.keys(), key=lambda voice_id: (-total_scores[voice_id], voice_id))
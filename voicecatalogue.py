@@ -0,0 +1,101 @@
+"""
+voices of the services which don't list them dynamically. the catalogue is stored as one compressed json file
+per service in services/voices (38KB in total), a service's file is only read the first time its voices are needed.
+the voice list is a json list of dicts with name, gender, language, service, key and options, the format of the
+former services/voicelist.py. to edit the catalogue, export the current voices, change or replace them, then regenerate it:
+python voicecatalogue.py export voice_list.json
+python voicecatalogue.py import voice_list.json
+"""
+
+import sys
+import os
+import json
+import gzip
+import threading
+
+CATALOGUE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'services', 'voices')
+CATALOGUE_EXTENSION = '.json.gz'
+
+
+class VoiceCatalogue():
+    def __init__(self, catalogue_dir):
+        self.catalogue_dir = catalogue_dir
+        self.lock = threading.Lock()
+        # voice data by service, then by language
+        self.service_voices = {}
+
+    def get_service_path(self, service_name):
+        return os.path.join(self.catalogue_dir, f'{service_name}{CATALOGUE_EXTENSION}')
+
+    def load_service(self, service_name):
+        with self.lock:
+            if service_name not in self.service_voices:
+                language_voices = {}
+                service_path = self.get_service_path(service_name)
+                if os.path.exists(service_path):
+                    with gzip.open(service_path, 'rt', encoding='utf-8') as f:
+                        language_voices = json.load(f)['languages']
+                self.service_voices[service_name] = language_voices
+            return self.service_voices[service_name]
+
+    def get_voice_data_list(self, service_name):
+        """voice dicts with name, gender, language, service, key and options. key and options are shared, don't modify them"""
+        voice_data_list = []
+        for language, voices in self.load_service(service_name).items():
+            for voice_data in voices:
+                voice_data_list.append(dict(voice_data, language=language, service=service_name))
+        return voice_data_list
+
+    def get_languages(self, service_name):
+        return list(self.load_service(service_name).keys())
+
+def read_catalogue(catalogue_dir):
+    # the voice list the catalogue was written from
+    voice_catalogue = VoiceCatalogue(catalogue_dir)
+    voice_list = []
+    for filename in sorted(os.listdir(catalogue_dir)):
+        if filename.endswith(CATALOGUE_EXTENSION):
+            service_name = filename[:-len(CATALOGUE_EXTENSION)]
+            voice_list.extend([{
+                'name': voice_data['name'],
+                'gender': voice_data['gender'],
+                'language': voice_data['language'],
+                'service': voice_data['service'],
+                'key': voice_data['key'],
+                'options': voice_data['options'],
+            } for voice_data in voice_catalogue.get_voice_data_list(service_name)])
+    return voice_list
+
+def write_catalogue(voice_list, catalogue_dir):
+    # group by service, then language. voices keep their order within a language
+    services = {}
+    for voice_data in voice_list:
+        language_voices = services.setdefault(voice_data['service'], {})
+        language_voices.setdefault(voice_data['language'], []).append({
+            'name': voice_data['name'],
+            'gender': voice_data['gender'],
+            'key': voice_data['key'],
+            'options': voice_data['options'],
+        })
+    os.makedirs(catalogue_dir, exist_ok=True)
+    for service_name, language_voices in services.items():
+        service_path = os.path.join(catalogue_dir, f'{service_name}{CATALOGUE_EXTENSION}')
+        content = json.dumps({'service': service_name, 'languages': language_voices}, separators=(',', ':'))
+        # mtime of 0 so that the files only change when the voices do
+        with open(service_path, 'wb') as f:
+            with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gzip_file:
+                gzip_file.write(content.encode('utf-8'))
+
+catalogue = VoiceCatalogue(CATALOGUE_DIR)
+
+if __name__ == '__main__':
+    command, voice_list_path = sys.argv[1], sys.argv[2]
+    if command == 'export':
+        with open(voice_list_path, 'w', encoding='utf-8') as f:
+            json.dump(read_catalogue(CATALOGUE_DIR), f, indent=1, ensure_ascii=False)
+    elif command == 'import':
+        with open(voice_list_path, 'r', encoding='utf-8') as f:
+            write_catalogue(json.load(f), CATALOGUE_DIR)
+    else:
+        print(f'unknown command {command}, expected export or import')
+        sys.exit(1)